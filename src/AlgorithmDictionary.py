@@ -1,13 +1,98 @@
-from algorithms import bubble_sort
-from algorithms import merge_sort
-from algorithms import quick_sort
-from algorithms import radix_sort
-from algorithms import linear_search
+from algorithms import bubble_sort, bubble_sort_fast
+from algorithms import merge_sort, merge_sort_fast
+from algorithms import natural_merge_sort, natural_merge_sort_fast
+from algorithms import quick_sort, quick_sort_fast
+from algorithms import radix_sort, radix_sort_fast
+from algorithms import parallel_sort, parallel_sort_fast
+from algorithms import external_sort, external_sort_fast
+from algorithms import auto_sort, auto_sort_fast
+from algorithms import quickselect, partial_sort, heap_top_k
+from algorithms import quickselect_fast, partial_sort_fast, heap_top_k_fast
+from algorithms import linear_search, linear_search_fast
+from algorithms import binary_search, exponential_search, interpolation_search, batch_search
+from algorithms import binary_search_fast, exponential_search_fast, interpolation_search_fast, batch_search_fast
 
+# Generators that yield every step, used by the visualizer
 AlgDict = {
     'bubble_sort' : bubble_sort,
     'merge_sort' : merge_sort,
+    'natural_merge_sort' : natural_merge_sort,
     'quick_sort' : quick_sort,
     'radix_sort' : radix_sort,
-    'linear_search' : linear_search
-}
\ No newline at end of file
+    'parallel_sort' : parallel_sort,
+    'external_sort' : external_sort,
+    'auto' : auto_sort,
+    'quickselect' : quickselect,
+    'partial_sort' : partial_sort,
+    'heap_top_k' : heap_top_k,
+    'linear_search' : linear_search,
+    'binary_search' : binary_search,
+    'exponential_search' : exponential_search,
+    'interpolation_search' : interpolation_search,
+    'batch_search' : batch_search
+}
+
+# The same algorithms without yielding, used for timing and large inputs
+FastDict = {
+    'bubble_sort' : bubble_sort_fast,
+    'merge_sort' : merge_sort_fast,
+    'natural_merge_sort' : natural_merge_sort_fast,
+    'quick_sort' : quick_sort_fast,
+    'radix_sort' : radix_sort_fast,
+    'parallel_sort' : parallel_sort_fast,
+    'external_sort' : external_sort_fast,
+    'auto' : auto_sort_fast,
+    'quickselect' : quickselect_fast,
+    'partial_sort' : partial_sort_fast,
+    'heap_top_k' : heap_top_k_fast,
+    'linear_search' : linear_search_fast,
+    'binary_search' : binary_search_fast,
+    'exponential_search' : exponential_search_fast,
+    'interpolation_search' : interpolation_search_fast,
+    'batch_search' : batch_search_fast
+}
+
+MODES = {'visual': AlgDict, 'fast': FastDict}
+
+# Algorithms that look for a target instead of sorting
+SEARCHES = {'linear_search', 'binary_search', 'exponential_search', 'interpolation_search', 'batch_search'}
+
+# Searches that take a list of targets
+BATCHES = {'batch_search'}
+
+# Searches whose fast version looks the target up in a SortedIndex of the array
+INDEXED = {'binary_search', 'exponential_search', 'interpolation_search', 'batch_search'}
+
+# Sorts that only put part of the array in order: the median, or the smallest TOP_K elements
+SELECTIONS = {'quickselect', 'partial_sort', 'heap_top_k'}
+
+
+def get_algorithm(name, mode='visual'):
+    #Looks up an algorithm in the registry of the given mode
+    return MODES[mode][name]
+
+
+def start_algorithm(name, arr, target=0, mode='visual', counters=None, report=None, index=None):
+    """
+    Calls an algorithm with the arguments it expects.
+
+    Sorts are called with the array bounds, searches with the target value.
+    In visual mode this returns the step iterator, in fast mode the algorithm
+    runs right away and its result is returned. Only the visual algorithms
+    report into counters. report is passed on to auto, which calls it with
+    the engine it picked, the other algorithms ignore it. index is a
+    SortedIndex of arr for the fast INDEXED searches; build it once per
+    array and pass it to every query, without it each query builds its own.
+    """
+    algorithm = get_algorithm(name, mode)
+    options = {'report': report} if name == 'auto' and report is not None else {}
+    if mode != 'visual':
+        if name in SEARCHES:
+            if name in INDEXED and index is not None:
+                return algorithm(arr, target, index=index)
+            return algorithm(arr, target)
+        return algorithm(arr, 0, len(arr) - 1, **options)
+
+    if name in SEARCHES:
+        return algorithm(arr, target, counters=counters)
+    return algorithm(arr, 0, len(arr) - 1, counters=counters, **options)
@@ -1,14 +1,65 @@
-from .bubble_sort import bubble_sort
-from .merge_sort import merge_sort
-from .quick_sort import quick_sort
-from .radix_sort import radix_sort
-from .linear_search import linear_search
+from .bubble_sort import bubble_sort, bubble_sort_fast
+from .merge_sort import merge_sort, merge_sort_fast
+from .merge_sort import natural_merge_sort, natural_merge_sort_fast
+from .quick_sort import quick_sort, quick_sort_fast
+from .radix_sort import radix_sort, radix_sort_fast
+from .parallel_sort import parallel_sort, parallel_sort_fast
+from .external_sort import external_sort, external_sort_fast, external_sort_file
+from .auto_sort import auto_sort, auto_sort_fast, decide
+from .selection import quickselect, partial_sort, heap_top_k
+from .selection import quickselect_fast, partial_sort_fast, heap_top_k_fast, top_k_stream
+from .linear_search import linear_search, linear_search_fast
+from .sorted_search import binary_search, exponential_search, interpolation_search, batch_search
+from .sorted_search import binary_search_fast, exponential_search_fast, interpolation_search_fast, batch_search_fast
+from .search_index import SortedIndex
+from .counters import Counters, measure_memory
+from .events import Step, COMPARE, SWAP, WRITE, PIVOT, FOUND, DONE
 
 __all__ = [
     "bubble_sort",
     "merge_sort",
+    "natural_merge_sort",
     "quick_sort",
     "radix_sort",
+    "parallel_sort",
+    "external_sort",
+    "auto_sort",
+    "quickselect",
+    "partial_sort",
+    "heap_top_k",
     "linear_search",
+    "binary_search",
+    "exponential_search",
+    "interpolation_search",
+    "batch_search",
+    "bubble_sort_fast",
+    "merge_sort_fast",
+    "natural_merge_sort_fast",
+    "quick_sort_fast",
+    "radix_sort_fast",
+    "parallel_sort_fast",
+    "external_sort_fast",
+    "external_sort_file",
+    "auto_sort_fast",
+    "decide",
+    "quickselect_fast",
+    "partial_sort_fast",
+    "heap_top_k_fast",
+    "top_k_stream",
+    "linear_search_fast",
+    "binary_search_fast",
+    "exponential_search_fast",
+    "interpolation_search_fast",
+    "batch_search_fast",
+    "SortedIndex",
+    "Counters",
+    "measure_memory",
+    "Step",
+    "COMPARE",
+    "SWAP",
+    "WRITE",
+    "PIVOT",
+    "FOUND",
+    "DONE",
 ]
 
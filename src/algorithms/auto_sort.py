@@ -0,0 +1,300 @@
+import math
+from functools import lru_cache
+from random import Random
+
+from .counters import Counters
+from .insertion_sort import insertion_sort, insertion_sort_fast
+from .merge_sort import natural_merge_sort, natural_merge_sort_fast, MIN_RUN
+from .quick_sort import quick_sort, quick_sort_fast
+from .radix_sort import radix_sort, radix_sort_fast, RADIX_BASE, NUMPY_CUTOFF, np
+from .events import Step, DONE
+
+SAMPLE_SIZE = 256 # Most neighbours, pairs and values looked at, whatever the size of the input
+SAMPLE_SEED = 0 # The same input always gets the same decision
+SMALL = 16 * MIN_RUN # Inputs up to this size are not profiled, decide_small picks their engine
+
+# Cost model of the fast engines in nanoseconds. Only how they compare with
+# each other matters. Measured with the median of at least 5 runs of every
+# engine on every distribution of analysis.distributions, sizes 64 to 100000
+# and seeds 0 and 1: each constant is the time of its term on the inputs
+# where that term dominates (sorted for MERGE_SCAN, full_range for
+# QUICK_LEVEL, uniform for the passes, insertion_sort on uniform for
+# INSERTION_SHIFT). MERGE_PASS includes the insertion sort that extends
+# short runs to MIN_RUN. The README lists the regret analysis.auto_benchmark
+# gives with them, checked on seeds 2 and 3 too.
+CALL_COST = 2000 # Setting up any engine
+INSERTION_STEP = 100 # insertion_sort per element, plus a shift per inversion
+INSERTION_SHIFT = 70
+MERGE_SCAN = 85 # natural_merge_sort finding the runs, per element
+MERGE_PASS = 180 # and every merge pass, per element
+QUICK_LEVEL = 130 # quick_sort per element and level of partitioning
+RADIX_PASS = 300 # radix_sort per element and pass
+RADIX_BUCKETS = 50 # and per bucket and pass
+NUMPY_BASE = 40 # radix_sort_fast with NumPy, converting from and to a list per element
+NUMPY_PASS = 35 # and per element and pass
+
+# Visual and fast version of every engine auto_sort can pick
+ENGINES = {
+    'insertion_sort': (insertion_sort, insertion_sort_fast),
+    'natural_merge_sort': (natural_merge_sort, natural_merge_sort_fast),
+    'radix_sort': (radix_sort, radix_sort_fast),
+    'quick_sort': (quick_sort, quick_sort_fast),
+}
+
+
+@lru_cache(maxsize=None)
+def sample_points(seed, sample):
+    #The random numbers a Profile samples with, drawn once per seed: making a Random costs more than sorting a small input
+    random = Random(seed).random
+    return [random() for _ in range(3 * sample)]
+
+
+class Profile:
+    """
+    Features of an input, estimated from at most SAMPLE_SIZE neighbours,
+    pairs and values, so profiling costs O(1) whatever the size.
+
+    size: number of elements
+    descents / ascents: share of sampled neighbours a[i] > a[i+1] / a[i] < a[i+1]
+    runs: estimated number of runs natural_merge_sort finds, ascending or
+    strictly descending, whichever are fewer
+    inversions: share of sampled pairs i < j with a[i] > a[j], 0 sorted, 0.5 random, 1 reversed
+    distinct: share of distinct values in the sampled values, low when there are many duplicates
+    span: largest minus smallest sampled value, None when a value is not an integer
+    """
+
+    def __init__(self, arr, low, high, sample=SAMPLE_SIZE, seed=SAMPLE_SEED):
+        self.size = max(0, high - low + 1)
+        self.descents = self.ascents = self.inversions = 0.0
+        self.runs = 1
+        self.distinct = 1.0
+        self.span = 0
+        self.sampled = 0
+        if self.size < 2 or sample <= 0:
+            return
+
+        # sqrt(n) samples up to the limit, so profiling stays cheap next to sorting small inputs too
+        count = min(sample, max(8, math.isqrt(self.size)))
+        points = sample_points(seed, sample)
+        last = self.size - 1
+        starts = [low + int(point * last) for point in points[:count]]
+        self.sampled = count
+        descents = sum(arr[i] > arr[i + 1] for i in starts)
+        self.descents = descents / count
+        self.ascents = sum(arr[i] < arr[i + 1] for i in starts) / count
+
+        inversions = 0
+        size = self.size
+        for k in range(count, 3 * count, 2):
+            i = low + int(points[k] * size)
+            j = low + int(points[k + 1] * size)
+            if i > j:
+                i, j = j, i
+            inversions += arr[i] > arr[j]
+        self.inversions = inversions / count
+
+        # A descent ends an ascending run, an ascent or equal neighbours end a descending one
+        ascending = self.estimate_runs(descents, count, inversions == 0)
+        descending = self.estimate_runs(count - descents, count, inversions == count)
+        self.runs = min(ascending, descending)
+
+        values = [arr[i] for i in starts]
+        self.distinct = len(set(values)) / count
+        if all(type(value) is int for value in values):
+            self.span = max(values) - min(values)
+        else:
+            self.span = None
+
+    def estimate_runs(self, breaks, count, ordered):
+        """
+        Runs in the input when breaks of the count sampled neighbours end a run.
+
+        Seeing no break does not mean there is none, a run can end every
+        size / count elements without being sampled. Only when the sampled
+        pairs are all in order too (ordered) is the input taken as one run.
+        """
+        if breaks == 0 and ordered:
+            return 1
+        return round(max(breaks, 1) / count * (self.size - 1)) + 1
+
+    def radix_passes(self, base=RADIX_BASE):
+        #Passes radix_sort would need for the sampled span
+        digit_bits = base.bit_length() - 1
+        return -(-self.span.bit_length() // digit_bits)
+
+    def as_dict(self):
+        return {
+            'size': self.size,
+            'sampled': self.sampled,
+            'descents': self.descents,
+            'ascents': self.ascents,
+            'runs': self.runs,
+            'inversions': self.inversions,
+            'distinct': self.distinct,
+            'span': self.span,
+        }
+
+    def __str__(self):
+        span = 'not integers' if self.span is None else f'span ~{self.span}'
+        return (f'n {self.size}  runs ~{self.runs}  inversions {self.inversions:.2f}  '
+                f'distinct {self.distinct:.2f}  {span}')
+
+
+def estimate_costs(profile, whole=True, fast=False):
+    """
+    Estimated time of every engine on the profiled input, in nanoseconds.
+
+    Parameters:
+    profile (Profile): The input.
+    whole (bool): The range is the whole list. radix_sort always sorts the
+    whole list, so it is left out otherwise.
+    fast (bool): The fast engines run, radix_sort_fast uses NumPy on big inputs.
+
+    Returns:
+    dict: Engine name -> estimated time.
+    """
+    n = max(1, profile.size)
+    inversions = profile.inversions
+    if inversions == 0 and profile.descents > 0:
+        inversions = 1 / profile.sampled # A descent was seen, the sampled pairs only missed the inversions
+    costs = {'insertion_sort': CALL_COST + n * INSERTION_STEP + INSERTION_SHIFT * inversions * n * (n - 1) / 2}
+
+    runs = max(1, min(profile.runs, n // MIN_RUN))
+    costs['natural_merge_sort'] = CALL_COST + n * (MERGE_SCAN + MERGE_PASS * math.ceil(math.log2(runs)))
+
+    # Three way partitioning stops splitting once a range holds one value
+    distinct = n if profile.distinct >= 0.5 else max(2, profile.distinct * profile.sampled)
+    costs['quick_sort'] = CALL_COST + n * QUICK_LEVEL * math.log2(min(n, distinct) + 1)
+
+    if whole and profile.span is not None:
+        passes = profile.radix_passes()
+        if fast and np is not None and n >= NUMPY_CUTOFF and profile.span < 2 ** 63:
+            costs['radix_sort'] = CALL_COST + n * (NUMPY_BASE + NUMPY_PASS * passes)
+        else:
+            costs['radix_sort'] = CALL_COST + passes * (n * RADIX_PASS + RADIX_BASE * RADIX_BUCKETS)
+    return costs
+
+
+class Decision:
+    """
+    The engine auto_sort picked, why, the profile it picked it from and the
+    estimated cost of every engine. Small inputs are not profiled, their
+    profile is None and they have no costs.
+    """
+    def __init__(self, engine, reason, profile, costs):
+        self.engine = engine
+        self.reason = reason
+        self.profile = profile
+        self.costs = costs
+
+    def __str__(self):
+        if self.profile is None:
+            return f'auto: {self.engine} ({self.reason}; not profiled)'
+        return f'auto: {self.engine} ({self.reason}; {self.profile})'
+
+
+def decide_small(arr, low, high):
+    """
+    Picks the engine for an input of up to SMALL elements from about sqrt(n)
+    evenly spaced elements and their right neighbours, without a Profile.
+
+    - insertion_sort when every sampled neighbour and the spaced elements
+      themselves are in order, it is about linear on almost sorted input
+    - quick_sort when the sample has many duplicates and no order, its three
+      way partition finishes them in one pass
+    - natural_merge_sort otherwise, on small inputs it is an insertion sort
+      of MIN_RUN chunks and a few merges and never far from the best
+
+    Returns:
+    tuple: The engine name and the reason.
+    """
+    n = high - low + 1
+    if n < 2:
+        return 'insertion_sort', 'nothing to sort'
+    step = max(1, n // max(4, math.isqrt(n)))
+    starts = range(low, high, step)
+    descents = sum(arr[i] > arr[i + 1] for i in starts)
+    values = [arr[i] for i in starts]
+    if descents == 0 and values == sorted(values):
+        return 'insertion_sort', 'small input, sample in order'
+    if 4 * descents >= len(values) and 2 * len(set(values)) < len(values):
+        return 'quick_sort', 'small input, many duplicates'
+    return 'natural_merge_sort', 'small input'
+
+
+def decide(arr, low, high, whole=True, fast=False):
+    """
+    Profiles arr[low..high] and picks the engine with the lowest estimated cost.
+
+    - small inputs (up to SMALL) are not profiled, that would cost about as
+      much as sorting them; decide_small picks their engine from a few elements
+    - insertion_sort wins on almost sorted inputs, it has no overhead
+    - natural_merge_sort wins on a few long runs, ascending or descending, O(n log runs)
+    - radix_sort wins on integers over a small range, a few linear passes
+    - quick_sort wins otherwise, its three way partition also finishes
+      duplicates in one pass
+
+    Returns:
+    Decision: The engine name (a key of ENGINES), the reason, the profile and the costs.
+    """
+    if high - low + 1 <= SMALL:
+        # Profiling would cost about as much as sorting
+        return Decision(*decide_small(arr, low, high), None, {})
+    profile = Profile(arr, low, high)
+    costs = estimate_costs(profile, whole, fast)
+    engine = min(costs, key=costs.get)
+    if engine == 'insertion_sort':
+        reason = 'almost sorted'
+    elif engine == 'natural_merge_sort':
+        reason = f'~{profile.runs} runs'
+    elif engine == 'radix_sort':
+        reason = f'small integer range, {profile.radix_passes()} radix passes'
+    elif profile.distinct < 0.5:
+        reason = 'many duplicates, three way partition'
+    else:
+        reason = 'no structure to exploit'
+    return Decision(engine, reason, profile, costs)
+
+
+def auto_sort(arr, low, high, *args, counters=None, report=None):
+    """
+    Sorts arr[low..high] with the engine decide() picks for it.
+
+    Parameters:
+    arr (list): The list to be sorted.
+    low (int): Start index of array.
+    high (int): End index of array.
+    counters (Counters): Receives the operation counts of the engine, optional.
+    report (callable): Called with the Decision before sorting, optional.
+
+    Yield:
+    Step: The steps of the chosen engine, then DONE
+    """
+    counters = counters or Counters()
+    decision = decide(arr, low, high, whole=(low == 0 and high == len(arr) - 1))
+    if report is not None:
+        report(decision)
+    engine = ENGINES[decision.engine][0]
+    if decision.engine == 'radix_sort':
+        yield from engine(arr, counters=counters)
+    elif decision.engine == 'insertion_sort':
+        yield from engine(arr, low, high, counters=counters)
+        yield Step(DONE) # insertion_sort has no DONE step of its own
+    else:
+        yield from engine(arr, low, high, counters=counters)
+
+
+def auto_sort_fast(arr, low, high, *args, report=None):
+    """
+    Same as auto_sort without yielding.
+
+    Returns:
+    list: The sorted list.
+    """
+    decision = decide(arr, low, high, whole=(low == 0 and high == len(arr) - 1), fast=True)
+    if report is not None:
+        report(decision)
+    engine = ENGINES[decision.engine][1]
+    if decision.engine == 'radix_sort':
+        return engine(arr)
+    return engine(arr, low, high)
@@ -1,33 +1,56 @@
-#from src.analysis.analyzer import timer
 #import random
+from .counters import Counters
+from .events import Step, SWAP, DONE
 
-#@timer
-def bubble_sort(arr, *args):
+def bubble_sort(arr, *args, counters=None):
     """
     Sorts the given array in ascending order using the bubble sort algorithm.
 
     Parameters:
     arr (list): The list to be sorted.
-    
+    counters (Counters): Receives the operation counts, optional.
+
     Yields:
-    tuple: Contains the list and index of each bar which are then highlighted to then be swapped
+    Step: A swap of two neighbouring bars, then DONE
 
     Returns:
     list: The fully sorted list.
     """
+    counters = counters or Counters()
     n = len(arr)  # Get the number of elements in the array
     # Outer loop to traverse through all elements in the array
     for i in range(n):
         # Inner loop to compare adjacent elements
         for j in range(0, n-i-1):
             # If the current element is greater than the next element, swap them
+            counters.comparisons += 1
             if arr[j] > arr[j+1]:
                 arr[j], arr[j+1] = arr[j+1], arr[j]  # Swap the elements
-                yield arr, j, j+1, -1, -1 # Yield current state of array and index of swapped bars
-    yield arr, -1, -1, -1, -1 # End of yield
+                counters.swaps += 1
+                counters.writes += 2
+                yield Step(SWAP, j, j+1) # Yield the indices of the swapped bars
+    yield Step(DONE) # End of yield
     #return arr  # Return the fully sorted array
 
 
+def bubble_sort_fast(arr, *args):
+    """
+    Same algorithm as bubble_sort without yielding, for timing and large inputs.
+
+    Parameters:
+    arr (list): The list to be sorted.
+
+    Returns:
+    list: The fully sorted list.
+    """
+    n = len(arr)
+    for i in range(n):
+        for j in range(0, n-i-1):
+            if arr[j] > arr[j+1]:
+                arr[j], arr[j+1] = arr[j+1], arr[j]
+    return arr
+
+
 #test code
 #arr = [random.randint(0, 675) for _ in range(10000)]
 #bubble_sort(arr)
\ No newline at end of file
@@ -0,0 +1,84 @@
+#Operation counters the visual algorithms report into
+import tracemalloc
+
+
+class Counters:
+    """
+    Counts the work an algorithm does, independent of the machine it runs on.
+
+    comparisons: element comparisons
+    swaps: element swaps (a swap is also counted as two writes)
+    writes: writes into the array being sorted
+    depth / max_depth: current and deepest recursion level
+    aux / peak_aux: scratch elements currently allocated / at most
+    peak_bytes: peak traced allocation in bytes, only set by measure_memory
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.comparisons = 0
+        self.swaps = 0
+        self.writes = 0
+        self.depth = 0
+        self.max_depth = 0
+        self.aux = 0
+        self.peak_aux = 0
+        self.peak_bytes = None
+
+    def enter(self):
+        #Called when the algorithm recurses one level deeper
+        self.depth += 1
+        if self.depth > self.max_depth:
+            self.max_depth = self.depth
+
+    def leave(self):
+        self.depth -= 1
+
+    def allocate(self, size):
+        #Called when the algorithm allocates a scratch list of the given size
+        self.aux += size
+        if self.aux > self.peak_aux:
+            self.peak_aux = self.aux
+
+    def free(self, size):
+        self.aux -= size
+
+    def as_dict(self):
+        return {
+            'comparisons': self.comparisons,
+            'swaps': self.swaps,
+            'writes': self.writes,
+            'max_depth': self.max_depth,
+            'peak_aux': self.peak_aux,
+            'peak_bytes': self.peak_bytes,
+        }
+
+    def __str__(self):
+        return (f'Comparisons {self.comparisons}  Swaps {self.swaps}  Writes {self.writes}  '
+                f'Depth {self.max_depth}  Aux {self.peak_aux}')
+
+
+def measure_memory(iterator, counters):
+    """
+    Runs an algorithm iterator to completion under tracemalloc and stores the
+    peak memory allocated while it ran in counters.peak_bytes.
+
+    tracemalloc slows everything down a lot, so this is meant for headless
+    runs and not for the visualizer.
+    """
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    start, _ = tracemalloc.get_traced_memory()
+    try:
+        for _ in iterator:
+            pass
+    finally:
+        _, peak = tracemalloc.get_traced_memory()
+        if not was_tracing:
+            tracemalloc.stop()
+    counters.peak_bytes = peak - start
+    return counters
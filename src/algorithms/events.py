@@ -0,0 +1,46 @@
+#Step events the visual algorithms yield, one per operation
+
+# Kinds of steps, what a and b hold depends on the kind
+COMPARE = 0 # Elements a and b are compared, b is -1 when one element is read
+SWAP = 1 # Elements a and b were swapped
+WRITE = 2 # Element a was set to the value b
+PIVOT = 3 # Element a is the pivot the next comparisons are made against
+FOUND = 4 # The search found its target at a
+DONE = 5 # The algorithm is finished
+
+KIND_NAMES = ('compare', 'swap', 'write', 'pivot', 'found', 'done')
+
+
+class Step:
+    """
+    One step of a visual algorithm.
+
+    A step only says what changed, never which list it changed, so a
+    consumer keeps its own copy of the array and applies the steps to it
+    (see apply). Every sort ends with a DONE step; a search ends with FOUND
+    when it found its target and with DONE otherwise.
+
+    kind (int): One of the kinds above.
+    a (int): First index.
+    b (int): Second index, or the value of a WRITE.
+    """
+
+    __slots__ = ('kind', 'a', 'b')
+
+    def __init__(self, kind, a=-1, b=-1):
+        self.kind = kind
+        self.a = a
+        self.b = b
+
+    def apply(self, arr):
+        #Makes the change of this step to arr, steps that only look at elements do nothing
+        if self.kind == SWAP:
+            arr[self.a], arr[self.b] = arr[self.b], arr[self.a]
+        elif self.kind == WRITE:
+            arr[self.a] = self.b
+
+    def __eq__(self, other):
+        return isinstance(other, Step) and (self.kind, self.a, self.b) == (other.kind, other.a, other.b)
+
+    def __repr__(self):
+        return f'Step({KIND_NAMES[self.kind]}, {self.a}, {self.b})'
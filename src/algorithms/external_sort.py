@@ -0,0 +1,262 @@
+import heapq
+import os
+import shutil
+import tempfile
+from array import array as int_array
+
+from .counters import Counters
+from .merge_sort import merge_sort_range, merge_sort_fast
+from .events import Step, WRITE, DONE
+
+MEMORY_BUDGET = 64 << 20 # Bytes the sort may use for runs and buffers
+FAN_IN = 16 # Runs merged at once
+ELEMENT_BYTES = 48 # Cost of one value sorted as a list: the slot, the int object and merge_fast's copy
+ITEM_BYTES = 8 # int64 in the files
+VISUAL_RUNS = 8 # Runs the visual version splits the array into
+VISUAL_FAN_IN = 4
+
+
+def read_block(file, count):
+    #Reads up to count int64 values, fewer at the end of the file
+    block = int_array('q')
+    try:
+        block.fromfile(file, count)
+    except EOFError:
+        pass # fromfile keeps what it could read
+    return block
+
+
+def iter_run(path, buffer_items):
+    #Values of a run file, read buffer_items at a time
+    with open(path, 'rb') as file:
+        while True:
+            block = read_block(file, buffer_items)
+            if not block:
+                return
+            yield from block
+
+
+def kway_merge(runs, path, buffer_items):
+    """
+    Merges sorted run iterators into one file with a heap of the run heads.
+
+    Each run keeps one entry (value, run index) in the heap, ties go to the
+    lower run index so equal values keep their run order. The output is
+    collected in an int64 buffer and written in blocks.
+    """
+    heap = []
+    for index, run in enumerate(runs):
+        for value in run:
+            heap.append((value, index))
+            break
+    heapq.heapify(heap)
+
+    out = int_array('q')
+    with open(path, 'wb') as file:
+        while heap:
+            value, index = heap[0]
+            out.append(value)
+            if len(out) >= buffer_items:
+                out.tofile(file)
+                out = int_array('q')
+            following = next(runs[index], None)
+            if following is None:
+                heapq.heappop(heap)
+            else:
+                heapq.heapreplace(heap, (following, index))
+        out.tofile(file)
+
+
+def external_sort_file(source, target, memory=MEMORY_BUDGET, fan_in=FAN_IN, tmpdir=None):
+    """
+    Sorts a file of native int64 values that may not fit in memory.
+
+    The file is read in chunks that fit in the memory budget, every chunk is
+    sorted with merge_sort_fast and written to a run file. The runs are then
+    merged fan_in at a time with a heap (kway_merge), pass after pass, until
+    the last pass writes target. Every run read and the output get an equal
+    share of the memory budget as their buffer.
+
+    Parameters:
+    source (str): File to sort, raw int64 in native byte order.
+    target (str): File to write, may be the same as source.
+    memory (int): Memory budget in bytes.
+    fan_in (int): Runs merged at once, at least 2.
+    tmpdir (str): Directory for the run files, the system temp directory by default.
+
+    Returns:
+    dict: Number of elements, run files formed and merge passes.
+    """
+    fan_in = max(2, fan_in)
+    size = os.path.getsize(source)
+    if size % ITEM_BYTES:
+        raise ValueError(f'{source} is not a file of int64 values ({size} bytes)')
+    run_items = max(1, memory // ELEMENT_BYTES)
+    buffer_items = max(1, memory // ((fan_in + 1) * ITEM_BYTES))
+
+    workdir = tempfile.mkdtemp(prefix='external_sort_', dir=tmpdir)
+    result = None
+    try:
+        # Run formation: sort every chunk that fits in memory
+        runs = []
+        with open(source, 'rb') as file:
+            while True:
+                chunk = read_block(file, run_items).tolist()
+                if not chunk:
+                    break
+                merge_sort_fast(chunk, 0, len(chunk) - 1)
+                path = os.path.join(workdir, f'run{len(runs)}')
+                with open(path, 'wb') as out:
+                    int_array('q', chunk).tofile(out)
+                runs.append(path)
+                del chunk
+
+        formed = len(runs)
+        passes = 0
+        while len(runs) > fan_in:
+            # Not enough buffers to merge everything at once, merge groups into longer runs
+            merged = []
+            for start in range(0, len(runs), fan_in):
+                group = runs[start:start + fan_in]
+                path = os.path.join(workdir, f'pass{passes}_{len(merged)}')
+                kway_merge([iter_run(run, buffer_items) for run in group], path, buffer_items)
+                for run in group:
+                    os.remove(run)
+                merged.append(path)
+            runs = merged
+            passes += 1
+
+        # Last pass, written next to the target so the rename over it stays on one filesystem
+        handle, result = tempfile.mkstemp(prefix='.external_sort_', dir=os.path.dirname(os.path.abspath(target)))
+        os.close(handle)
+        kway_merge([iter_run(run, buffer_items) for run in runs], result, buffer_items)
+        if runs:
+            passes += 1
+        os.replace(result, target)
+        result = None
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+        if result is not None:
+            os.remove(result) # The merge failed part way
+    return {'elements': size // ITEM_BYTES, 'runs': formed, 'passes': passes}
+
+
+class Head:
+    #Run head in the heap of the visual merge, counts the comparisons the heap makes
+    __slots__ = ('value', 'run', 'counters')
+
+    def __init__(self, value, run, counters):
+        self.value = value
+        self.run = run
+        self.counters = counters
+
+    def __lt__(self, other):
+        self.counters.comparisons += 1
+        return (self.value, self.run) < (other.value, other.run)
+
+
+def merge_group(source, target, bounds, counters):
+    """
+    Heap merges the sorted runs source[bounds[i]:bounds[i + 1]] into target[bounds[0]:bounds[-1]].
+
+    Yield:
+    Step: A WRITE for every element written into target.
+    """
+    positions = list(bounds[:-1]) # Next element of every run
+    heap = [Head(source[start], run, counters) for run, start in enumerate(positions) if start < bounds[run + 1]]
+    heapq.heapify(heap)
+    k = bounds[0]
+    while heap:
+        head = heap[0]
+        target[k] = head.value
+        yield Step(WRITE, k, head.value)
+        k += 1
+        run = head.run
+        positions[run] += 1
+        if positions[run] < bounds[run + 1]:
+            heapq.heapreplace(heap, Head(source[positions[run]], run, counters))
+        else:
+            heapq.heappop(heap)
+    counters.writes += bounds[-1] - bounds[0]
+
+
+def external_sort(arr, low, high, *args, runs=VISUAL_RUNS, fan_in=VISUAL_FAN_IN, counters=None):
+    """
+    Visual version of external_sort_file, on a list instead of a file.
+
+    The array is cut into runs chunks that are merge sorted one after the
+    other (run formation), then the runs are heap merged fan_in at a time,
+    pass after pass, back and forth between the array and one scratch
+    buffer like natural_merge_sort.
+
+    Parameters:
+    arr (list): The list to be sorted.
+    low (int): Start index of array.
+    high (int): End index of array.
+    runs (int): Number of runs, the chunks the memory budget would give.
+    fan_in (int): Runs merged at once.
+    counters (Counters): Receives the operation counts, optional.
+
+    Yield:
+    Step: The steps of the run being formed, then a WRITE for every element
+    a merge pass writes, then DONE.
+    """
+    counters = counters or Counters()
+    fan_in = max(2, fan_in)
+    if high <= low:
+        yield Step(DONE)
+        return
+
+    n = high - low + 1
+    count = max(1, min(runs, n))
+    bounds = [low + n * i // count for i in range(count)] + [high + 1]
+    for i in range(count):
+        yield from merge_sort_range(arr, bounds[i], bounds[i + 1] - 1, counters)
+
+    buffer = list(arr)
+    counters.allocate(len(buffer))
+    source, target = arr, buffer
+    while len(bounds) > 2:
+        merged = [bounds[0]]
+        for start in range(0, len(bounds) - 1, fan_in):
+            group = bounds[start:start + fan_in + 1]
+            yield from merge_group(source, target, group, counters)
+            merged.append(group[-1])
+        bounds = merged
+        source, target = target, source
+
+    if source is not arr:
+        # Odd number of passes, copy the result back into the array
+        for k in range(low, high + 1):
+            arr[k] = source[k]
+            counters.writes += 1
+            yield Step(WRITE, k, arr[k])
+    counters.free(len(buffer))
+    yield Step(DONE)
+
+
+def external_sort_fast(arr, low, high, *args, memory=MEMORY_BUDGET, fan_in=FAN_IN):
+    """
+    Sorts arr[low..high] with external_sort_file, through run files on disk.
+
+    Values that do not fit in 64 bits are sorted with merge_sort_fast instead.
+
+    Returns:
+    list: The sorted list.
+    """
+    if high <= low:
+        return arr
+    try:
+        values = int_array('q', arr[low:high + 1])
+    except (OverflowError, TypeError):
+        return merge_sort_fast(arr, low, high)
+
+    with tempfile.TemporaryDirectory(prefix='external_sort_') as workdir:
+        path = os.path.join(workdir, 'values')
+        with open(path, 'wb') as file:
+            values.tofile(file)
+        del values
+        external_sort_file(path, path, memory, fan_in, workdir)
+        with open(path, 'rb') as file:
+            arr[low:high + 1] = read_block(file, high - low + 1).tolist()
+    return arr
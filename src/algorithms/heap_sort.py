@@ -0,0 +1,86 @@
+from .counters import Counters
+from .events import Step, SWAP
+
+
+def heap_sort(arr, low, high, *args, counters=None):
+    """
+    Sorts arr[low..high] in ascending order using the heap sort algorithm.
+    quick_sort falls back to it when a range recurses too deep.
+
+    Parameters:
+    arr (list): The list to be sorted.
+    low (int): Start index of the range.
+    high (int): End index of the range.
+    counters (Counters): Receives the operation counts, optional.
+
+    Yield:
+    Step: Every swap. There is no DONE step, the range is part of a bigger sort.
+    """
+    counters = counters or Counters()
+    n = high - low + 1
+
+    # Build a max heap, children of i are 2i + 1 and 2i + 2 (relative to low)
+    for start in range(n // 2 - 1, -1, -1):
+        yield from sift_down(arr, low, start, n, counters)
+
+    # Move the biggest element behind the heap and restore the heap
+    for end in range(n - 1, 0, -1):
+        arr[low], arr[low + end] = arr[low + end], arr[low]
+        counters.swaps += 1
+        counters.writes += 2
+        yield Step(SWAP, low, low + end)
+        yield from sift_down(arr, low, 0, end, counters)
+
+
+def sift_down(arr, low, root, size, counters):
+    """
+    Moves arr[low + root] down until the heap of the given size is valid again.
+    """
+    while True:
+        child = 2 * root + 1
+        if child >= size:
+            return
+        if child + 1 < size:
+            counters.comparisons += 1
+            if arr[low + child] < arr[low + child + 1]:
+                child += 1
+        counters.comparisons += 1
+        if arr[low + root] >= arr[low + child]:
+            return
+        arr[low + root], arr[low + child] = arr[low + child], arr[low + root]
+        counters.swaps += 1
+        counters.writes += 2
+        yield Step(SWAP, low + root, low + child)
+        root = child
+
+
+def heap_sort_fast(arr, low, high, *args):
+    """
+    Same algorithm as heap_sort without yielding.
+
+    Returns:
+    list: The list with arr[low..high] sorted.
+    """
+    n = high - low + 1
+    for start in range(n // 2 - 1, -1, -1):
+        sift_down_fast(arr, low, start, n)
+    for end in range(n - 1, 0, -1):
+        arr[low], arr[low + end] = arr[low + end], arr[low]
+        sift_down_fast(arr, low, 0, end)
+    return arr
+
+
+def sift_down_fast(arr, low, root, size):
+    """
+    Same as sift_down without yielding.
+    """
+    while True:
+        child = 2 * root + 1
+        if child >= size:
+            return
+        if child + 1 < size and arr[low + child] < arr[low + child + 1]:
+            child += 1
+        if arr[low + root] >= arr[low + child]:
+            return
+        arr[low + root], arr[low + child] = arr[low + child], arr[low + root]
+        root = child
@@ -0,0 +1,52 @@
+from .counters import Counters
+from .events import Step, WRITE
+
+
+def insertion_sort(arr, low, high, *args, counters=None):
+    """
+    Sorts arr[low..high] in ascending order using the insertion sort algorithm.
+    Used by the other sorts for small ranges, where it beats them.
+
+    Parameters:
+    arr (list): The list to be sorted.
+    low (int): Start index of the range.
+    high (int): End index of the range.
+    counters (Counters): Receives the operation counts, optional.
+
+    Yield:
+    Step: Every write, shifts and the drop of the element into its hole.
+    There is no DONE step, the range is part of a bigger sort.
+    """
+    counters = counters or Counters()
+    for i in range(low + 1, high + 1):
+        key = arr[i]
+        j = i - 1
+        while j >= low:
+            counters.comparisons += 1
+            if arr[j] <= key:
+                break
+            arr[j + 1] = arr[j] # Shift the bigger element right
+            counters.writes += 1
+            yield Step(WRITE, j + 1, arr[j])
+            j -= 1
+        if j + 1 != i:
+            arr[j + 1] = key # Drop the element into the hole
+            counters.writes += 1
+            yield Step(WRITE, j + 1, key)
+
+
+def insertion_sort_fast(arr, low, high, *args):
+    """
+    Same algorithm as insertion_sort without yielding.
+
+    Returns:
+    list: The list with arr[low..high] sorted.
+    """
+    for i in range(low + 1, high + 1):
+        key = arr[i]
+        j = i - 1
+        while j >= low and arr[j] > key:
+            arr[j + 1] = arr[j]
+            j -= 1
+        arr[j + 1] = key
+    return arr
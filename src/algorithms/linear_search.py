@@ -1,23 +1,43 @@
-def linear_search(arr, target, *args):
+from .counters import Counters
+from .events import Step, COMPARE, FOUND, DONE
+
+
+def linear_search(arr, target, *args, counters=None):
     """
     Perform a linear search for the target in the given array.
 
     Parameters:
     arr (list): The list to search through.
     target: The value to search for.
+    counters (Counters): Receives the operation counts, optional.
 
     Yields:
-    tuple: The array, redBar1, redBar2, blueBar1, blueBar2.
+    Step: Every element looked at, then FOUND with the index of the target or DONE.
 
     """
+    counters = counters or Counters()
     for index, value in enumerate(arr):
+        counters.comparisons += 1
         if value == target:
             # If a match is found, highlight the found target
-            yield arr, index, -1, index, -1  # Found target (index is blueBar1, no redBar2 or blueBar2)
+            yield Step(FOUND, index)  # Found target
             return  # Stop the search after finding the target
         else:
-            # Yield the current index being checked (highlight in red)
-            yield arr, index, -1, -1, -1  # Current index is redBar1, no other bars highlighted
+            # Yield the current index being checked
+            yield Step(COMPARE, index)
 
     # If the target is not found, end the search
-    yield arr, -1, -1, -1, -1  # No bars highlighted after search ends
+    yield Step(DONE)
+
+
+def linear_search_fast(arr, target, *args):
+    """
+    Same search as linear_search without yielding.
+
+    Returns:
+    int: Index of the first match, or -1 if the target is not in the array.
+    """
+    for index, value in enumerate(arr):
+        if value == target:
+            return index
+    return -1
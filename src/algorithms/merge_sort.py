@@ -1,4 +1,9 @@
-def merge_sort(array, left, right):
+from .counters import Counters
+from .insertion_sort import insertion_sort, insertion_sort_fast
+from .events import Step, COMPARE, SWAP, WRITE, DONE
+
+
+def merge_sort(array, left, right, counters=None):
     """
     Sorts a given array using the Merge Sort algorithm.
 
@@ -8,26 +13,86 @@ def merge_sort(array, left, right):
     is repeated until the entire list is sorted. 
 
     Time complexity: O(nlog²n).
+
+    counters (Counters) receives the operation counts, optional.
+    Yields a WRITE step for every write, then DONE.
+    """
+    counters = counters or Counters()
+    yield from merge_sort_range(array, left, right, counters)
+    yield Step(DONE)
+
+
+def merge_sort_range(array, left, right, counters):
+    """
+    The recursive part of merge_sort, sorts array[left..right] without the DONE step.
     """
     if left < right:
+        counters.enter()
         mid = int((left + right) / 2)
-        yield from merge_sort(array, left, mid)
-        yield from merge_sort(array, mid + 1, right)
-        yield from merge(array, left, mid, right)
+        yield from merge_sort_range(array, left, mid, counters)
+        yield from merge_sort_range(array, mid + 1, right, counters)
+        yield from merge(array, left, mid, right, counters)
+        counters.leave()
 
 
-def merge(array, left, mid, right):
+def merge(array, left, mid, right, counters=None):
     """
     Merges two sorted arrays into a single sorted array.
     """
+    counters = counters or Counters()
+    bottom = array[left:mid + 1]
+    top = array[mid + 1:right + 1]
+    counters.allocate(right - left + 1)
+    i = 0
+    j = 0
+    k = left
+    while i < len(bottom) and j < len(top):
+        counters.comparisons += 1
+        if bottom[i] < top[j]:
+            array[k] = bottom[i]
+            i += 1
+        else:
+            array[k] = top[j]
+            j += 1
+        yield Step(WRITE, k, array[k])
+        k += 1
+    while i < len(bottom):
+        array[k] = bottom[i]
+        yield Step(WRITE, k, array[k])
+        i += 1
+        k += 1
+    while j < len(top):
+        array[k] = top[j]
+        yield Step(WRITE, k, array[k])
+        j += 1
+        k += 1
+    counters.writes += right - left + 1
+    counters.free(right - left + 1)
+
+
+def merge_sort_fast(array, left, right):
+    """
+    Same algorithm as merge_sort without yielding, for timing and large inputs.
+    Splits at the same midpoints and merges with the same comparison.
+    """
+    if left < right:
+        mid = int((left + right) / 2)
+        merge_sort_fast(array, left, mid)
+        merge_sort_fast(array, mid + 1, right)
+        merge_fast(array, left, mid, right)
+    return array
+
+
+def merge_fast(array, left, mid, right):
+    """
+    Merges two sorted arrays into a single sorted array, without yielding.
+    """
     bottom = array[left:mid + 1]
     top = array[mid + 1:right + 1]
     i = 0
     j = 0
     k = left
     while i < len(bottom) and j < len(top):
-        # The two lines below are not part of the algorithm
-        yield array, left + i, mid + j, left, right
         if bottom[i] < top[j]:
             array[k] = bottom[i]
             i += 1
@@ -42,4 +107,207 @@ def merge(array, left, mid, right):
     while j < len(top):
         array[k] = top[j]
         j += 1
-        k += 1
\ No newline at end of file
+        k += 1
+
+
+MIN_RUN = 16 # Runs shorter than this are extended with insertion sort
+
+
+def natural_merge_sort(array, left, right, counters=None):
+    """
+    Sorts a given array using a bottom-up natural merge sort.
+
+    The array is first split into the runs it already has (descending runs
+    are reversed) and short runs are extended to MIN_RUN with insertion
+    sort. Neighbouring runs are then merged pass by pass, back and forth
+    between the array and one scratch buffer that is allocated once, so
+    nearly sorted input finishes in about O(n).
+
+    Time complexity: O(nlogn), O(n) on sorted input.
+
+    counters (Counters) receives the operation counts, optional.
+    Writes into the scratch buffer are yielded as WRITE steps like writes
+    into the array. Every pass writes the whole range, so applying all the
+    steps to one copy of the array shows each pass as if it ran in place.
+    """
+    counters = counters or Counters()
+    if right <= left:
+        yield Step(DONE)
+        return
+
+    runs = yield from find_runs(array, left, right, counters)
+
+    buffer = list(array) # The one scratch buffer, a copy so it never shows stale zeros
+    counters.allocate(len(buffer))
+    source, target = array, buffer
+    while len(runs) > 2:
+        merged = [runs[0]]
+        for index in range(0, len(runs) - 1, 2):
+            low = runs[index]
+            mid = runs[index + 1]
+            high = runs[index + 2] if index + 2 < len(runs) else mid
+            yield from merge_runs(source, target, low, mid, high, counters)
+            merged.append(high)
+        runs = merged
+        source, target = target, source
+
+    if source is not array:
+        # Odd number of passes, copy the result back into the array
+        for k in range(left, right + 1):
+            array[k] = source[k]
+            counters.writes += 1
+            yield Step(WRITE, k, array[k])
+    counters.free(len(buffer))
+    yield Step(DONE)
+
+
+def find_runs(array, left, right, counters):
+    """
+    Splits array[left..right] into sorted runs of at least MIN_RUN elements.
+
+    Returns:
+    list: Start index of every run followed by right + 1.
+    """
+    runs = []
+    start = left
+    while start <= right:
+        end = start + 1 # Run is array[start:end]
+        if end <= right:
+            counters.comparisons += 1
+            yield Step(COMPARE, start, end)
+            if array[end] < array[start]:
+                # Strictly descending run, strict so reversing it keeps equal values in order
+                while end < right:
+                    counters.comparisons += 1
+                    if not array[end + 1] < array[end]:
+                        break
+                    end += 1
+                end += 1
+                i, j = start, end - 1
+                while i < j:
+                    array[i], array[j] = array[j], array[i]
+                    counters.swaps += 1
+                    counters.writes += 2
+                    yield Step(SWAP, i, j)
+                    i += 1
+                    j -= 1
+            else:
+                while end < right:
+                    counters.comparisons += 1
+                    if array[end + 1] < array[end]:
+                        break
+                    end += 1
+                end += 1
+
+        if end - start < MIN_RUN and end <= right:
+            end = min(start + MIN_RUN, right + 1)
+            yield from insertion_sort(array, start, end - 1, counters=counters)
+        runs.append(start)
+        start = end
+    runs.append(right + 1)
+    return runs
+
+
+def merge_runs(source, target, low, mid, high, counters):
+    """
+    Merges the sorted runs source[low:mid] and source[mid:high] into target[low:high].
+    """
+    i = low
+    j = mid
+    k = low
+    while i < mid and j < high:
+        counters.comparisons += 1
+        if source[j] < source[i]:
+            target[k] = source[j]
+            j += 1
+        else:
+            target[k] = source[i]
+            i += 1
+        yield Step(WRITE, k, target[k])
+        k += 1
+    while i < mid:
+        target[k] = source[i]
+        yield Step(WRITE, k, target[k])
+        i += 1
+        k += 1
+    while j < high:
+        target[k] = source[j]
+        yield Step(WRITE, k, target[k])
+        j += 1
+        k += 1
+    counters.writes += high - low
+
+
+def natural_merge_sort_fast(array, left, right):
+    """
+    Same algorithm as natural_merge_sort without yielding.
+    """
+    if right <= left:
+        return array
+
+    runs = find_runs_fast(array, left, right)
+    buffer = list(array)
+    source, target = array, buffer
+    while len(runs) > 2:
+        merged = [runs[0]]
+        for index in range(0, len(runs) - 1, 2):
+            low = runs[index]
+            mid = runs[index + 1]
+            high = runs[index + 2] if index + 2 < len(runs) else mid
+            merge_runs_fast(source, target, low, mid, high)
+            merged.append(high)
+        runs = merged
+        source, target = target, source
+
+    if source is not array:
+        array[left:right + 1] = source[left:right + 1]
+    return array
+
+
+def find_runs_fast(array, left, right):
+    """
+    Same as find_runs without yielding.
+    """
+    runs = []
+    start = left
+    while start <= right:
+        end = start + 1
+        if end <= right:
+            if array[end] < array[start]:
+                while end < right and array[end + 1] < array[end]:
+                    end += 1
+                end += 1
+                array[start:end] = array[start:end][::-1]
+            else:
+                while end < right and not array[end + 1] < array[end]:
+                    end += 1
+                end += 1
+
+        if end - start < MIN_RUN and end <= right:
+            end = min(start + MIN_RUN, right + 1)
+            insertion_sort_fast(array, start, end - 1)
+        runs.append(start)
+        start = end
+    runs.append(right + 1)
+    return runs
+
+
+def merge_runs_fast(source, target, low, mid, high):
+    """
+    Same as merge_runs without yielding.
+    """
+    i = low
+    j = mid
+    k = low
+    while i < mid and j < high:
+        if source[j] < source[i]:
+            target[k] = source[j]
+            j += 1
+        else:
+            target[k] = source[i]
+            i += 1
+        k += 1
+    if i < mid:
+        target[k:high] = source[i:mid]
+    else:
+        target[k:high] = source[j:high]
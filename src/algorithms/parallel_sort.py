@@ -0,0 +1,306 @@
+import os
+from array import array as int_array
+from bisect import bisect_left, bisect_right
+from multiprocessing import Pool, resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+from .counters import Counters
+from .merge_sort import merge, merge_fast, merge_sort_range, merge_sort_fast
+from .events import Step, WRITE, DONE
+
+PARALLEL_CUTOFF = 50000 # Smaller arrays are sorted in this process, a pool costs more than it saves
+VISUAL_WORKERS = 4 # Partitions shown by the visual version
+
+
+def split(low, high, workers):
+    """
+    Splits low..high into at most workers chunks of nearly equal size.
+
+    Returns:
+    list: Start index of every chunk followed by high + 1.
+    """
+    n = high - low + 1
+    workers = max(1, min(workers, n))
+    return [low + n * i // workers for i in range(workers)] + [high + 1]
+
+
+def interleave(generators):
+    """
+    Steps the generators round robin until they are all exhausted, so their
+    steps show up as if they were running at the same time.
+    """
+    active = list(generators)
+    while active:
+        for generator in list(active):
+            try:
+                yield next(generator)
+            except StopIteration:
+                active.remove(generator)
+
+
+def split_point(values, bounds, rank):
+    """
+    Cuts the sorted chunks values[bounds[i]:bounds[i + 1]] so that exactly
+    rank elements lie left of the cuts and none of them is bigger than an
+    element right of them. Equal elements are taken from the earlier chunks
+    first, so merging the parts keeps equal elements in chunk order.
+
+    Every step is a bisect inside one chunk, so this costs O(k² log² n) for
+    k chunks whatever the values are, duplicates included.
+
+    Returns:
+    list: The cut index in every chunk.
+    """
+    chunks = range(len(bounds) - 1)
+
+    def count_at_most(value):
+        return sum(bisect_right(values, value, bounds[c], bounds[c + 1]) - bounds[c] for c in chunks)
+
+    # The element of this rank is the smallest one with more than rank elements at most it
+    pivot = None
+    for c in chunks:
+        lo, hi = bounds[c], bounds[c + 1]
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if count_at_most(values[mid]) > rank:
+                hi = mid
+            else:
+                lo = mid + 1
+        if lo < bounds[c + 1] and (pivot is None or values[lo] < pivot):
+            pivot = values[lo]
+    if pivot is None:
+        return list(bounds[1:]) # The rank is past the last element
+
+    cuts = [bisect_left(values, pivot, bounds[c], bounds[c + 1]) for c in chunks]
+    missing = rank - sum(cuts[c] - bounds[c] for c in chunks)
+    for c in chunks:
+        take = min(missing, bisect_right(values, pivot, bounds[c], bounds[c + 1]) - cuts[c])
+        cuts[c] += take
+        missing -= take
+    return cuts
+
+
+def merge_plan(values, bounds, parts):
+    """
+    Splits the k-way merge of the sorted chunks into parts that can run independently.
+
+    Returns:
+    list: One (slices, offset) pair per part: the (start, stop) slice of
+    every chunk that goes into the part and where the part starts in the
+    merged output, counted from bounds[0].
+    """
+    n = bounds[-1] - bounds[0]
+    ranks = [n * p // parts for p in range(parts)] + [n]
+    rows = [list(bounds[:-1])] + [split_point(values, bounds, rank) for rank in ranks[1:-1]] + [list(bounds[1:])]
+    return [(list(zip(rows[p], rows[p + 1])), ranks[p]) for p in range(parts)]
+
+
+def gather(slices, offset):
+    #Run starts of the slices once they are copied side by side from offset, followed by the end of the last one
+    starts = [offset]
+    for start, stop in slices:
+        if start < stop:
+            starts.append(starts[-1] + stop - start)
+    return starts
+
+
+def merge_pairwise(array, starts, counters):
+    """
+    Merges the sorted runs array[starts[i]:starts[i + 1]] into one with
+    merge_sort's merge, neighbouring runs two by two, pass after pass.
+
+    Yield:
+    Step: The WRITE steps of every merge.
+    """
+    while len(starts) > 2:
+        merged = [starts[0]]
+        for i in range(0, len(starts) - 2, 2):
+            stop = starts[i + 2] if i + 2 < len(starts) else starts[i + 1]
+            yield from merge(array, starts[i], starts[i + 1] - 1, stop - 1, counters)
+            merged.append(stop)
+        if len(starts) % 2 == 0:
+            merged.append(starts[-1]) # Odd run out, merged in the next pass
+        starts = merged
+
+
+def merge_pairwise_fast(array, starts):
+    #Same as merge_pairwise without yielding
+    while len(starts) > 2:
+        merged = [starts[0]]
+        for i in range(0, len(starts) - 2, 2):
+            stop = starts[i + 2] if i + 2 < len(starts) else starts[i + 1]
+            merge_fast(array, starts[i], starts[i + 1] - 1, stop - 1)
+            merged.append(stop)
+        if len(starts) % 2 == 0:
+            merged.append(starts[-1])
+        starts = merged
+
+
+def merge_part(arr, aux, low, slices, offset, counters):
+    """
+    Visual merge of one part: the slices of aux (a copy of arr from index
+    low) are copied side by side into arr from index low + offset, then
+    merged there with merge_pairwise.
+
+    Yield:
+    Step: A WRITE for every element copied, then the steps of the merges.
+    """
+    k = low + offset
+    for start, stop in slices:
+        for i in range(start - low, stop - low):
+            arr[k] = aux[i]
+            counters.writes += 1
+            yield Step(WRITE, k, arr[k])
+            k += 1
+    yield from merge_pairwise(arr, gather(slices, low + offset), counters)
+
+
+def parallel_sort(arr, low, high, *args, workers=VISUAL_WORKERS, counters=None):
+    """
+    Visual version of parallel_sort_fast.
+
+    The array is split into one partition per worker and every partition is
+    merge sorted; the steps of the partitions are interleaved so they sort
+    side by side. The sorted partitions are then merged in one k-way merge,
+    cut into one part per worker by split_point, every part merges its
+    slices pairwise with merge_sort's merge, and the parts are interleaved
+    too. Everything runs in this process, the interleaving only
+    shows how the work is divided.
+
+    Parameters:
+    arr (list): The list to be sorted.
+    low (int): Start index of array.
+    high (int): End index of array.
+    workers (int): Number of partitions.
+    counters (Counters): Receives the operation counts, optional.
+
+    Yield:
+    Step: The steps of whichever partition just took one, then DONE.
+    """
+    counters = counters or Counters()
+    if high <= low:
+        yield Step(DONE)
+        return
+
+    bounds = split(low, high, workers)
+    yield from interleave(merge_sort_range(arr, bounds[i], bounds[i + 1] - 1, counters) for i in range(len(bounds) - 1))
+
+    if len(bounds) > 2:
+        plan = merge_plan(arr, bounds, len(bounds) - 1)
+        aux = arr[low:high + 1]
+        counters.allocate(len(aux))
+        yield from interleave(merge_part(arr, aux, low, slices, offset, counters) for slices, offset in plan)
+        counters.free(len(aux))
+
+    yield Step(DONE)
+
+
+def make_pool(workers):
+    """
+    Starts a pool for parallel_sort_fast.
+
+    The resource tracker is started first so the workers share it with this
+    process. Otherwise each worker starts its own tracker when it opens the
+    shared memory block and unlinks the block when the worker exits.
+    """
+    resource_tracker.ensure_running()
+    return Pool(workers)
+
+
+def sort_chunk(name, low, high):
+    #Worker: sorts shared[low:high] with merge_sort_fast
+    shared = SharedMemory(name=name)
+    view = shared.buf.cast('q')
+    try:
+        values = view[low:high].tolist()
+        merge_sort_fast(values, 0, len(values) - 1)
+        view[low:high] = int_array('q', values)
+    finally:
+        view.release()
+        shared.close()
+
+
+def merge_chunks(name, out_name, slices, offset):
+    #Worker: merges the slices of shared into out[offset:] with merge_pairwise_fast
+    shared = SharedMemory(name=name)
+    out = SharedMemory(name=out_name)
+    view = shared.buf.cast('q')
+    target = out.buf.cast('q')
+    try:
+        values = []
+        for start, stop in slices:
+            values += view[start:stop].tolist()
+        merge_pairwise_fast(values, gather(slices, 0))
+        target[offset:offset + len(values)] = int_array('q', values)
+    finally:
+        view.release()
+        target.release()
+        shared.close()
+        out.close()
+
+
+def parallel_sort_fast(arr, low, high, *args, workers=None, pool=None):
+    """
+    Sorts arr[low..high] on several cores.
+
+    The values are copied into a multiprocessing.shared_memory block, split
+    into one chunk per worker and every chunk is merge sorted in a process
+    pool. The sorted chunks are then merged in a single k-way merge. It is
+    cut by rank into one part per worker (see split_point), and every worker
+    merges its slices of all the chunks into a second block, pairwise with
+    merge_sort's merge_fast (see merge_pairwise). The merge runs in parallel
+    too, in log k passes over each part instead of log k passes over the
+    whole array.
+
+    Only integers that fit in 64 bits can be shared this way; other input,
+    a single worker and arrays smaller than PARALLEL_CUTOFF are sorted with
+    merge_sort_fast in this process.
+
+    Parameters:
+    arr (list): The list to be sorted.
+    low (int): Start index of array.
+    high (int): End index of array.
+    workers (int): Number of chunks and processes, all cores by default.
+    pool (Pool): Reuse this pool (of workers processes, see make_pool) instead of starting one.
+
+    Returns:
+    list: The sorted list.
+    """
+    workers = workers or os.cpu_count() or 1
+    n = high - low + 1
+    if workers < 2 or n < PARALLEL_CUTOFF:
+        return merge_sort_fast(arr, low, high)
+    try:
+        values = int_array('q', arr[low:high + 1])
+    except (OverflowError, TypeError):
+        return merge_sort_fast(arr, low, high)
+
+    shared = SharedMemory(create=True, size=values.itemsize * n)
+    out = SharedMemory(create=True, size=values.itemsize * n)
+    view = shared.buf.cast('q')
+    target = out.buf.cast('q')
+    own_pool = pool is None
+    try:
+        view[:] = values
+        del values
+        if own_pool:
+            pool = make_pool(workers)
+
+        bounds = split(0, n - 1, workers)
+        pool.starmap(sort_chunk, [(shared.name, bounds[i], bounds[i + 1]) for i in range(len(bounds) - 1)])
+
+        # The split points are found with bisects on the shared block, the merge itself runs in the workers
+        plan = merge_plan(view, bounds, len(bounds) - 1)
+        pool.starmap(merge_chunks, [(shared.name, out.name, slices, offset) for slices, offset in plan])
+
+        arr[low:high + 1] = target.tolist()
+    finally:
+        if own_pool and pool is not None:
+            pool.close()
+            pool.join()
+        view.release()
+        target.release()
+        for block in (shared, out):
+            block.close()
+            block.unlink()
+    return arr
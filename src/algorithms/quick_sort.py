@@ -1,80 +1,228 @@
-#from src.analysis.analyzer import timer
 #import random
+from .counters import Counters
+from .insertion_sort import insertion_sort, insertion_sort_fast
+from .heap_sort import heap_sort, heap_sort_fast
+from .events import Step, COMPARE, SWAP, PIVOT, DONE
 
-#@timer
-def quick_sort(arr, low, high, *args):
+INSERTION_CUTOFF = 16 # Ranges this small are finished with insertion sort
+NINTHER_CUTOFF = 40 # Ranges bigger than this use the ninther to pick the pivot
+
+def quick_sort(arr, low, high, *args, counters=None):
     """
     Sorts the given array in ascending order using the quick sort algorithm.
 
+    This is an introsort: the ranges still to sort are kept on a stack
+    instead of recursing, the pivot is the median of three (or the ninther
+    for big ranges), and the range is split three ways so duplicates of the
+    pivot are finished in one pass. Ranges that go deeper than 2*log2(n)
+    fall back to heap sort and small ranges are finished with insertion
+    sort, so the worst case is O(nlogn).
+
     Parameters:
     arr (list): The list to be sorted.
     low (int): Start index of array.
     high (int): End index of array.
-    
+    counters (Counters): Receives the operation counts, optional.
+
     Yield:
-    tuple: Array, pivot, left pointer, right pointer
+    Step: Comparisons, swaps and writes, the pivot of every partition, then DONE
 
     Returns:
     list: The sorted list.
     """
-    if low < high:
-        pi, yield_array = yield from partition(arr, low, high) # Partition array and yield current value
-        
-        yield from quick_sort(arr, low, pi - 1) # Left side
-        yield from quick_sort(arr, pi + 1, high) # Right side
-        
-        yield arr, None, None, None, None # Yield sorted array
-        
-def partition(arr, low, high):
-    """
-    Partition the array around a pivot.
-    The last element is the pivot.
-
-   Yield:
-   tuple: Pivot index, array, and current index
-   
-    """
-    pivot = arr[high] # Select last element
-    i = low - 1 # Pointer for next greater element
-    pivot_index = high # Track pivot index
-    
-    for j in range(low, high):
-        yield arr, pivot_index, i, j, None # Yield current state of array
-        
-        if arr[j] < pivot: # Swap if current element is smaller than pivot
+    counters = counters or Counters()
+    depth_limit = 2 * max(high - low + 1, 1).bit_length()
+    stack = [(low, high, 0)]
+    while stack:
+        low, high, depth = stack.pop()
+        if depth > counters.max_depth:
+            counters.max_depth = depth
+
+        if high - low + 1 <= INSERTION_CUTOFF:
+            yield from insertion_sort(arr, low, high, counters=counters)
+            continue
+        if depth > depth_limit:
+            yield from heap_sort(arr, low, high, counters=counters)
+            continue
+
+        pivot_index = yield from choose_pivot(arr, low, high, counters)
+        lt, gt = yield from partition(arr, low, high, pivot_index, counters)
+
+        # Push the bigger side first so the smaller one is sorted next and the stack stays O(logn)
+        if lt - low > high - gt:
+            stack.append((low, lt - 1, depth + 1))
+            stack.append((gt + 1, high, depth + 1))
+        else:
+            stack.append((gt + 1, high, depth + 1))
+            stack.append((low, lt - 1, depth + 1))
+
+    yield Step(DONE) # Array is sorted
+
+def choose_pivot(arr, low, high, counters):
+    """
+    Picks the pivot of arr[low..high]: the median of the first, middle and
+    last element, or for big ranges the median of three such medians (ninther).
+
+    Returns:
+    int: Index of the pivot.
+    """
+    mid = (low + high) // 2
+    if high - low + 1 > NINTHER_CUTOFF:
+        step = (high - low + 1) // 8
+        first = yield from median_of_three(arr, low, low + step, low + 2 * step, counters)
+        middle = yield from median_of_three(arr, mid - step, mid, mid + step, counters)
+        last = yield from median_of_three(arr, high - 2 * step, high - step, high, counters)
+        return (yield from median_of_three(arr, first, middle, last, counters))
+    return (yield from median_of_three(arr, low, mid, high, counters))
+
+def median_of_three(arr, a, b, c, counters):
+    """
+    Returns the index of the median of arr[a], arr[b] and arr[c].
+    """
+    yield Step(COMPARE, a, b)
+    counters.comparisons += 2
+    if arr[a] < arr[b]:
+        yield Step(COMPARE, b, c)
+        if arr[b] < arr[c]:
+            return b
+        counters.comparisons += 1
+        yield Step(COMPARE, a, c)
+        return c if arr[a] < arr[c] else a
+    yield Step(COMPARE, a, c)
+    if arr[a] < arr[c]:
+        return a
+    counters.comparisons += 1
+    yield Step(COMPARE, b, c)
+    return c if arr[b] < arr[c] else b
+
+def partition(arr, low, high, pivot_index, counters=None):
+    """
+    Partition arr[low..high] three ways around the value at pivot_index
+    (Dutch national flag): smaller values end up left of lt, values equal to
+    the pivot in lt..gt and bigger values right of gt.
+
+    Yield:
+    Step: The pivot, then every comparison against it and every swap
+
+    Returns:
+    tuple: lt and gt
+    """
+    counters = counters or Counters()
+    pivot = arr[pivot_index]
+    lt = low # Everything left of lt is smaller than the pivot
+    i = low # Next element to look at
+    gt = high # Everything right of gt is bigger than the pivot
+
+    yield Step(PIVOT, pivot_index)
+    while i <= gt:
+        yield Step(COMPARE, i, pivot_index)
+
+        counters.comparisons += 1
+        if arr[i] < pivot: # Move smaller elements to the left block
+            if lt != i:
+                arr[lt], arr[i] = arr[i], arr[lt]
+                counters.swaps += 1
+                counters.writes += 2
+                yield Step(SWAP, lt, i)
+            if pivot_index == lt:
+                pivot_index = i # Keep highlighting the pivot bar if it moved
+            lt += 1
             i += 1
-            arr[i], arr[j] = arr[j], arr[i] 
-
-            yield arr, pivot_index, i, j, None # Yield array after swapping
-            
-    arr[i + 1], arr[high] = arr[high], arr[i +1] # Swap pivot element with element at i+1
-    
-    yield arr, pivot_index, i + 1, high, None # Yield array state after placing pivot
-    
-    return i + 1, arr # Return partitioning index
-   
-    #Old Code (Just in case we need it)
-    '''# Base case: if the array has one or no elements, it is already sorted
-    if len(arr) <= 1:
-        #yield arr, -1, -1, -1 # Sorted
-        return arr
-
-    # Choose a pivot element from the array (here we choose the middle element)
-    pivot = arr[len(arr) // 2]
-
-    # Partition the array into three lists:
-    # - left: elements less than the pivot
-    # - middle: elements equal to the pivot
-    # - right: elements greater than the pivot
-    left = [x for x in arr if x < pivot]   # Elements less than the pivot
-    middle = [x for x in arr if x == pivot] # Elements equal to the pivot
-    right = [x for x in arr if x > pivot]  # Elements greater than the pivot
-
-    # Recursively apply quick_sort to the left and right partitions
-    # and concatenate the results with the middle list
-    return quick_sort(left) + middle + quick_sort(right)  # Return the combined sorted array
-    '''
-    
+            continue
+
+        counters.comparisons += 1
+        if arr[i] > pivot: # Move bigger elements to the right block
+            arr[gt], arr[i] = arr[i], arr[gt]
+            counters.swaps += 1
+            counters.writes += 2
+            yield Step(SWAP, gt, i)
+            if pivot_index == gt:
+                pivot_index = i
+            gt -= 1
+        else:
+            i += 1
+
+    return lt, gt # Return the bounds of the pivot block
+
+def quick_sort_fast(arr, low, high, *args):
+    """
+    Same algorithm as quick_sort without yielding, for timing and large inputs.
+
+    Returns:
+    list: The sorted list.
+    """
+    depth_limit = 2 * max(high - low + 1, 1).bit_length()
+    stack = [(low, high, 0)]
+    while stack:
+        low, high, depth = stack.pop()
+        if high - low + 1 <= INSERTION_CUTOFF:
+            insertion_sort_fast(arr, low, high)
+            continue
+        if depth > depth_limit:
+            heap_sort_fast(arr, low, high)
+            continue
+
+        lt, gt = partition_fast(arr, low, high, choose_pivot_fast(arr, low, high))
+
+        if lt - low > high - gt:
+            stack.append((low, lt - 1, depth + 1))
+            stack.append((gt + 1, high, depth + 1))
+        else:
+            stack.append((gt + 1, high, depth + 1))
+            stack.append((low, lt - 1, depth + 1))
+    return arr
+
+def choose_pivot_fast(arr, low, high):
+    """
+    Same as choose_pivot without yielding.
+    """
+    mid = (low + high) // 2
+    if high - low + 1 > NINTHER_CUTOFF:
+        step = (high - low + 1) // 8
+        return median_of_three_fast(
+            arr,
+            median_of_three_fast(arr, low, low + step, low + 2 * step),
+            median_of_three_fast(arr, mid - step, mid, mid + step),
+            median_of_three_fast(arr, high - 2 * step, high - step, high),
+        )
+    return median_of_three_fast(arr, low, mid, high)
+
+def median_of_three_fast(arr, a, b, c):
+    """
+    Same as median_of_three without yielding.
+    """
+    if arr[a] < arr[b]:
+        if arr[b] < arr[c]:
+            return b
+        return c if arr[a] < arr[c] else a
+    if arr[a] < arr[c]:
+        return a
+    return c if arr[b] < arr[c] else b
+
+def partition_fast(arr, low, high, pivot_index):
+    """
+    Same three way partition as partition without yielding.
+
+    Returns:
+    tuple: lt and gt
+    """
+    pivot = arr[pivot_index]
+    lt = low
+    i = low
+    gt = high
+    while i <= gt:
+        value = arr[i]
+        if value < pivot:
+            arr[lt], arr[i] = value, arr[lt]
+            lt += 1
+            i += 1
+        elif value > pivot:
+            arr[gt], arr[i] = value, arr[gt]
+            gt -= 1
+        else:
+            i += 1
+    return lt, gt
+
 #test code:
 #arr = [random.randint(0, 100) for i in range(100)]
 #quick_sort(arr)
@@ -1,77 +1,188 @@
-#from src.analysis.analyzer import timer
 import random
+from .counters import Counters
+from .events import Step, COMPARE, WRITE, DONE
 
-#@timer
-def counting_sort(arr, exp, *args):
+try:
+    import numpy as np
+except ImportError: # NumPy is only used to speed up radix_sort_fast
+    np = None
+
+RADIX_BASE = 256 # Digits are 8 bits, so 32 bit values take 4 passes
+NUMPY_CUTOFF = 10000 # radix_sort_fast uses NumPy for arrays at least this big
+
+def counting_sort(source, target, shift, base, bias, count, *args, counters=None):
     """
-    A function to perform counting sort on the array based on the digit represented by exp.
-    
+    A function to perform one stable counting sort pass on the digit at shift.
+
     Parameters:
-    arr (list): The list to be sorted.
-    exp (int): The exponent representing the current digit place (1 for units, 10 for tens, etc.).
-    
+    source (list): The list to read from.
+    target (list): The list the pass writes into (same length as source).
+    shift (int): Bit position of the current digit (0 for the lowest digit, 8 for the next one in base 256, etc.).
+    base (int): Number of different digits, a power of two.
+    bias (int): Subtracted from every value first, so negative values sort correctly.
+    count (list): Reused count array of length base.
+    counters (Counters): Receives the operation counts, optional.
+
     Yield:
-    list: Array sorted at current index.
-    
-    Returns:
-    list: The sorted list based on the current digit.
+    Step: Every element read (COMPARE) and every write into target.
     """
-    n = len(arr)  # Get the length of the input array
-    output = [0] * n  # Output array to hold sorted values
-    count = [0] * 10  # Count array for digits 0-9
+    counters = counters or Counters()
+    n = len(source)  # Get the length of the input array
+    mask = base - 1
+    for digit in range(base):
+        count[digit] = 0  # Reset the counts of the previous pass
 
     # Count occurrences of each digit in the current place value
     for i in range(n):
-        index = (arr[i] // exp) % 10  # Get the digit at the current place value
+        index = ((source[i] - bias) >> shift) & mask  # Get the digit at the current place value
         count[index] += 1  # Increment the count for this digit
-        yield arr, i, None, None, None
+        yield Step(COMPARE, i)
 
-    # Change count[i] so that it contains the actual position of this digit in output[]
-    for i in range(1, 10):
+    # Change count[i] so that it contains the actual position of this digit in target[]
+    for i in range(1, base):
         count[i] += count[i - 1]  # Cumulative count
 
-    # Build the output array by placing elements in their correct position
+    # Build the target array by placing elements in their correct position
     for i in range(n - 1, -1, -1):  # Traverse the input array in reverse
-        index = (arr[i] // exp) % 10  # Get the digit at the current place value
-        output[count[index] - 1] = arr[i]  # Place the element in the output array
+        index = ((source[i] - bias) >> shift) & mask  # Get the digit at the current place value
         count[index] -= 1  # Decrement the count for this digit
-        yield arr, i, count[index], None, None
+        target[count[index]] = source[i]  # Place the element in the target array
+        counters.writes += 1
+        yield Step(WRITE, count[index], source[i])
 
-    # Copy the output array to arr[], so that arr[] now contains sorted numbers
-    for i in range(n):
-        arr[i] = output[i]  # Update the original array with sorted values
-        yield arr, i, count[index], None, None
-
-    #return arr  # Return the partially sorted array
-    yield arr, i, None, None, None # Yield array at current index
-
-#@timer
-def radix_sort(arr, *args):
+def radix_sort(arr, *args, base=RADIX_BASE, counters=None):
     """
-    Sorts the given array in ascending order using the radix sort algorithm.
+    Sorts the given array in ascending order using the LSD radix sort algorithm.
+
+    The values are biased by the minimum so negative numbers work and the
+    number of passes only depends on the range of the values. Passes go
+    back and forth between the array and one output buffer. Every pass
+    writes all elements, so its WRITE steps can be applied to one copy of
+    the array whichever list they went to.
 
     Parameters:
-    arr (list): The list to be sorted.
+    arr (list): The list of integers to be sorted.
+    base (int): Radix, a power of two (256 by default).
+    counters (Counters): Receives the operation counts, optional.
 
     Yield:
-    list: Array sorted at current index.
-    
+    Step: Reads and writes of every pass, then DONE
+
     Returns:
     list: The sorted list.
     """
-    # Find the maximum number to know the number of digits
-    max_num = max(arr)  # Get the maximum value in the array
+    counters = counters or Counters()
+    if base < 2 or base & (base - 1):
+        raise ValueError(f'radix base must be a power of two, got {base}')
+    if not arr:
+        yield Step(DONE)
+        return
+
+    bias = min(arr)  # Smallest value becomes key 0
+    span = max(arr) - bias  # Largest key, decides the number of passes
+    digit_bits = base.bit_length() - 1
+
+    output = list(arr)  # The one output buffer, reused by every pass
+    count = [0] * base
+    counters.allocate(len(output) + base)
 
-    # Apply counting sort to sort elements based on place value
-    exp = 1  # Start with the least significant digit
-    while max_num // exp > 0:  # Continue until we have processed all digits
-        yield from counting_sort(arr, exp)  # Sort the array based on the current digit
-        exp *= 10  # Move to the next digit place (units to tens to hundreds, etc.)
+    source, target = arr, output
+    shift = 0
+    while span >> shift > 0:  # Continue until we have processed all digits
+        yield from counting_sort(source, target, shift, base, bias, count, counters=counters)
+        source, target = target, source
+        shift += digit_bits  # Move to the next digit
+
+    if source is not arr:
+        # Odd number of passes, copy the result back into the array
+        for i in range(len(arr)):
+            arr[i] = source[i]
+            counters.writes += 1
+            yield Step(WRITE, i, arr[i])
+    counters.free(len(output) + base)
 
     #return arr  # Return the fully sorted array
-    yield arr, None, None, None, None # Final yield of sorted array
+    yield Step(DONE) # Final yield of sorted array
+
+def counting_sort_fast(source, target, shift, base, bias, count, *args):
+    """
+    Same counting sort pass as counting_sort without yielding.
+    """
+    mask = base - 1
+    for digit in range(base):
+        count[digit] = 0
+
+    for value in source:
+        count[((value - bias) >> shift) & mask] += 1
+
+    for i in range(1, base):
+        count[i] += count[i - 1]
+
+    for i in range(len(source) - 1, -1, -1):
+        value = source[i]
+        index = ((value - bias) >> shift) & mask
+        count[index] -= 1
+        target[count[index]] = value
+
+def radix_sort_fast(arr, *args, base=RADIX_BASE, use_numpy=True):
+    """
+    Same algorithm as radix_sort without yielding, for timing and large inputs.
+
+    When NumPy is installed, use_numpy is set and the array has at least
+    NUMPY_CUTOFF values that fit in 64 bits, every pass runs vectorized
+    (see radix_sort_numpy).
+
+    Returns:
+    list: The sorted list.
+    """
+    if base < 2 or base & (base - 1):
+        raise ValueError(f'radix base must be a power of two, got {base}')
+    if not arr:
+        return arr
+
+    bias = min(arr)
+    span = max(arr) - bias
+    if use_numpy and np is not None and len(arr) >= NUMPY_CUTOFF and -2**63 <= bias and bias + span < 2**63 and span < 2**63:
+        arr[:] = radix_sort_numpy(arr, base, bias, span)
+        return arr
+
+    digit_bits = base.bit_length() - 1
+    output = list(arr)
+    count = [0] * base
+    source, target = arr, output
+    shift = 0
+    while span >> shift > 0:
+        counting_sort_fast(source, target, shift, base, bias, count)
+        source, target = target, source
+        shift += digit_bits
+
+    if source is not arr:
+        arr[:] = source
+    return arr
+
+def radix_sort_numpy(arr, base, bias, span):
+    """
+    LSD radix sort with NumPy, one vectorized pass per digit.
+
+    Each pass extracts the digits with a shift and a mask and reorders the
+    values with a stable argsort of the digits, which NumPy runs as a
+    counting sort for 8 and 16 bit keys.
+
+    Returns:
+    list: The sorted values.
+    """
+    values = np.array(arr, dtype=np.int64)
+    keys = (values - np.int64(bias)).astype(np.uint64)  # Biased keys are never negative
+    digit_bits = base.bit_length() - 1
+    digit_type = np.uint8 if digit_bits <= 8 else np.uint16 if digit_bits <= 16 else np.uint64
+    mask = np.uint64(base - 1)
+    shift = 0
+    while span >> shift > 0:
+        digits = ((keys >> np.uint64(shift)) & mask).astype(digit_type)
+        order = np.argsort(digits, kind='stable')
+        keys = keys[order]
+        shift += digit_bits
+    return (keys.astype(np.int64) + np.int64(bias)).tolist()
 
 #arr = [random.randint(0, 100) for i in range(100)]
-#exp = 5
 #radix_sort(arr)
-#counting_sort(arr, exp)
@@ -0,0 +1,85 @@
+#Sorted index of an array, built once by the caller and passed to the searches that need sorted data
+from bisect import bisect_left
+
+try:
+    import numpy as np
+except ImportError: # Without NumPy the index is sorted and searched in Python
+    np = None
+
+
+def target_list(targets):
+    #targets as a list of values, a single value becomes a list of one
+    if np is not None:
+        return np.atleast_1d(np.asarray(targets)).tolist()
+    try:
+        return list(targets)
+    except TypeError:
+        return [targets]
+
+
+class SortedIndex:
+    """
+    The values of an array in sorted order, with the position every value
+    has in the array.
+
+    The order is stable, so among equal values the first one has the lowest
+    position and a lower bound search finds the same match linear_search
+    does. keys and positions are lists for the searches that probe one
+    element at a time; find_many searches the NumPy copies when NumPy is
+    installed.
+
+    The index is a snapshot: it holds its own copy of the values and does
+    not follow later changes to the array. Build a new one after changing
+    the array, and pass it to the *_fast searches with index= to reuse it
+    across queries.
+    """
+
+    def __init__(self, arr):
+        self.size = len(arr)
+        values = np.asarray(arr) if np is not None else None
+        if values is not None and values.dtype.kind in 'iuf' and values.ndim == 1:
+            order = np.argsort(values, kind='stable')
+            self.key_array = values[order]
+            self.position_array = order
+            self.keys = self.key_array.tolist()
+            self.positions = order.tolist()
+        else:
+            # No NumPy, or values it can not store natively, e.g. ints beyond 64 bits
+            self.positions = sorted(range(self.size), key=arr.__getitem__)
+            self.keys = [arr[i] for i in self.positions]
+            self.key_array = None
+            self.position_array = None
+        self.is_sorted = self.positions == list(range(self.size))
+
+    def find(self, target):
+        #Position of the first element equal to target, -1 if there is none
+        i = bisect_left(self.keys, target)
+        if i < self.size and self.keys[i] == target:
+            return self.positions[i]
+        return -1
+
+    def find_many(self, targets):
+        """
+        Looks up every target in one vectorized pass with numpy.searchsorted.
+
+        Parameters:
+        targets: A value or a sequence of values.
+
+        Returns:
+        np.ndarray: The position of the first match of every target, -1 where
+        there is none. A list without NumPy.
+        """
+        if np is None:
+            return [self.find(target) for target in target_list(targets)]
+        targets = np.atleast_1d(np.asarray(targets))
+        if self.key_array is None:
+            return np.array([self.find(target) for target in targets.tolist()], dtype=np.int64)
+        found = np.full(len(targets), -1, dtype=np.int64)
+        if self.size == 0:
+            return found
+        slots = np.searchsorted(self.key_array, targets, side='left')
+        inside = slots < self.size
+        hit = np.zeros(len(targets), dtype=bool)
+        hit[inside] = self.key_array[slots[inside]] == targets[inside]
+        found[hit] = self.position_array[slots[hit]]
+        return found
@@ -0,0 +1,273 @@
+import heapq
+
+from .counters import Counters
+from .insertion_sort import insertion_sort, insertion_sort_fast
+from .heap_sort import heap_sort, heap_sort_fast, sift_down, sift_down_fast
+from .quick_sort import INSERTION_CUTOFF, choose_pivot, choose_pivot_fast, partition, partition_fast
+from .events import Step, COMPARE, SWAP, DONE
+
+try:
+    import numpy as np
+except ImportError: # NumPy is only used to filter the chunks of top_k_stream
+    np = None
+
+TOP_K = 10 # Elements partial_sort and heap_top_k put in order when k is not given
+
+
+def quickselect(arr, low, high, *args, k=None, counters=None):
+    """
+    Moves the k-th smallest element of arr[low..high] to index low + k, with
+    smaller or equal elements left of it and bigger or equal ones right of
+    it (nth_element).
+
+    This is an introselect built from quick_sort's pieces: partition around
+    the median of three (or the ninther), then keep only the side that holds
+    index low + k. Ranges that take more than 2*log2(n) partitions are
+    finished with heap sort and small ranges with insertion sort, so it is
+    O(n) on average and O(nlogn) at worst.
+
+    Parameters:
+    arr (list): The list to select from.
+    low (int): Start index of array.
+    high (int): End index of array.
+    k (int): Rank of the element to select, 0 is the smallest. The median by default.
+    counters (Counters): Receives the operation counts, optional.
+
+    Yield:
+    Step: Comparisons and swaps, the pivot of every partition, then DONE
+    """
+    counters = counters or Counters()
+    if high >= low:
+        n = high - low + 1
+        target = low + (n - 1) // 2 if k is None else low + min(max(k, 0), n - 1)
+        yield from select_range(arr, low, high, target, counters)
+    yield Step(DONE)
+
+
+def select_range(arr, low, high, target, counters):
+    """
+    The loop of quickselect, puts arr[target] in its sorted place within arr[low..high] without the DONE step.
+    """
+    depth_limit = 2 * max(high - low + 1, 1).bit_length()
+    depth = 0
+    while True:
+        if depth > counters.max_depth:
+            counters.max_depth = depth
+        if high - low + 1 <= INSERTION_CUTOFF:
+            yield from insertion_sort(arr, low, high, counters=counters)
+            return
+        if depth > depth_limit:
+            yield from heap_sort(arr, low, high, counters=counters)
+            return
+
+        pivot_index = yield from choose_pivot(arr, low, high, counters)
+        lt, gt = yield from partition(arr, low, high, pivot_index, counters)
+        if target < lt:
+            high = lt - 1
+        elif target > gt:
+            low = gt + 1
+        else:
+            return # The target is in the block equal to the pivot
+        depth += 1
+
+
+def partial_sort(arr, low, high, *args, k=TOP_K, counters=None):
+    """
+    Sorts the k smallest elements of arr[low..high] into arr[low..low+k-1],
+    the rest of the range is left in no particular order.
+
+    It runs quick_sort but drops every range that lies past the first k
+    positions, so it stops as soon as those are final. O(n + klogk) on
+    average.
+
+    Parameters:
+    arr (list): The list to be partly sorted.
+    low (int): Start index of array.
+    high (int): End index of array.
+    k (int): Number of positions to finish.
+    counters (Counters): Receives the operation counts, optional.
+
+    Yield:
+    Step: Comparisons, swaps and writes, the pivot of every partition, then DONE
+    """
+    counters = counters or Counters()
+    stop = low + max(k, 0) # First position that does not have to be final
+    depth_limit = 2 * max(high - low + 1, 1).bit_length()
+    stack = [(low, high, 0)] if stop > low else []
+    while stack:
+        low, high, depth = stack.pop()
+        if depth > counters.max_depth:
+            counters.max_depth = depth
+
+        if high - low + 1 <= INSERTION_CUTOFF:
+            yield from insertion_sort(arr, low, high, counters=counters)
+            continue
+        if depth > depth_limit:
+            yield from heap_sort(arr, low, high, counters=counters)
+            continue
+
+        pivot_index = yield from choose_pivot(arr, low, high, counters)
+        lt, gt = yield from partition(arr, low, high, pivot_index, counters)
+
+        # Only ranges that start before stop hold positions that still have to be final
+        if gt + 1 < stop:
+            stack.append((gt + 1, high, depth + 1))
+        stack.append((low, lt - 1, depth + 1))
+
+    yield Step(DONE)
+
+
+def heap_top_k(arr, low, high, *args, k=TOP_K, counters=None):
+    """
+    Puts the k smallest elements of arr[low..high] in order into
+    arr[low..low+k-1] with a heap, like a stream would be read.
+
+    The first k elements become a max heap. Every later element is compared
+    with the root, the biggest of the k smallest so far, and replaces it if
+    it is smaller. At the end the heap is sorted in place. O(nlogk) with only
+    the k heap slots touched, so it works the same on input that arrives one
+    element at a time (see top_k_stream).
+
+    Parameters:
+    arr (list): The list to pick from.
+    low (int): Start index of array.
+    high (int): End index of array.
+    k (int): Number of elements to keep.
+    counters (Counters): Receives the operation counts, optional.
+
+    Yield:
+    Step: Every comparison with the root and every swap, then DONE
+    """
+    counters = counters or Counters()
+    k = min(max(k, 0), high - low + 1)
+    if k > 0:
+        for start in range(k // 2 - 1, -1, -1):
+            yield from sift_down(arr, low, start, k, counters)
+
+        for i in range(low + k, high + 1):
+            counters.comparisons += 1
+            yield Step(COMPARE, i, low)
+            if arr[i] < arr[low]:
+                arr[low], arr[i] = arr[i], arr[low]
+                counters.swaps += 1
+                counters.writes += 2
+                yield Step(SWAP, low, i)
+                yield from sift_down(arr, low, 0, k, counters)
+
+        # Sort the heap: move the biggest behind it, like heap_sort
+        for end in range(k - 1, 0, -1):
+            arr[low], arr[low + end] = arr[low + end], arr[low]
+            counters.swaps += 1
+            counters.writes += 2
+            yield Step(SWAP, low, low + end)
+            yield from sift_down(arr, low, 0, end, counters)
+    yield Step(DONE)
+
+
+def quickselect_fast(arr, low, high, *args, k=None):
+    """
+    Same algorithm as quickselect without yielding.
+
+    Returns:
+    list: The list with its k-th smallest element at index low + k.
+    """
+    if high < low:
+        return arr
+    n = high - low + 1
+    target = low + (n - 1) // 2 if k is None else low + min(max(k, 0), n - 1)
+    depth_limit = 2 * n.bit_length()
+    depth = 0
+    while True:
+        if high - low + 1 <= INSERTION_CUTOFF:
+            insertion_sort_fast(arr, low, high)
+            return arr
+        if depth > depth_limit:
+            heap_sort_fast(arr, low, high)
+            return arr
+        lt, gt = partition_fast(arr, low, high, choose_pivot_fast(arr, low, high))
+        if target < lt:
+            high = lt - 1
+        elif target > gt:
+            low = gt + 1
+        else:
+            return arr
+        depth += 1
+
+
+def partial_sort_fast(arr, low, high, *args, k=TOP_K):
+    """
+    Same algorithm as partial_sort without yielding.
+
+    Returns:
+    list: The list with its k smallest elements sorted at the front of the range.
+    """
+    stop = low + max(k, 0)
+    depth_limit = 2 * max(high - low + 1, 1).bit_length()
+    stack = [(low, high, 0)] if stop > low else []
+    while stack:
+        low, high, depth = stack.pop()
+        if high - low + 1 <= INSERTION_CUTOFF:
+            insertion_sort_fast(arr, low, high)
+            continue
+        if depth > depth_limit:
+            heap_sort_fast(arr, low, high)
+            continue
+        lt, gt = partition_fast(arr, low, high, choose_pivot_fast(arr, low, high))
+        if gt + 1 < stop:
+            stack.append((gt + 1, high, depth + 1))
+        stack.append((low, lt - 1, depth + 1))
+    return arr
+
+
+def heap_top_k_fast(arr, low, high, *args, k=TOP_K):
+    """
+    Same algorithm as heap_top_k without yielding.
+
+    Returns:
+    list: The list with its k smallest elements sorted at the front of the range.
+    """
+    k = min(max(k, 0), high - low + 1)
+    if k == 0:
+        return arr
+    for start in range(k // 2 - 1, -1, -1):
+        sift_down_fast(arr, low, start, k)
+    for i in range(low + k, high + 1):
+        if arr[i] < arr[low]:
+            arr[low], arr[i] = arr[i], arr[low]
+            sift_down_fast(arr, low, 0, k)
+    for end in range(k - 1, 0, -1):
+        arr[low], arr[low + end] = arr[low + end], arr[low]
+        sift_down_fast(arr, low, 0, end)
+    return arr
+
+
+def top_k_stream(chunks, k=TOP_K):
+    """
+    The k smallest values of a stream that is too big to hold, e.g. the
+    chunks of analysis.distributions.stream().
+
+    Keeps a max heap (of negated values) of the k smallest values so far.
+    Once it is full only values below its root can get in, so NumPy chunks
+    are filtered with one vectorized comparison before the heap sees them.
+
+    Parameters:
+    chunks (iterable): Lists or NumPy arrays of numbers.
+    k (int): Number of values to keep.
+
+    Returns:
+    list: The k smallest values, sorted.
+    """
+    if k <= 0:
+        return []
+    heap = []
+    for chunk in chunks:
+        if np is not None and isinstance(chunk, np.ndarray):
+            if len(heap) == k:
+                chunk = chunk[chunk < -heap[0]]
+            chunk = chunk.tolist()
+        for value in chunk:
+            if len(heap) < k:
+                heapq.heappush(heap, -value)
+            elif value < -heap[0]:
+                heapq.heapreplace(heap, -value)
+    return sorted(-value for value in heap)
@@ -0,0 +1,254 @@
+from bisect import bisect_left
+
+from .counters import Counters
+from .search_index import SortedIndex, target_list
+from .events import Step, COMPARE, WRITE, PIVOT, FOUND, DONE
+
+# Searches that need sorted data. The visual versions first sort the array
+# they are given, if it is not sorted yet, with one WRITE per element that
+# moves. The fast versions search a SortedIndex of the array. Build it once
+# and pass it as index= so only the first query pays for sorting; without
+# it every call builds its own.
+
+
+def sort_for_search(arr, counters):
+    #Puts arr in sorted order from its index, yields a WRITE for every element that moves
+    index = SortedIndex(arr)
+    if index.is_sorted:
+        return
+    counters.allocate(index.size)
+    for k, value in enumerate(index.keys):
+        if arr[k] != value:
+            arr[k] = value
+            counters.writes += 1
+            yield Step(WRITE, k, value)
+    counters.free(index.size)
+
+
+def lower_bound(arr, target, lo, hi, counters):
+    """
+    Binary search for the first element of arr[lo:hi] that is not below target.
+
+    Yield:
+    Step: A COMPARE for every element looked at.
+
+    Returns:
+    int: Its index, hi when every element is below target.
+    """
+    while lo < hi:
+        mid = (lo + hi) // 2
+        counters.comparisons += 1
+        yield Step(COMPARE, mid)
+        if arr[mid] < target:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def found_at(arr, index, target, counters):
+    #Checks the lower bound holds the target, yields FOUND or DONE
+    if index < len(arr):
+        counters.comparisons += 1
+        if arr[index] == target:
+            yield Step(FOUND, index)
+            return
+    yield Step(DONE)
+
+
+def binary_search(arr, target, *args, counters=None):
+    """
+    Perform a binary search for the target in the sorted array.
+
+    Halves the range that can hold the target until one element is left,
+    O(log n) comparisons.
+
+    Parameters:
+    arr (list): The list to search through, sorted first if it is not.
+    target: The value to search for.
+    counters (Counters): Receives the operation counts, optional.
+
+    Yields:
+    Step: The writes that sort the array, every element looked at, then
+    FOUND with the index of the first match or DONE.
+    """
+    counters = counters or Counters()
+    yield from sort_for_search(arr, counters)
+    index = yield from lower_bound(arr, target, 0, len(arr), counters)
+    yield from found_at(arr, index, target, counters)
+
+
+def exponential_search(arr, target, *args, counters=None):
+    """
+    Perform an exponential search for the target in the sorted array.
+
+    Looks at indices 0, 1, 3, 7, ... until it passes the target, then binary
+    searches the last gap. O(log i) comparisons for a target at index i, so
+    it beats binary_search on targets near the start.
+
+    Parameters and yields are the same as binary_search.
+    """
+    counters = counters or Counters()
+    yield from sort_for_search(arr, counters)
+    n = len(arr)
+    bound = 1
+    while bound <= n:
+        counters.comparisons += 1
+        yield Step(COMPARE, bound - 1)
+        if not arr[bound - 1] < target:
+            break
+        bound *= 2
+    index = yield from lower_bound(arr, target, bound // 2, min(bound, n), counters)
+    yield from found_at(arr, index, target, counters)
+
+
+def interpolation_search(arr, target, *args, counters=None):
+    """
+    Perform an interpolation search for the target in the sorted array.
+
+    Guesses where the target is from its value, like looking up a word in a
+    dictionary. O(log log n) comparisons on evenly spread values, up to O(n)
+    on skewed ones. Works on numbers only.
+
+    Parameters and yields are the same as binary_search.
+    """
+    counters = counters or Counters()
+    yield from sort_for_search(arr, counters)
+    n = len(arr)
+    if n == 0:
+        yield Step(DONE)
+        return
+    lo, hi = 0, n - 1
+    counters.comparisons += 1
+    yield Step(COMPARE, hi)
+    if arr[hi] < target:
+        yield Step(DONE)
+        return
+    # The first element not below target is in arr[lo..hi]
+    while lo < hi:
+        counters.comparisons += 1
+        yield Step(COMPARE, lo)
+        if not arr[lo] < target:
+            break
+        # arr[lo] < target <= arr[hi], so the answer is past lo and the range always shrinks
+        guess = lo + int((target - arr[lo]) * (hi - lo) // (arr[hi] - arr[lo]))
+        lo += 1
+        guess = min(max(guess, lo), hi)
+        counters.comparisons += 1
+        yield Step(COMPARE, guess)
+        if arr[guess] < target:
+            lo = guess + 1
+        elif arr[guess] > target:
+            hi = guess
+        else:
+            # Hit, guesses would only creep towards the first of the equal values, binary search for it
+            lo = yield from lower_bound(arr, target, lo, guess, counters)
+            break
+    yield from found_at(arr, lo, target, counters)
+
+
+def batch_search(arr, targets, *args, counters=None):
+    """
+    Looks up many targets in one pass over the sorted array.
+
+    The targets are sorted, then every one is binary searched from where
+    the one before it was found, so the whole batch only moves forward.
+
+    Parameters:
+    arr (list): The list to search through, sorted first if it is not.
+    targets: A value or a sequence of values.
+    counters (Counters): Receives the operation counts, optional.
+
+    Yields:
+    Step: The writes that sort the array, every element looked at, a PIVOT
+    at every match, then DONE.
+    """
+    counters = counters or Counters()
+    yield from sort_for_search(arr, counters)
+    n = len(arr)
+    lo = 0
+    for target in sorted(set(target_list(targets))):
+        lo = yield from lower_bound(arr, target, lo, n, counters)
+        if lo < n:
+            counters.comparisons += 1
+            if arr[lo] == target:
+                yield Step(PIVOT, lo)
+    yield Step(DONE)
+
+
+def index_of(arr, index):
+    #The SortedIndex to search, a new one when the caller did not pass one
+    if index is None:
+        return SortedIndex(arr)
+    if index.size != len(arr):
+        raise ValueError(f'the index is for {index.size} elements, the array has {len(arr)}')
+    return index
+
+
+def position(index, slot, target):
+    #Position in the original array of the key at slot, -1 if it is not the target
+    if slot < index.size and index.keys[slot] == target:
+        return index.positions[slot]
+    return -1
+
+
+def binary_search_fast(arr, target, *args, index=None):
+    """
+    Same search as binary_search without yielding, on a sorted index of arr.
+
+    Parameters:
+    arr (list): The list to search.
+    target: The value to look for.
+    index (SortedIndex): Index built from arr with SortedIndex(arr), built for this call when not given.
+
+    Returns:
+    int: Index of the first match in arr, or -1 if the target is not in the array.
+    """
+    index = index_of(arr, index)
+    return position(index, bisect_left(index.keys, target), target)
+
+
+def exponential_search_fast(arr, target, *args, index=None):
+    #Same search as exponential_search without yielding, returns the index of the first match or -1
+    index = index_of(arr, index)
+    keys = index.keys
+    bound = 1
+    while bound <= index.size and keys[bound - 1] < target:
+        bound *= 2
+    return position(index, bisect_left(keys, target, bound // 2, min(bound, index.size)), target)
+
+
+def interpolation_search_fast(arr, target, *args, index=None):
+    #Same search as interpolation_search without yielding, returns the index of the first match or -1
+    index = index_of(arr, index)
+    keys = index.keys
+    if index.size == 0 or keys[-1] < target:
+        return -1
+    lo, hi = 0, index.size - 1
+    while lo < hi and keys[lo] < target:
+        guess = lo + int((target - keys[lo]) * (hi - lo) // (keys[hi] - keys[lo]))
+        lo += 1
+        guess = min(max(guess, lo), hi)
+        if keys[guess] < target:
+            lo = guess + 1
+        elif keys[guess] > target:
+            hi = guess
+        else:
+            lo = bisect_left(keys, target, lo, guess)
+            break
+    return position(index, lo, target)
+
+
+def batch_search_fast(arr, targets, *args, index=None):
+    """
+    Looks up every target with numpy.searchsorted on a sorted index of arr.
+
+    Parameters:
+    arr (list): The list to search.
+    targets: The values to look for.
+    index (SortedIndex): Index built from arr, built for this call when not given.
+
+    Returns:
+    np.ndarray: Index of the first match of every target in arr, -1 where there is none (a list without NumPy).
+    """
+    return index_of(arr, index).find_many(targets)
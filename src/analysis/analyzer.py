@@ -1,15 +1,46 @@
-'''import time
-
-def timer(func):
-    """Function decorator to measure execution time of functions."""
-    def wrapper(*args, **kwargs):
-        start_time = time.time()  # Start time
-        print(f'Starting execution of {func.__name__}')
-        result = func(*args, **kwargs)  # Execute the function
-        end_time = time.time()  # End time
-        execution_time = end_time - start_time  # Calculate execution time
-        print(f'{func.__name__} executed in: {execution_time} seconds')
-        return result
-    return wrapper'''
-
-# - The timer decorator is used to measure and print the execution time of any function it decorates.
+import time
+from collections import deque
+
+
+def run_to_completion(iterator):
+    """Runs an algorithm iterator until it is exhausted without keeping any of its steps."""
+    deque(iterator, maxlen=0)
+
+
+def time_iterator(iterator):
+    """Runs an algorithm iterator to completion and returns the time it took in nanoseconds."""
+    start_time = time.perf_counter_ns()
+    deque(iterator, maxlen=0)
+    return time.perf_counter_ns() - start_time
+
+
+def time_call(function, *args, **kwargs):
+    """Calls a function and returns the time it took in nanoseconds."""
+    start_time = time.perf_counter_ns()
+    function(*args, **kwargs)
+    return time.perf_counter_ns() - start_time
+
+
+def percentile(samples, p):
+    """
+    Returns the p-th percentile (0-100) of the samples, interpolating
+    linearly between the closest ranks.
+    """
+    ordered = sorted(samples)
+    if not ordered:
+        raise ValueError('percentile of an empty list')
+    position = (len(ordered) - 1) * p / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(samples):
+    """Summary statistics of a list of timings."""
+    return {
+        'min_ns': min(samples),
+        'median_ns': percentile(samples, 50),
+        'p90_ns': percentile(samples, 90),
+        'p95_ns': percentile(samples, 95),
+        'mean_ns': sum(samples) / len(samples),
+    }
@@ -0,0 +1,68 @@
+#What auto picks on every input distribution, and how far it is from the best engine
+#Run from the src folder: python -m analysis.auto_benchmark --sizes 1000 100000
+import argparse
+import sys
+
+from algorithms import auto_sort_fast, decide
+from algorithms.auto_sort import ENGINES
+from analysis.analyzer import time_call, summarize
+from analysis.distributions import DISTRIBUTIONS, generate
+
+# insertion_sort is O(n^2), it is only timed on inputs up to this size
+INSERTION_LIMIT = 5000
+
+
+def time_engine(name, data, repeats):
+    #Median time of one fast engine in nanoseconds, every run gets a fresh copy of data
+    function = ENGINES[name][1]
+    if name == 'radix_sort':
+        return summarize([time_call(function, list(data)) for _ in range(repeats)])['median_ns']
+    return summarize([time_call(function, list(data), 0, len(data) - 1) for _ in range(repeats)])['median_ns']
+
+
+def run_auto(sizes=(1000, 100000), distributions=None, repeats=5, seed=0, log=None):
+    """
+    Times auto and every engine it can pick on each input.
+
+    Returns:
+    list: One row per distribution and size with the decision, the measured
+    features (None for small inputs, which are not profiled), the time of auto and of every engine, and the regret (time of
+    auto over the time of the fastest engine, 1.0 is the best choice).
+    """
+    distributions = distributions or list(DISTRIBUTIONS)
+    rows = []
+    for distribution in distributions:
+        for size in sizes:
+            data = generate(distribution, size, seed)
+            decision = decide(data, 0, size - 1, fast=True)
+            times = {name: time_engine(name, data, repeats) for name in ENGINES
+                     if name != 'insertion_sort' or size <= INSERTION_LIMIT}
+            auto = summarize([time_call(auto_sort_fast, list(data), 0, size - 1) for _ in range(repeats)])['median_ns']
+            best = min(times, key=times.get)
+            row = {'distribution': distribution, 'size': size, 'engine': decision.engine, 'reason': decision.reason,
+                   'features': None if decision.profile is None else decision.profile.as_dict(), 'auto_ns': auto, 'engines_ns': times,
+                   'best': best, 'regret': auto / times[best]}
+            rows.append(row)
+            if log is not None:
+                print(f'{distribution:14} {size:>9}  {decision.engine:18} best {best:18} regret {row["regret"]:5.2f}  '
+                      f'auto {auto / 1e6:9.2f} ms  {decision.reason}', file=log)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Show what auto picks on every input and compare it with every engine.')
+    parser.add_argument('--sizes', nargs='+', type=int, default=[1000, 100000], help='input sizes')
+    parser.add_argument('--distributions', nargs='+', choices=list(DISTRIBUTIONS), help='input distributions (default: all)')
+    parser.add_argument('--repeats', type=int, default=5, help='measured runs per case, one run of a small input is too noisy')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the input generator')
+    args = parser.parse_args(argv)
+
+    rows = run_auto(args.sizes, args.distributions, args.repeats, args.seed, log=sys.stdout)
+    worst = max(rows, key=lambda row: row['regret'], default=None)
+    if worst is not None:
+        print(f'Worst regret {worst["regret"]:.2f} on {worst["distribution"]} {worst["size"]}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,193 @@
+#Headless benchmark suite for every algorithm in AlgDict
+#Run from the src folder: python -m analysis.benchmark --sizes 100 1000 --out results.json
+import argparse
+import csv
+import json
+import sys
+
+from AlgorithmDictionary import AlgDict, INDEXED, MODES, start_algorithm
+from algorithms import Counters, SortedIndex, measure_memory
+from analysis.analyzer import time_iterator, time_call, summarize
+from analysis.distributions import DISTRIBUTIONS, generate
+
+STAT_FIELDS = ['min_ns', 'median_ns', 'p90_ns', 'p95_ns', 'mean_ns']
+COUNT_FIELDS = ['comparisons', 'swaps', 'writes', 'max_depth', 'peak_aux', 'peak_bytes']
+FIELDS = ['algorithm', 'mode', 'distribution', 'size', 'repeats'] + STAT_FIELDS + COUNT_FIELDS + ['status']
+
+
+def benchmark_case(name, data, repeats=5, warmups=1, mode='visual', target=None):
+    """
+    Times one algorithm on one input.
+
+    Every run sorts a fresh copy of data, only the algorithm itself is timed.
+    In visual mode the step generator is run to completion, in fast mode the
+    non-yielding variant is called. Searches look for target, the last
+    element by default. The fast searches that need sorted data get a
+    SortedIndex built once for data, outside the timing, the way a caller
+    would reuse it for every query (analysis.search_benchmark times the build).
+
+    Returns:
+    list: The timings of the measured runs in nanoseconds.
+    """
+    if target is None:
+        target = data[-1] if data else 0  # Searches look for the last element (worst case)
+    index = SortedIndex(data) if mode != 'visual' and name in INDEXED else None
+    samples = []
+    for run in range(warmups + repeats):
+        arr = list(data)
+        if mode == 'visual':
+            elapsed = time_iterator(start_algorithm(name, arr, target))
+        else:
+            elapsed = time_call(start_algorithm, name, arr, target, mode, index=index)
+        if run >= warmups:
+            samples.append(elapsed)
+    return samples
+
+
+def count_case(name, data):
+    """
+    Runs one algorithm once with operation counters and tracemalloc.
+
+    This run is separate from the timed ones, tracemalloc would distort them.
+
+    Returns:
+    dict: The counts, see Counters.as_dict.
+    """
+    target = data[-1] if data else 0
+    counters = Counters()
+    measure_memory(start_algorithm(name, list(data), target, counters=counters), counters)
+    return counters.as_dict()
+
+
+def run_benchmark(algorithms=None, sizes=(100, 1000), distributions=None, repeats=5, warmups=1, seed=0, mode='visual', count=False, log=None):
+    """
+    Runs every algorithm over a matrix of input sizes and distributions.
+
+    Parameters:
+    algorithms (list): Names from AlgDict, all of them by default.
+    sizes (list): Input sizes.
+    distributions (list): Names from DISTRIBUTIONS, all of them by default.
+    repeats (int): Measured runs per case.
+    warmups (int): Unmeasured runs before the measured ones.
+    seed (int): Seed for the input generator.
+    mode (str): 'visual' or 'fast', see benchmark_case.
+    count (bool): Also record operation counts and peak memory, see count_case.
+    log (file): Where to print progress, nothing is printed when None.
+
+    Returns:
+    list: One result dictionary per case.
+    """
+    algorithms = algorithms or list(AlgDict)
+    distributions = distributions or list(DISTRIBUTIONS)
+    results = []
+    for distribution in distributions:
+        for size in sizes:
+            data = generate(distribution, size, seed)
+            for name in algorithms:
+                result = {'algorithm': name, 'mode': mode, 'distribution': distribution, 'size': size, 'repeats': repeats}
+                try:
+                    result.update(summarize(benchmark_case(name, data, repeats, warmups, mode)))
+                    if count:
+                        result.update(count_case(name, data))
+                    result['status'] = 'ok'
+                except (RecursionError, MemoryError) as error:
+                    # e.g. quick_sort on sorted input goes past the recursion limit
+                    result['status'] = type(error).__name__
+                results.append(result)
+                if log is not None:
+                    median = result.get('median_ns')
+                    timing = f'{median / 1e6:10.3f} ms' if median is not None else result['status']
+                    print(f'{name:20} {distribution:14} {size:>9}  {timing}', file=log)
+    return results
+
+
+def save_results(results, path):
+    #Saves results as CSV if the path ends with .csv, JSON otherwise
+    if path.endswith('.csv'):
+        with open(path, 'w', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=FIELDS, restval='')
+            writer.writeheader()
+            writer.writerows(results)
+    else:
+        with open(path, 'w') as file:
+            json.dump(results, file, indent=2)
+
+
+def load_results(path):
+    #Loads results saved by save_results
+    if path.endswith('.csv'):
+        with open(path, newline='') as file:
+            results = list(csv.DictReader(file))
+        for result in results:
+            result['size'] = int(result['size'])
+            result['repeats'] = int(result['repeats'])
+            for field in STAT_FIELDS:
+                result[field] = float(result[field]) if result[field] else None
+            for field in COUNT_FIELDS:
+                result[field] = int(result[field]) if result[field] else None
+        return results
+    with open(path) as file:
+        return json.load(file)
+
+
+def compare(results, baseline, threshold=0.10):
+    """
+    Compares results against a baseline run.
+
+    A case is a regression when its median is more than threshold (a
+    fraction, 0.10 is 10%) slower than the baseline median, or when it
+    used to succeed and now fails.
+
+    Returns:
+    list: (result, baseline result, ratio) for every regression.
+    """
+    def key(result):
+        return result['algorithm'], result.get('mode', 'visual'), result['distribution'], result['size']
+
+    previous = {key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        old = previous.get(key(result))
+        if old is None or old.get('status') != 'ok':
+            continue
+        if result.get('status') != 'ok':
+            regressions.append((result, old, None))
+            continue
+        ratio = result['median_ns'] / old['median_ns']
+        if ratio > 1 + threshold:
+            regressions.append((result, old, ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark every algorithm in AlgDict without the visualizer.')
+    parser.add_argument('--algorithms', nargs='+', choices=list(AlgDict), help='algorithms to run (default: all)')
+    parser.add_argument('--sizes', nargs='+', type=int, default=[100, 1000], help='input sizes')
+    parser.add_argument('--distributions', nargs='+', choices=list(DISTRIBUTIONS), help='input distributions (default: all)')
+    parser.add_argument('--repeats', type=int, default=5, help='measured runs per case')
+    parser.add_argument('--warmups', type=int, default=1, help='unmeasured runs per case')
+    parser.add_argument('--mode', choices=list(MODES), default='visual', help='time the step generators or the non-yielding variants')
+    parser.add_argument('--counters', action='store_true', help='also record operation counts and peak memory')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the input generator')
+    parser.add_argument('--out', help='save results to this .json or .csv file')
+    parser.add_argument('--baseline', help='compare against results saved from an earlier run')
+    parser.add_argument('--threshold', type=float, default=0.10, help='slowdown counted as a regression (0.10 = 10%%)')
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.algorithms, args.sizes, args.distributions, args.repeats, args.warmups, args.seed, args.mode, args.counters, log=sys.stdout)
+    if args.out:
+        save_results(results, args.out)
+
+    if args.baseline:
+        regressions = compare(results, load_results(args.baseline), args.threshold)
+        for result, old, ratio in regressions:
+            change = f'{ratio:.2f}x slower' if ratio is not None else f'now fails with {result["status"]}'
+            print(f'REGRESSION {result["algorithm"]} {result["distribution"]} {result["size"]}: {change}')
+        if regressions:
+            return 1
+        print('No regressions against the baseline')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
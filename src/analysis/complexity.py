@@ -0,0 +1,256 @@
+#Empirical complexity: fits how time and operation counts grow with the input size
+#Run from the src folder: python -m analysis.complexity --sizes 250 500 1000 2000 --plot complexity.png
+import argparse
+import json
+import math
+import sys
+
+import numpy as np
+
+from AlgorithmDictionary import AlgDict, MODES, SEARCHES, start_algorithm
+from algorithms import Counters
+from analysis.analyzer import run_to_completion, summarize
+from analysis.benchmark import benchmark_case
+from analysis.distributions import DISTRIBUTIONS, generate
+
+# Growth of every model, as a function of n
+MODELS = {
+    'n': lambda n: n,
+    'n log n': lambda n: n * math.log2(n),
+    'n^2': lambda n: n * n,
+}
+
+# Expected complexity of every algorithm in AlgDict (average case)
+EXPECTED = {
+    'bubble_sort': 'n^2',
+    'merge_sort': 'n log n',
+    'natural_merge_sort': 'n log n',
+    'quick_sort': 'n log n',
+    'radix_sort': 'n',
+    'parallel_sort': 'n log n',
+    'external_sort': 'n log n',
+    'auto': 'n log n',
+    'quickselect': 'n',
+    'partial_sort': 'n', # k is a constant, TOP_K
+    'heap_top_k': 'n',
+    'linear_search': 'n',
+    # The sorted searches sort an unsorted input first
+    'binary_search': 'n log n',
+    'exponential_search': 'n log n',
+    'interpolation_search': 'n log n',
+    'batch_search': 'n log n',
+}
+
+METRICS = ('time', 'operations')
+TOLERANCE = 0.25 # How far the measured exponent may go above the expected one before it is flagged
+
+
+def missing_target(data):
+    #A value that is not in data, so a search has to look at every element
+    return max(data) + 1 if data else 0
+
+
+def operation_count(name, data, target=0):
+    #Comparisons and writes of one run, counted by the visual algorithm
+    counters = Counters()
+    run_to_completion(start_algorithm(name, list(data), target, counters=counters))
+    return counters.comparisons + counters.writes
+
+
+def measure(algorithms=None, sizes=(250, 500, 1000, 2000), distributions=('uniform',), repeats=3, seed=0, mode='visual', log=None):
+    """
+    Times every algorithm and counts its operations over a sweep of sizes.
+    Searches look for a value that is not in the array (worst case).
+
+    Returns:
+    list: One row per algorithm, distribution and size with the median time,
+    the operation count and a status ('ok' or the error that stopped the run).
+    """
+    algorithms = algorithms or list(AlgDict)
+    rows = []
+    for distribution in distributions:
+        for size in sizes:
+            data = generate(distribution, size, seed)
+            for name in algorithms:
+                row = {'algorithm': name, 'distribution': distribution, 'size': size}
+                target = missing_target(data) if name in SEARCHES else 0
+                try:
+                    row['median_ns'] = summarize(benchmark_case(name, data, repeats, 1, mode, target))['median_ns']
+                    row['operations'] = operation_count(name, data, target)
+                    row['status'] = 'ok'
+                except (RecursionError, MemoryError) as error:
+                    row['status'] = type(error).__name__
+                rows.append(row)
+                if log is not None and row['status'] == 'ok':
+                    print(f'{name:20} {distribution:14} {size:>9}  {row["median_ns"] / 1e6:10.3f} ms  {row["operations"]:>12} ops', file=log)
+                elif log is not None:
+                    print(f'{name:20} {distribution:14} {size:>9}  {row["status"]}', file=log)
+    return rows
+
+
+def fit_exponent(sizes, values):
+    """
+    Fits log(value) = k log(n) + c by least squares.
+
+    Returns:
+    tuple: The exponent k and the r^2 of the fit.
+    """
+    x = np.log(np.asarray(sizes, dtype=float))
+    y = np.log(np.maximum(np.asarray(values, dtype=float), 1e-12))
+    k, c = np.polyfit(x, y, 1)
+    residual = y - (k * x + c)
+    spread = ((y - y.mean()) ** 2).sum()
+    r2 = 1 - (residual ** 2).sum() / spread if spread > 0 else 1.0
+    return float(k), float(r2)
+
+
+def model_exponent(model, sizes):
+    #Log-log slope of a model over the given sizes, n log n is a little above 1
+    return fit_exponent(sizes, [MODELS[model](n) for n in sizes])[0]
+
+
+def best_model(sizes, values):
+    #The model with the most constant ratio value / model(n), on a log scale
+    y = np.log(np.asarray(values, dtype=float))
+    spreads = {}
+    for model, growth in MODELS.items():
+        ratio = y - np.log([growth(n) for n in sizes])
+        spreads[model] = float(ratio.std())
+    return min(spreads, key=spreads.get)
+
+
+def analyze(rows, tolerance=TOLERANCE):
+    """
+    Fits every algorithm, distribution and metric of a sweep.
+
+    A fit is flagged when its exponent is more than tolerance above the
+    exponent of the expected complexity over the same sizes, e.g. a
+    quick_sort that goes quadratic on some input. Growing slower than
+    expected is not flagged, some inputs are easy (quick_sort partitions
+    few distinct values in linear time).
+
+    Returns:
+    list: One dictionary per fit with the exponent, r^2, best model,
+    expected model and exponent and the flag.
+    """
+    groups = {}
+    for row in rows:
+        if row.get('status') == 'ok' and row['size'] > 1:
+            groups.setdefault((row['algorithm'], row['distribution']), []).append(row)
+
+    fits = []
+    for (name, distribution), group in groups.items():
+        group.sort(key=lambda row: row['size'])
+        sizes = [row['size'] for row in group]
+        if len(set(sizes)) < 2:
+            continue
+        expected = EXPECTED.get(name)
+        for metric in METRICS:
+            values = [row['median_ns'] if metric == 'time' else row['operations'] for row in group]
+            if min(values) <= 0:
+                continue
+            exponent, r2 = fit_exponent(sizes, values)
+            fit = {
+                'algorithm': name,
+                'distribution': distribution,
+                'metric': metric,
+                'exponent': exponent,
+                'r2': r2,
+                'best_model': best_model(sizes, values),
+                'expected': expected,
+                'expected_exponent': model_exponent(expected, sizes) if expected else None,
+            }
+            fit['flagged'] = expected is not None and exponent - fit['expected_exponent'] > tolerance
+            fits.append(fit)
+    return fits
+
+
+def plot(rows, fits, path):
+    """
+    Saves log-log plots of time and operations against size, one row of
+    plots per distribution, with the expected growth as dotted lines.
+
+    Uses the Agg backend, so no display is needed.
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    distributions = list(dict.fromkeys(row['distribution'] for row in rows))
+    algorithms = list(dict.fromkeys(row['algorithm'] for row in rows))
+    flagged = {(fit['algorithm'], fit['distribution'], fit['metric']) for fit in fits if fit['flagged']}
+    figure, axes = plt.subplots(len(distributions), len(METRICS), figsize=(12, 4.5 * len(distributions)), squeeze=False)
+    colors = plt.rcParams['axes.prop_cycle'].by_key()['color']
+
+    for i, distribution in enumerate(distributions):
+        for j, metric in enumerate(METRICS):
+            ax = axes[i][j]
+            for k, name in enumerate(algorithms):
+                group = sorted((row for row in rows if row['algorithm'] == name and row['distribution'] == distribution
+                                and row.get('status') == 'ok'), key=lambda row: row['size'])
+                if not group:
+                    continue
+                sizes = [row['size'] for row in group]
+                values = [row['median_ns'] / 1e6 if metric == 'time' else row['operations'] for row in group]
+                color = colors[k % len(colors)]
+                label = name + (' (flagged)' if (name, distribution, metric) in flagged else '')
+                ax.plot(sizes, values, 'o-', color=color, label=label)
+
+                # Expected growth through the first point
+                expected = EXPECTED.get(name)
+                if expected is not None and values[0] > 0:
+                    scale = values[0] / MODELS[expected](sizes[0])
+                    ax.plot(sizes, [scale * MODELS[expected](n) for n in sizes], ':', color=color, alpha=0.6)
+            ax.set_xscale('log')
+            ax.set_yscale('log')
+            ax.set_xlabel('n')
+            ax.set_ylabel('median time (ms)' if metric == 'time' else 'comparisons + writes')
+            ax.set_title(f'{metric}, {distribution} input')
+            ax.grid(True, which='both', alpha=0.3)
+            ax.legend(fontsize='small')
+
+    figure.tight_layout()
+    figure.savefig(path)
+    plt.close(figure)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Estimate how every algorithm grows with the input size and flag unexpected growth.')
+    parser.add_argument('--algorithms', nargs='+', choices=list(AlgDict), help='algorithms to run (default: all)')
+    parser.add_argument('--sizes', nargs='+', type=int, default=[250, 500, 1000, 2000], help='input sizes, at least two')
+    parser.add_argument('--distributions', nargs='+', choices=list(DISTRIBUTIONS), default=['uniform', 'few_unique'], help='input distributions')
+    parser.add_argument('--repeats', type=int, default=3, help='timed runs per case')
+    parser.add_argument('--mode', choices=list(MODES), default='visual', help='time the step generators or the non-yielding variants')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the input generator')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE, help='how far above the expected exponent a fit is flagged')
+    parser.add_argument('--plot', help='save the log-log plots to this image file')
+    parser.add_argument('--out', help='save the measurements and fits to this .json file')
+    parser.add_argument('--strict', action='store_true', help='exit with 1 when a fit is flagged')
+    args = parser.parse_args(argv)
+    if len(set(args.sizes)) < 2:
+        parser.error('need at least two different sizes to fit an exponent')
+
+    rows = measure(args.algorithms, args.sizes, args.distributions, args.repeats, args.seed, args.mode, log=sys.stdout)
+    fits = analyze(rows, args.tolerance)
+
+    print()
+    print(f'{"algorithm":20} {"distribution":14} {"metric":10} {"exponent":>8} {"r2":>6}  {"best fit":9} {"expected":>14}')
+    for fit in fits:
+        expected = f'{fit["expected"]} ({fit["expected_exponent"]:.2f})' if fit['expected'] else '-'
+        flag = '  FLAGGED' if fit['flagged'] else ''
+        print(f'{fit["algorithm"]:20} {fit["distribution"]:14} {fit["metric"]:10} {fit["exponent"]:8.2f} {fit["r2"]:6.3f}  '
+              f'{fit["best_model"]:9} {expected:>14}{flag}')
+
+    if args.out:
+        with open(args.out, 'w') as file:
+            json.dump({'measurements': rows, 'fits': fits}, file, indent=2)
+    if args.plot:
+        plot(rows, fits, args.plot)
+        print(f'Plots saved to {args.plot}')
+    if args.strict and any(fit['flagged'] for fit in fits):
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,189 @@
+#Input distributions used to build arrays for the benchmarks and the visualizer
+#Run from the src folder to write a big input in chunks: python -m analysis.distributions sawtooth 100000000 --out saw.bin
+import argparse
+import sys
+from functools import lru_cache
+
+import numpy as np
+
+LOW = 10 # Value range the visualizer uses, a value is a bar height in pixels
+HIGH = 400
+BLOCK = 1 << 16 # Elements per block, every block has its own generator
+FEW_UNIQUE = 5 # Distinct values of few_unique
+TEETH = 8 # Ramps in a sawtooth
+ZIPF_EXPONENT = 1.5
+SWAP_FRACTION = 0.01 # Swaps of nearly_sorted as a share of the size, when not given
+FULL_LOW = -2 ** 63 # Range of full_range, every int64
+FULL_HIGH = 2 ** 63 - 1
+
+
+class Spec:
+    #What is being generated, passed to every distribution with each block
+    def __init__(self, size, seed, low, high, swaps):
+        self.size = size
+        self.seed = seed
+        self.low = low
+        self.high = high
+        self.swaps = max(1, int(size * SWAP_FRACTION)) if swaps is None else swaps
+
+
+# Every distribution builds the elements at the given positions (a block of an
+# array of spec.size elements) with the block's generator rng. Anything that
+# spans the whole array is a function of the position or is derived from the
+# seed, so the blocks can be built one at a time.
+
+def ramp(positions, spec):
+    #Ascending values from low to high over the whole array
+    step = (spec.high - spec.low + 1) / max(1, spec.size)
+    return spec.low + (positions * step).astype(np.int64)
+
+
+def uniform(positions, rng, spec):
+    return rng.integers(spec.low, spec.high, len(positions), endpoint=True)
+
+
+def sorted_input(positions, rng, spec):
+    return ramp(positions, spec)
+
+
+def reversed_input(positions, rng, spec):
+    return ramp(spec.size - 1 - positions, spec)
+
+
+@lru_cache(maxsize=4)
+def swap_pairs(size, seed, swaps):
+    """
+    Picks the swaps of nearly_sorted, no position is swapped twice.
+
+    Returns:
+    tuple: Positions taking part in a swap, sorted, and the position each one is swapped with.
+    """
+    rng = np.random.default_rng([seed, 1])
+    picks = np.unique(rng.integers(0, size, min(2 * swaps, size)))
+    rng.shuffle(picks)
+    picks = picks[:len(picks) // 2 * 2]
+    sources = np.concatenate((picks[0::2], picks[1::2]))
+    partners = np.concatenate((picks[1::2], picks[0::2]))
+    order = np.argsort(sources)
+    return sources[order], partners[order]
+
+
+def nearly_sorted(positions, rng, spec):
+    #Sorted input with spec.swaps pairs of elements swapped
+    values = ramp(positions, spec)
+    if spec.size > 1 and len(positions):
+        sources, partners = swap_pairs(spec.size, spec.seed, spec.swaps)
+        start = positions[0]
+        lo, hi = np.searchsorted(sources, (start, positions[-1] + 1))
+        # A swapped element takes the value its partner has in the sorted input
+        values[sources[lo:hi] - start] = ramp(partners[lo:hi], spec)
+    return values
+
+
+def few_unique(positions, rng, spec):
+    #Only a handful of distinct values, the same for every block
+    values = np.random.default_rng([spec.seed, 2]).integers(spec.low, spec.high, FEW_UNIQUE, endpoint=True)
+    return values[rng.integers(0, FEW_UNIQUE, len(positions))]
+
+
+def sawtooth(positions, rng, spec):
+    #TEETH ascending runs, the input natural_merge_sort likes best
+    period = max(1, -(-spec.size // TEETH))
+    return spec.low + ((positions % period) * ((spec.high - spec.low + 1) / period)).astype(np.int64)
+
+
+def organ_pipe(positions, rng, spec):
+    #Ascending to the middle, then descending
+    half = max(1, (spec.size + 1) // 2)
+    distance = np.minimum(positions, spec.size - 1 - positions)
+    return spec.low + (distance * ((spec.high - spec.low + 1) / half)).astype(np.int64)
+
+
+def zipf(positions, rng, spec):
+    #Skewed values, low is the most common one and larger values get rarer
+    ranks = rng.zipf(ZIPF_EXPONENT, len(positions))
+    return spec.low + np.minimum(ranks - 1, spec.high - spec.low)
+
+
+def full_range(positions, rng, spec):
+    #Uniform over every int64 value, ignores low and high (almost no duplicates, negative values included)
+    return rng.integers(FULL_LOW, FULL_HIGH, len(positions), endpoint=True, dtype=np.int64)
+
+
+DISTRIBUTIONS = {
+    'uniform': uniform,
+    'sorted': sorted_input,
+    'reversed': reversed_input,
+    'few_unique': few_unique,
+    'nearly_sorted': nearly_sorted,
+    'sawtooth': sawtooth,
+    'organ_pipe': organ_pipe,
+    'zipf': zipf,
+    'full_range': full_range,
+}
+
+# Distributions that can be drawn as bars, their values stay between low and high
+BOUNDED = [name for name in DISTRIBUTIONS if name != 'full_range']
+
+
+def stream(name, size, seed=0, chunk=16 * BLOCK, low=LOW, high=HIGH, swaps=None):
+    """
+    Builds an array from a named distribution in chunks, for inputs too big
+    to build in one go.
+
+    Parameters:
+    name (str): Key in DISTRIBUTIONS.
+    size (int): Number of elements.
+    seed (int): The same seed gives the same array, whatever the chunk size.
+    chunk (int): Elements per chunk, rounded up to a multiple of BLOCK.
+    low, high (int): Value range, both included.
+    swaps (int): Swaps of nearly_sorted, 1% of the size by default.
+
+    Yield:
+    np.ndarray: The next chunk as int64, the last one may be shorter.
+    """
+    distribution = DISTRIBUTIONS[name]
+    spec = Spec(size, seed, low, high, swaps)
+    chunk = max(1, -(-chunk // BLOCK)) * BLOCK
+    for start in range(0, size, chunk):
+        stop = min(size, start + chunk)
+        blocks = []
+        for block in range(start, stop, BLOCK):
+            positions = np.arange(block, min(stop, block + BLOCK), dtype=np.int64)
+            rng = np.random.default_rng([seed, 0, block // BLOCK])
+            blocks.append(distribution(positions, rng, spec))
+        yield np.concatenate(blocks).astype(np.int64, copy=False)
+
+
+def generate_array(name, size, seed=0, low=LOW, high=HIGH, swaps=None):
+    #Builds the whole array as one int64 NumPy array, see stream()
+    chunks = list(stream(name, size, seed, size, low, high, swaps))
+    return chunks[0] if chunks else np.zeros(0, dtype=np.int64)
+
+
+def generate(name, size, seed=0, low=LOW, high=HIGH, swaps=None):
+    """Builds an array of the given size from a named distribution as a list, the same seed gives the same array."""
+    return generate_array(name, size, seed, low, high, swaps).tolist()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Write a generated input to a file of int64 values, chunk by chunk.')
+    parser.add_argument('distribution', choices=list(DISTRIBUTIONS))
+    parser.add_argument('size', type=int, help='number of elements')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the generator')
+    parser.add_argument('--low', type=int, default=LOW, help='smallest value')
+    parser.add_argument('--high', type=int, default=HIGH, help='largest value')
+    parser.add_argument('--swaps', type=int, help='swaps of nearly_sorted (default: 1%% of the size)')
+    parser.add_argument('--chunk', type=int, default=1 << 22, help='elements generated at a time')
+    parser.add_argument('--out', required=True, help='file to write, raw int64 in native byte order')
+    args = parser.parse_args(argv)
+
+    with open(args.out, 'wb') as file:
+        for values in stream(args.distribution, args.size, args.seed, args.chunk, args.low, args.high, args.swaps):
+            values.tofile(file)
+    print(f'Wrote {args.size} {args.distribution} values to {args.out}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,200 @@
+#Headless export of an algorithm run as a PNG sequence or an animated GIF
+#Run from the src folder: python -m analysis.export quick_sort --size 2000 --every 50 --out quick.gif
+import argparse
+import os
+import sys
+from array import array
+from collections import deque
+from multiprocessing import Pool
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')  # Nothing is shown, set before pygame is imported
+import pygame
+from PIL import Image, GifImagePlugin
+
+from AlgorithmDictionary import AlgDict, SEARCHES, start_algorithm
+from algorithms.events import Step, COMPARE, SWAP, WRITE, PIVOT, FOUND
+from analysis.distributions import DISTRIBUTIONS, generate
+from visualization import BarRenderer, SurfarrayRenderer, step_highlights
+
+#colors, the same as the window uses
+GRAY = (127, 127, 127)
+WHITE = (250, 250, 250)
+RED = (255, 0, 0)
+GREEN = (0, 255, 0)
+BLUE = (0, 0, 255)
+STEP_COLORS = {COMPARE: RED, SWAP: RED, WRITE: RED, PIVOT: BLUE, FOUND: BLUE}
+
+WIDTH = 900
+HEIGHT = 400
+PENDING_PER_WORKER = 4  # Frames queued per worker before the run waits for the encoder
+HOLD_MS = 1000  # How long the last GIF frame is shown
+
+
+def palette_image():
+    #Fixed GIF palette: every bar color and its lighter shade (drawn by SurfarrayRenderer) on the background
+    colors = [WHITE]
+    for color in (GRAY, RED, GREEN, BLUE):
+        colors.append(color)
+        colors.append(tuple((c + b) // 2 for c, b in zip(color, WHITE)))
+    image = Image.new('P', (1, 1))
+    image.putpalette([c for color in colors for c in color] + [0, 0, 0] * (16 - len(colors)))
+    return image
+
+
+# Worker state, built once per process by init_worker
+worker = {}
+
+
+def init_worker(width, height, directory, duration):
+    # No pygame.init(), surfaces and drawing work without it, and SDL would
+    # catch the SIGTERM the pool uses to stop its workers
+    screen = pygame.Surface((width, height))
+    worker['screen'] = screen
+    worker['renderer'] = BarRenderer(screen, (0, 0, width, height), WHITE)
+    worker['bulk'] = SurfarrayRenderer(screen, (0, 0, width, height), WHITE)
+    worker['directory'] = directory
+    worker['duration'] = duration
+    worker['palette'] = palette_image()
+
+
+def render_frame(index, values, kind, a, b, done, last):
+    """
+    Worker: draws one frame and compresses it.
+
+    Parameters:
+    index (int): Frame number, used for the PNG file name.
+    values (bytes): The array as int64.
+    kind, a, b (int): The step that led to this state, kind -1 for none.
+    done (bool): Draw the bars in the finished color.
+    last (bool): Last frame of the run, a GIF shows it for longer.
+
+    Returns:
+    bytes: The encoded GIF frame, or None when PNGs are written.
+    """
+    numbers = array('q')
+    numbers.frombytes(values)
+    screen = worker['screen']
+    highlights = step_highlights(Step(kind, a, b), len(numbers), STEP_COLORS) if kind >= 0 else {}
+    active = worker['bulk'] if len(numbers) > screen.get_width() else worker['renderer']
+    active.draw(numbers, highlights, GREEN if done else GRAY)
+
+    image = Image.frombytes('RGB', screen.get_size(), pygame.image.tobytes(screen, 'RGB'))
+    if worker['directory'] is not None:
+        image.save(os.path.join(worker['directory'], f'frame_{index:06d}.png'))
+        return None
+    image = image.quantize(palette=worker['palette'], dither=Image.Dither.NONE)
+    duration = HOLD_MS if last else worker['duration']
+    return b''.join(GifImagePlugin.getdata(image, duration=duration))
+
+
+def export(name, data, out, every=100, target=0, workers=None, size=(WIDTH, HEIGHT), fps=30, log=None):
+    """
+    Runs an algorithm and exports every Nth state as a frame.
+
+    The algorithm runs in this process and its steps are applied to a copy
+    of the array. Every Nth state is sent to a worker pool that draws and
+    compresses it, at most a few frames per worker are in flight so long
+    runs never hold more than that in memory. GIF frames come back in order
+    and are appended to the file as they arrive.
+
+    Parameters:
+    name (str): Key of the algorithm in AlgDict.
+    data (list): The input array.
+    out (str): A .gif file, anything else is a directory for the PNGs.
+    every (int): Steps between two frames.
+    target (int): Value to search for, searches only.
+    workers (int): Pool size, defaults to the number of cores.
+    size (tuple): Frame width and height in pixels.
+    fps (int): GIF playback speed.
+
+    Returns:
+    tuple: Number of steps and number of frames.
+    """
+    every = max(1, every)
+    workers = workers or os.cpu_count() or 1
+    gif = out.lower().endswith('.gif')
+    directory = None if gif else out
+    if directory is not None:
+        os.makedirs(directory, exist_ok=True)
+
+    mirror = list(data)  # The array as the steps leave it, scratch buffer writes included
+    iterator = start_algorithm(name, list(data), target)
+    pending = deque()
+    frames = 0
+    steps = 0
+    last = None
+
+    file = open(out, 'wb') if gif else None
+    try:
+        with Pool(workers, init_worker, (size[0], size[1], directory, 1000 // max(1, fps))) as pool:
+            if gif:
+                header = palette_image().resize(size)
+                file.write(b''.join(GifImagePlugin.getheader(header, info={'loop': 0})[0]))
+
+            def collect():
+                #Waits for the oldest frame, GIF frames are written in the order they were sent
+                frame = pending.popleft().get()
+                if file is not None:
+                    file.write(frame)
+
+            def submit(step, done=False, final=False):
+                nonlocal frames
+                kind, a, b = (step.kind, step.a, step.b) if step is not None else (-1, -1, -1)
+                pending.append(pool.apply_async(render_frame, (frames, array('q', mirror).tobytes(), kind, a, b, done, final)))
+                frames += 1
+                # Enough frames are queued, this keeps the memory bounded
+                while len(pending) > PENDING_PER_WORKER * workers:
+                    collect()
+
+            submit(None)
+            for step in iterator:
+                step.apply(mirror)
+                steps += 1
+                last = step
+                if steps % every == 0:
+                    submit(step)
+                if log is not None and steps % (every * 1000) == 0:
+                    print(f'{steps} steps, {frames} frames', file=log)
+
+            # Final state: a found target stays highlighted, everything else is drawn as finished
+            if last is not None and last.kind == FOUND:
+                submit(last, final=True)
+            else:
+                submit(None, done=True, final=True)
+            while pending:
+                collect()
+        if file is not None:
+            file.write(b';')  # GIF trailer
+    finally:
+        if file is not None:
+            file.close()
+    return steps, frames
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Export an algorithm run as an animated GIF or a PNG sequence.')
+    parser.add_argument('algorithm', choices=list(AlgDict))
+    parser.add_argument('--size', type=int, default=100, help='input size')
+    parser.add_argument('--distribution', choices=list(DISTRIBUTIONS), default='uniform', help='input distribution')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the input generator')
+    parser.add_argument('--target', type=int, help='value to search for (searches only, default: last element)')
+    parser.add_argument('--every', type=int, default=100, help='steps between two frames')
+    parser.add_argument('--width', type=int, default=WIDTH, help='frame width in pixels')
+    parser.add_argument('--height', type=int, default=HEIGHT, help='frame height in pixels')
+    parser.add_argument('--fps', type=int, default=30, help='GIF playback speed')
+    parser.add_argument('--workers', type=int, help='processes drawing and compressing frames (default: all cores)')
+    parser.add_argument('--out', required=True, help='.gif file, or a directory for the PNG frames')
+    args = parser.parse_args(argv)
+
+    data = generate(args.distribution, args.size, args.seed)
+    target = args.target
+    if target is None:
+        target = data[-1] if data and args.algorithm in SEARCHES else 0
+    steps, frames = export(args.algorithm, data, args.out, args.every, target, args.workers,
+                           (args.width, args.height), args.fps, log=sys.stderr)
+    print(f'Exported {frames} frames of {steps} steps of {args.algorithm} to {args.out}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,52 @@
+#Sorts a file of int64 values that does not have to fit in memory, see algorithms.external_sort
+#Run from the src folder: python -m analysis.external_sort saw.bin --out sorted.bin --memory 256 --fan-in 16
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+from algorithms import external_sort_file
+from algorithms.external_sort import MEMORY_BUDGET, FAN_IN
+
+CHECK_CHUNK = 1 << 22 # Elements compared at a time by --check
+
+
+def is_sorted_file(path, chunk=CHECK_CHUNK):
+    #Checks a file of int64 values is in order, through a memory map
+    values = np.memmap(path, dtype=np.int64, mode='r') if os.path.getsize(path) else np.zeros(0, dtype=np.int64)
+    for start in range(0, len(values), chunk):
+        # Each chunk overlaps the next by one element so the boundary is checked too
+        window = values[start:start + chunk + 1]
+        if np.any(window[1:] < window[:-1]):
+            return False
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Sort a file of int64 values with an external merge sort.')
+    parser.add_argument('source', help='file to sort, raw int64 in native byte order')
+    parser.add_argument('--out', required=True, help='file to write, may be the source file')
+    parser.add_argument('--memory', type=float, default=MEMORY_BUDGET / (1 << 20), help='memory budget in MB')
+    parser.add_argument('--fan-in', type=int, default=FAN_IN, help='runs merged at once')
+    parser.add_argument('--tmpdir', help='directory for the run files (default: the system temp directory)')
+    parser.add_argument('--check', action='store_true', help='check the output is sorted')
+    args = parser.parse_args(argv)
+    if args.fan_in < 2:
+        parser.error('--fan-in must be at least 2')
+
+    start = time.perf_counter()
+    info = external_sort_file(args.source, args.out, int(args.memory * (1 << 20)), args.fan_in, args.tmpdir)
+    elapsed = time.perf_counter() - start
+    print(f'Sorted {info["elements"]} values in {elapsed:.2f}s: {info["runs"]} runs, {info["passes"]} merge passes')
+    if args.check:
+        if not is_sorted_file(args.out):
+            print(f'{args.out} is not sorted')
+            return 1
+        print(f'{args.out} is sorted')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,59 @@
+#Speedup and efficiency of parallel_sort_fast against the serial merge_sort_fast
+#Run from the src folder: python -m analysis.parallel_benchmark --size 1000000
+import argparse
+import os
+import sys
+
+from algorithms import merge_sort_fast, parallel_sort_fast
+from algorithms.parallel_sort import make_pool
+from analysis.analyzer import time_call, summarize
+from analysis.distributions import DISTRIBUTIONS, generate
+
+
+def run_scaling(size=1000000, workers=(1, 2, 4, 8), distribution='uniform', repeats=3, seed=0, log=None):
+    """
+    Times the serial merge_sort_fast and parallel_sort_fast with each worker count.
+
+    The pool is started before timing, so the numbers show the sort and not
+    the cost of starting processes.
+
+    Returns:
+    list: One row per worker count with the median time, the speedup over
+    the serial sort and the efficiency (speedup / workers).
+    """
+    data = generate(distribution, size, seed)
+    serial = summarize([time_call(merge_sort_fast, list(data), 0, size - 1) for _ in range(repeats)])['median_ns']
+    if log is not None:
+        print(f'serial merge_sort  {serial / 1e6:10.1f} ms', file=log)
+
+    rows = []
+    for count in workers:
+        if count == 1:
+            median = serial # One worker is the serial sort
+        else:
+            with make_pool(count) as pool:
+                samples = [time_call(parallel_sort_fast, list(data), 0, size - 1, workers=count, pool=pool) for _ in range(repeats)]
+            median = summarize(samples)['median_ns']
+        speedup = serial / median
+        rows.append({'workers': count, 'median_ns': median, 'speedup': speedup, 'efficiency': speedup / count})
+        if log is not None:
+            print(f'{count:2} workers         {median / 1e6:10.1f} ms  speedup {speedup:5.2f}  efficiency {speedup / count:5.2f}', file=log)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure how parallel_sort scales with the number of workers.')
+    parser.add_argument('--size', type=int, default=1000000, help='input size')
+    parser.add_argument('--workers', nargs='+', type=int, default=[1, 2, 4, 8], help='worker counts')
+    parser.add_argument('--distribution', choices=list(DISTRIBUTIONS), default='uniform', help='input distribution')
+    parser.add_argument('--repeats', type=int, default=3, help='measured runs per worker count')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the input generator')
+    args = parser.parse_args(argv)
+
+    print(f'{os.cpu_count()} cores available')
+    run_scaling(args.size, args.workers, args.distribution, args.repeats, args.seed, log=sys.stdout)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,82 @@
+#Cost per query of the searches when the same array is searched over and over
+#Run from the src folder: python -m analysis.search_benchmark --size 1000000 --queries 10000
+import argparse
+import sys
+
+import numpy as np
+
+from algorithms import linear_search_fast, binary_search_fast, exponential_search_fast, interpolation_search_fast
+from algorithms import batch_search_fast, SortedIndex
+from analysis.analyzer import time_call
+from analysis.distributions import DISTRIBUTIONS, generate
+
+ENGINES = {
+    'binary_search': binary_search_fast,
+    'exponential_search': exponential_search_fast,
+    'interpolation_search': interpolation_search_fast,
+}
+LINEAR_QUERIES = 100 # linear_search is O(n) a query, it only gets a sample of the queries
+
+
+def make_queries(data, count, seed=0):
+    #Half the targets are taken from the array, the other half are most likely missing
+    rng = np.random.default_rng([seed, 3])
+    hits = rng.choice(np.asarray(data), count - count // 2) if data else np.zeros(0, dtype=np.int64)
+    misses = rng.integers(min(data, default=0), max(data, default=0) + 2, count // 2)
+    queries = np.concatenate((hits, misses))
+    rng.shuffle(queries)
+    return queries.tolist()
+
+
+def run_queries(function, data, queries, index=None):
+    if index is None:
+        for target in queries:
+            function(data, target)
+    else:
+        for target in queries:
+            function(data, target, index=index)
+
+
+def run_searches(size=1000000, queries=10000, distribution='uniform', seed=0, log=None):
+    """
+    Times the searches on one array with the same queries.
+
+    The sorted index is built once and its time is reported on its own, the
+    searches are then passed it. linear_search needs no index.
+
+    Returns:
+    list: One row per search with the time per query in nanoseconds.
+    """
+    data = generate(distribution, size, seed, high=max(400, size))
+    targets = make_queries(data, queries, seed)
+
+    build = time_call(SortedIndex, data)
+    index = SortedIndex(data)
+    rows = [{'search': 'index build (once)', 'ns_per_query': build / max(1, queries)}]
+    sample = targets[:LINEAR_QUERIES]
+    rows.append({'search': 'linear_search', 'ns_per_query': time_call(run_queries, linear_search_fast, data, sample) / max(1, len(sample))})
+    for name, function in ENGINES.items():
+        rows.append({'search': name, 'ns_per_query': time_call(run_queries, function, data, targets, index) / max(1, queries)})
+    rows.append({'search': 'batch_search', 'ns_per_query': time_call(batch_search_fast, data, targets, index=index) / max(1, queries)})
+
+    if log is not None:
+        print(f'{size} {distribution} values, {queries} queries', file=log)
+        for row in rows:
+            print(f'{row["search"]:22} {row["ns_per_query"] / 1e3:12.3f} us per query', file=log)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare the cost per query of the searches on one array.')
+    parser.add_argument('--size', type=int, default=1000000, help='input size')
+    parser.add_argument('--queries', type=int, default=10000, help='targets looked up')
+    parser.add_argument('--distribution', choices=list(DISTRIBUTIONS), default='uniform', help='input distribution')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the input and the queries')
+    args = parser.parse_args(argv)
+
+    run_searches(args.size, args.queries, args.distribution, args.seed, log=sys.stdout)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
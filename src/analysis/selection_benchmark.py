@@ -0,0 +1,93 @@
+#Selection against a full sort when only the k smallest elements are needed
+#Run from the src folder: python -m analysis.selection_benchmark --size 1000000 --k 10 100 1000
+import argparse
+import sys
+
+from algorithms import Counters, quick_sort, merge_sort, quickselect, partial_sort, heap_top_k
+from algorithms import quick_sort_fast, merge_sort_fast, quickselect_fast, partial_sort_fast, heap_top_k_fast, top_k_stream
+from analysis.analyzer import run_to_completion, time_call, summarize
+from analysis.distributions import BLOCK, DISTRIBUTIONS, generate_array
+
+# name -> (fast version, visual version), called with the array and k
+FULL_SORTS = {
+    'quick_sort': (lambda arr, k: quick_sort_fast(arr, 0, len(arr) - 1), lambda arr, k, counters: quick_sort(arr, 0, len(arr) - 1, counters=counters)),
+    'merge_sort': (lambda arr, k: merge_sort_fast(arr, 0, len(arr) - 1), lambda arr, k, counters: merge_sort(arr, 0, len(arr) - 1, counters=counters)),
+}
+SELECTIONS = {
+    # Selecting rank k - 1 leaves the k smallest in front, unordered
+    'quickselect': (lambda arr, k: quickselect_fast(arr, 0, len(arr) - 1, k=k - 1), lambda arr, k, counters: quickselect(arr, 0, len(arr) - 1, k=k - 1, counters=counters)),
+    'partial_sort': (lambda arr, k: partial_sort_fast(arr, 0, len(arr) - 1, k=k), lambda arr, k, counters: partial_sort(arr, 0, len(arr) - 1, k=k, counters=counters)),
+    'heap_top_k': (lambda arr, k: heap_top_k_fast(arr, 0, len(arr) - 1, k=k), lambda arr, k, counters: heap_top_k(arr, 0, len(arr) - 1, k=k, counters=counters)),
+}
+
+
+def time_case(function, data, k, repeats):
+    #Median time in nanoseconds, every run gets a fresh copy of data
+    return summarize([time_call(function, list(data), k) for _ in range(repeats)])['median_ns']
+
+
+def count_case(generator, data, k):
+    #Comparisons of one visual run
+    counters = Counters()
+    run_to_completion(generator(list(data), k, counters))
+    return counters.comparisons
+
+
+def run_selection(size=1000000, ks=(10, 100, 1000), distribution='uniform', repeats=3, seed=0, count=False, log=None):
+    """
+    Times the full sorts once, then every selection for each k.
+
+    top_k_stream is fed the input in BLOCK sized chunks, as if it was read
+    from a stream. With count, the comparisons of the visual versions are
+    counted too, which is slow on big sizes.
+
+    Returns:
+    list: One row per algorithm and k with the median time, the speedup over
+    the fastest full sort and the comparisons (None without count).
+    """
+    values = generate_array(distribution, size, seed, high=max(400, size))
+    data = values.tolist()
+    chunks = [values[start:start + BLOCK] for start in range(0, size, BLOCK)]
+
+    rows = []
+    full = {}
+    for name, (fast, visual) in FULL_SORTS.items():
+        full[name] = time_case(fast, data, size, repeats)
+        rows.append({'algorithm': name, 'k': size, 'median_ns': full[name], 'speedup': None,
+                     'comparisons': count_case(visual, data, size) if count else None})
+    baseline = min(full.values())
+
+    for k in ks:
+        k = min(max(1, k), size)
+        cases = [(name, time_case(fast, data, k, repeats), count_case(visual, data, k) if count else None)
+                 for name, (fast, visual) in SELECTIONS.items()]
+        stream = summarize([time_call(top_k_stream, chunks, k) for _ in range(repeats)])['median_ns']
+        cases.append(('top_k_stream', stream, None))
+        for name, median, comparisons in cases:
+            rows.append({'algorithm': name, 'k': k, 'median_ns': median, 'speedup': baseline / median, 'comparisons': comparisons})
+
+    if log is not None:
+        print(f'{size} {distribution} values', file=log)
+        for row in rows:
+            speedup = f'{row["speedup"]:8.1f}x' if row['speedup'] is not None else ' ' * 9
+            comparisons = f'{row["comparisons"]:>14}' if row['comparisons'] is not None else ''
+            print(f'{row["algorithm"]:14} k={row["k"]:<9} {row["median_ns"] / 1e6:10.1f} ms {speedup}{comparisons}', file=log)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare the selections with a full sort for small k.')
+    parser.add_argument('--size', type=int, default=1000000, help='input size')
+    parser.add_argument('--k', nargs='+', type=int, default=[10, 100, 1000], help='number of smallest elements wanted')
+    parser.add_argument('--distribution', choices=list(DISTRIBUTIONS), default='uniform', help='input distribution')
+    parser.add_argument('--repeats', type=int, default=3, help='measured runs per case')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the input generator')
+    parser.add_argument('--counters', action='store_true', help='also count the comparisons of the visual versions')
+    args = parser.parse_args(argv)
+
+    run_selection(args.size, args.k, args.distribution, args.repeats, args.seed, args.counters, log=sys.stdout)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,98 @@
+#Checks that the memory of a Timeline stays flat while it records millions of steps
+#Run from the src folder: python -m analysis.timeline_memory --size 300000
+import argparse
+import sys
+import time
+import tracemalloc
+
+from AlgorithmDictionary import AlgDict, SEARCHES, start_algorithm
+from analysis.distributions import DISTRIBUTIONS, generate
+from visualization import Timeline
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+MB = 1 << 20
+
+
+def peak_memory():
+    """
+    Peak resident memory of the process in bytes. Where the resource module
+    is missing, the peak Python allocations seen by tracemalloc instead,
+    which is about ten times slower.
+    """
+    if resource is None:
+        return tracemalloc.get_traced_memory()[1]
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024  # kB on Linux, bytes on macOS
+
+
+def run_timeline(name='quick_sort', size=300000, distribution='uniform', seed=0, every=1000000, log=None):
+    """
+    Plays a whole run through a Timeline and samples the peak memory of the
+    process every so many steps, then seeks back and forth and checks the array.
+
+    quick_sort on 300000 elements takes about 5 million steps. If the
+    recording held on to its steps, the peak would grow with every sample.
+
+    Returns:
+    list: (steps, peak bytes) samples, the last one at the end of the run.
+    """
+    data = generate(distribution, size, seed)
+    if resource is None:
+        tracemalloc.start()
+    try:
+        timeline = Timeline(start_algorithm(name, list(data)), data)
+        samples = [(0, peak_memory())]
+        start = time.perf_counter()
+        for _ in timeline:
+            if timeline.position % every == 0:
+                samples.append((timeline.position, peak_memory()))
+                if log is not None:
+                    print(f'{timeline.position:>12} steps  peak {samples[-1][1] / MB:8.1f} MB  {time.perf_counter() - start:7.1f} s', file=log)
+        samples.append((timeline.position, peak_memory()))
+
+        # Seeking has to land on the same states as playing did
+        final = list(timeline.view)
+        timeline.seek(timeline.length // 2)
+        timeline.seek(0)
+        if timeline.view != list(data):
+            raise AssertionError('seeking to step 0 did not restore the initial array')
+        timeline.seek(timeline.length)
+        if timeline.view != final:
+            raise AssertionError('seeking to the last step did not restore the final array')
+        timeline.discard()
+    finally:
+        if resource is None:
+            tracemalloc.stop()
+
+    if log is not None:
+        print(f'{samples[-1][0]} steps, peak {samples[-1][1] / MB:.1f} MB', file=log)
+    return samples
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Check that recording a long run in a Timeline keeps memory flat.')
+    parser.add_argument('--algorithm', choices=[name for name in AlgDict if name not in SEARCHES], default='quick_sort')
+    parser.add_argument('--size', type=int, default=300000, help='input size')
+    parser.add_argument('--distribution', choices=list(DISTRIBUTIONS), default='uniform', help='input distribution')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the input generator')
+    parser.add_argument('--every', type=int, default=1000000, help='steps between two samples')
+    parser.add_argument('--limit', type=float, default=8.0, help='MB the peak may grow by from the first sample to the last')
+    args = parser.parse_args(argv)
+
+    samples = run_timeline(args.algorithm, args.size, args.distribution, args.seed, args.every, log=sys.stdout)
+    # The first million steps fill the write buffer, the read window and the producer ring
+    first = samples[1] if len(samples) > 2 else samples[0]
+    growth = (samples[-1][1] - first[1]) / MB
+    if growth > args.limit:
+        print(f'Peak memory grew by {growth:.1f} MB after step {first[0]}, more than {args.limit} MB')
+        return 1
+    print(f'Peak memory grew by {growth:.1f} MB after step {first[0]}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
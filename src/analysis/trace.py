@@ -0,0 +1,257 @@
+#Headless step-trace recorder and memory-mapped trace reader
+#Record from the src folder: python -m analysis.trace record quick_sort --size 1000 --out quick.trace
+#Play it back with: python main.py --trace quick.trace
+import argparse
+import mmap
+import struct
+import sys
+from array import array
+
+import numpy as np
+
+from AlgorithmDictionary import AlgDict, SEARCHES, start_algorithm
+from algorithms.events import Step
+from analysis.distributions import DISTRIBUTIONS, generate
+
+MAGIC = b'SAVTRACE'
+VERSION = 3
+HEADER = struct.Struct('<8sqqqbb6x')  # magic, version, array length, record count, bytes per index, bytes per value
+
+# Every record is one Step packed as a uint8 kind, the index a and b (see
+# algorithms.events). a only holds indices, b holds an index or the value of a
+# WRITE, so their widths are picked from the array length and the range of the
+# initial values. The initial array is stored at the value width too.
+FLUSH_RECORDS = 1 << 16  # Records buffered before they are written to disk
+INT_TYPES = (np.int8, np.int16, np.int32, np.int64)
+
+
+def int_type(low, high):
+    #Smallest signed integer type that holds every value in low..high
+    for kind in INT_TYPES:
+        info = np.iinfo(kind)
+        if info.min <= low and high <= info.max:
+            return np.dtype(kind)
+    raise OverflowError(f'{low}..{high} does not fit in 64 bits')
+
+
+def record_dtype(index_type, value_type):
+    #Packed layout of one record, 1 + 2 * 1..8 bytes
+    return np.dtype([('kind', np.uint8), ('a', index_type), ('b', value_type)])
+
+
+def unpack(block):
+    #Lists of the kinds, a and b of a block of records
+    return block['kind'].tolist(), block['a'].tolist(), block['b'].tolist()
+
+
+class TraceWriter:
+    """
+    Writes a trace file: the header, the initial array and then the records.
+    Records are buffered and written in blocks, the header is finished on close.
+
+    The widths are fixed when the file is started, from the length and the
+    values of the initial array. The algorithms only write values that were
+    in the array, a step that does not fit raises ValueError.
+
+    file can be an open binary file (e.g. a tempfile.TemporaryFile) to write
+    to instead of path. The records written so far can be read back with
+    read() while the trace is still being written.
+    """
+
+    def __init__(self, path, initial, file=None):
+        self.file = file if file is not None else open(path, 'w+b')
+        self.length = len(initial)
+        values = np.asarray(initial, dtype=np.int64)
+        low = min(int(values.min()), -1) if self.length else -1
+        high = max(int(values.max()), self.length - 1) if self.length else 0
+        self.index_type = int_type(-1, max(0, self.length - 1))  # -1 is "no index"
+        self.value_type = int_type(low, high)
+        self.dtype = record_dtype(self.index_type, self.value_type)
+        self.records = 0
+        self.kinds = array('B')
+        self.a = array('q')
+        self.b = array('q')
+        self.file.write(HEADER.pack(MAGIC, VERSION, self.length, 0, self.index_type.itemsize, self.value_type.itemsize))
+        self.file.write(values.astype(self.value_type).tobytes())
+        self.start = self.file.tell()  # Offset of the first record
+        self.flushed = 0  # Records already in the file
+
+    def add(self, kind, a, b):
+        self.kinds.append(kind)
+        self.a.append(a)
+        self.b.append(b)
+        self.records += 1
+        if len(self.kinds) >= FLUSH_RECORDS:
+            self.flush()
+
+    def flush(self):
+        count = len(self.kinds)
+        if count == 0:
+            return
+        records = np.empty(count, self.dtype)
+        records['kind'] = np.frombuffer(self.kinds, np.uint8)
+        for field, values, kind in (('a', self.a, self.index_type), ('b', self.b, self.value_type)):
+            values = np.frombuffer(values, np.int64)
+            info = np.iinfo(kind)
+            if values.min() < info.min or values.max() > info.max:
+                raise ValueError(f'a step has {field} outside of the {kind} range of this trace')
+            records[field] = values
+        self.file.write(records.tobytes())
+        self.flushed += count
+        self.kinds = array('B')
+        self.a = array('q')
+        self.b = array('q')
+
+    def read(self, start, stop):
+        """
+        Reads records start..stop-1 back, from the file and from the buffer.
+
+        Returns:
+        tuple: Lists of the kinds, a and b of the records.
+        """
+        stop = min(stop, self.records)
+        flushed = self.flushed
+        kinds, a, b = [], [], []
+        if start < min(stop, flushed):
+            size = self.dtype.itemsize
+            self.file.seek(self.start + start * size)
+            block = np.frombuffer(self.file.read((min(stop, flushed) - start) * size), self.dtype)
+            self.file.seek(0, 2)  # Back to the end for the next flush
+            kinds, a, b = unpack(block)
+        if stop > flushed:
+            first = max(start, flushed) - flushed
+            kinds += self.kinds[first:stop - flushed].tolist()
+            a += self.a[first:stop - flushed].tolist()
+            b += self.b[first:stop - flushed].tolist()
+        return kinds, a, b
+
+    def close(self):
+        try:
+            self.flush()
+            self.file.seek(0)
+            self.file.write(HEADER.pack(MAGIC, VERSION, self.length, self.records, self.index_type.itemsize, self.value_type.itemsize))
+        finally:
+            self.file.close()
+
+
+def record(iterator, initial, path):
+    """
+    Runs an algorithm iterator to completion and writes its trace to path.
+
+    Parameters:
+    iterator: Step iterator of an algorithm.
+    initial (list): The array before the algorithm ran.
+    path (str): File to write.
+
+    Returns:
+    int: Number of steps recorded.
+    """
+    writer = TraceWriter(path, initial)
+    try:
+        for step in iterator:
+            writer.add(step.kind, step.a, step.b)
+    finally:
+        writer.close()
+    return writer.records
+
+
+def record_algorithm(name, data, path, target=0):
+    """
+    Records a run of an AlgDict algorithm on a copy of data, without pygame.
+
+    Returns:
+    int: Number of steps recorded.
+    """
+    return record(start_algorithm(name, list(data), target), data, path)
+
+
+class TraceReader:
+    """
+    Reads a trace file through mmap, so the records are paged in from disk
+    while they are replayed instead of being loaded up front.
+    """
+
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.length, self.records, index_bytes, value_bytes = HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != VERSION:
+            self.map.close()
+            self.file.close()
+            raise ValueError(f'{path} is not a version {VERSION} trace file')
+        self.index_type = np.dtype(f'<i{index_bytes}')
+        self.value_type = np.dtype(f'<i{value_bytes}')
+        self.dtype = record_dtype(self.index_type, self.value_type)
+        start = HEADER.size
+        # Views into the map, nothing is copied until a block is read
+        self.initial = np.frombuffer(self.map, self.value_type, self.length, start)
+        start += self.initial.nbytes
+        self.data = np.frombuffer(self.map, self.dtype, self.records, start)
+
+    def initial_array(self):
+        return self.initial.tolist()
+
+    def replay(self, chunk=FLUSH_RECORDS):
+        """
+        Replays the trace.
+
+        Yield:
+        Step: The recorded steps, like the algorithms.
+        """
+        for start in range(0, self.records, chunk):
+            for kind, a, b in zip(*self.read(start, start + chunk)):
+                yield Step(kind, a, b)
+
+    def read(self, start, stop):
+        """
+        Reads records start..stop-1, only they are copied out of the map.
+
+        Returns:
+        tuple: Lists of the kinds, a and b of the records.
+        """
+        return unpack(self.data[start:stop])
+
+    def close(self):
+        # The map can only be closed once no array points into it
+        self.initial = self.data = None
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Record algorithm runs as trace files and inspect them.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    record_parser = commands.add_parser('record', help='record a run')
+    record_parser.add_argument('algorithm', choices=list(AlgDict))
+    record_parser.add_argument('--size', type=int, default=100, help='input size')
+    record_parser.add_argument('--distribution', choices=list(DISTRIBUTIONS), default='uniform', help='input distribution')
+    record_parser.add_argument('--seed', type=int, default=0, help='seed for the input generator')
+    record_parser.add_argument('--target', type=int, help='value to search for (searches only, default: last element)')
+    record_parser.add_argument('--out', required=True, help='trace file to write')
+
+    info_parser = commands.add_parser('info', help='show the size of a trace')
+    info_parser.add_argument('trace')
+    args = parser.parse_args(argv)
+
+    if args.command == 'record':
+        data = generate(args.distribution, args.size, args.seed)
+        target = args.target
+        if target is None:
+            target = data[-1] if data and args.algorithm in SEARCHES else 0
+        steps = record_algorithm(args.algorithm, data, args.out, target)
+        print(f'Recorded {steps} steps of {args.algorithm} to {args.out}')
+    else:
+        with TraceReader(args.trace) as trace:
+            print(f'{trace.length} elements, {trace.records} steps, {trace.dtype.itemsize} bytes per step')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
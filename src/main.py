@@ -1,16 +1,20 @@
+import argparse
 import pygame
-import random
 import math
 import time
-from visualization import Button, Window, TextBox, DropdownBox
-from src.algorithms.linear_search import linear_search
-from src.algorithms.quick_sort import quick_sort
-from AlgorithmDictionary import AlgDict
+from visualization import Button, Window, TextBox, DropdownBox, SlideBox, OutputBox
+from visualization import PlaybackScheduler, steps_from_ratio, BarRenderer, SurfarrayRenderer, Timeline, FrameStats, step_highlights
+from visualization import Lane, RaceScheduler, LaneRenderer
+from AlgorithmDictionary import AlgDict, SEARCHES, BATCHES, start_algorithm
+from algorithms import Counters, COMPARE, SWAP, WRITE, PIVOT, FOUND
+from analysis.trace import TraceReader
+from analysis.distributions import BOUNDED, generate
 
 pygame.init()
 
 #fonts
 font1 = pygame.font.SysFont('Times New Roman', 24)
+font2 = pygame.font.SysFont('Times New Roman', 18)
 
 #colors
 BLACK = (0, 0, 0)
@@ -25,12 +29,23 @@ MAGENTA = (255, 0, 255)
 
 #Screen size parameters
 SCREEN_WIDTH = 900
-SCREEN_HEIGHT = 500
+SCREEN_HEIGHT = 600
+BARS_RECT = (0, 0, SCREEN_WIDTH, 400)  # Area the bars are drawn in
+UI_RECT = (0, 400, SCREEN_WIDTH, SCREEN_HEIGHT - 400)  # Area the widgets are drawn in
+
+#Playback parameters
+FPS = 60  # Frame cap while an algorithm plays, nothing is drawn while idle unless an event comes in
+FRAME_BUDGET_MS = 12  # Time spent stepping per frame when the speed slider is maxed out
+BACKGROUND_POLL_MS = 100  # While paused the producer may still be running, its time and counters are refreshed this often
+STATS_INTERVAL = 5  # Seconds between two frame stats lines with --stats
 
 #screen and window set up
 SCREEN = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
 pygame.display.set_caption("Sorting Algorithm Visualizer")
-window = Window(SCREEN)
+window = Window(SCREEN, UI_RECT, WHITE)  # Widgets are only redrawn when they change
+renderer = BarRenderer(SCREEN, BARS_RECT, WHITE)  # Redraws only changed bars
+bulkRenderer = SurfarrayRenderer(SCREEN, BARS_RECT, WHITE)  # Used when there are more bars than pixels
+laneRenderer = LaneRenderer(SCREEN, BARS_RECT, WHITE)  # Draws the lanes of a race
 
 #Features to GUI
 window.add_widget(
@@ -53,41 +68,131 @@ window.add_widget(
     widget_id='Time',
     widget=TextBox((520, 440, 150, 50), 'Time', GRAY, font1, '0.0000s')
 )
+window.add_widget(
+    widget_id='speed_input',
+    widget=SlideBox((680, 440, 100, 50), 'Speed', GRAY, font1)
+)
+window.add_widget(
+    widget_id='counters',
+    widget=OutputBox((240, 500, 650, 30), '', GRAY, font2, str(Counters()))
+)
+window.add_widget(
+    widget_id='decision',  # Engine auto picked, why, and the features it measured
+    widget=OutputBox((30, 537, 860, 25), '', GRAY, font2)
+)
+window.add_widget(
+    widget_id='distribution_input',  # Shape of the arrays the reset button builds
+    widget=DropdownBox((30, 500, 200, 30), '', GRAY, font2, BOUNDED, WHITE)
+)
+window.add_widget(
+    widget_id='scrub',  # Position in the current run, drag it to seek
+    widget=SlideBox((30, 565, 860, 30), '', GRAY, font1)
+)
 
 
 #drawing bars
-def drawBars(screen, array, redBar1, redBar2, blueBar1, blueBar2, greenRows = {}):
-    #Draw the bars and control their colors
+#color of the bars a step points at, by step kind
+STEP_COLORS = {COMPARE: RED, SWAP: RED, WRITE: RED, PIVOT: BLUE, FOUND: BLUE}
+
+
+def drawBars(screen, array, step=None, done=False, touched=None):
+    #Draw the bars and control their colors, only bars that changed are redrawn
+    #touched holds the indices written since the last frame, without it the renderer compares the whole array
     numBars = len(array)
-    if numBars != 0:
-        bar_width  = 900 / numBars
-        ceil_width = math.ceil(bar_width)
+    highlights = step_highlights(step, numBars, STEP_COLORS)
+    active = bulkRenderer if numBars > SCREEN_WIDTH else renderer
+    return active.draw(array, highlights, GREEN if done else GRAY, touched)
+
+
+def drawRace(screen, race):
+    #Draw every lane of a race and its name, time and operation count
+    lanes = race.lanes
+    rects = laneRenderer.draw(
+        [lane.view for lane in lanes],
+        [{} if lane.finished else step_highlights(lane.last, len(lane.view), STEP_COLORS) for lane in lanes],
+        [GREEN if lane.finished else GRAY for lane in lanes],
+        [(lane.steps, lane.finished) for lane in lanes])
+    if rects:
+        # the lanes were blitted over the old captions
+        for lane, rect in zip(lanes, laneRenderer.lane_rects(len(lanes))):
+            screen.blit(font2.render(lane.label(), True, BLACK), (rect.x + 5, rect.y + 1))
+    return rects
 
-    for num in range(numBars):
-        if   num in (redBar1, redBar2)  : color = RED
-        elif num in (blueBar1, blueBar2): color = BLUE
-        elif num in greenRows           : color = GREEN
-        else                            : color = GRAY
-        pygame.draw.rect(screen, color, (num * bar_width, 400 - array[num], ceil_width, array[num]))
 
+def newRace(names, numbers, fairness):
+    #Gives every algorithm its own copy of the array
+    lanes = []
+    for name in names:
+        counters = Counters()
+        lanes.append(Lane(name, start_algorithm(name, list(numbers), counters=counters), numbers, counters))
+    return RaceScheduler(lanes, fairness)
 
-def main():
+
+def newTimeline(timeline, iterator, initial, trace=None):
+    #Drops the recording of the previous run and starts recording a new one, or plays the trace
+    if timeline is not None:
+        timeline.discard()
+    return Timeline(iterator, initial, threaded=trace is None, trace=trace)
+
+
+def main(trace_path=None, fps=FPS, showStats=False, raceNames=None, fairness='steps', seed=0):
     numbers = []
     numberReset = False
     running = True
     isPlaying = False
     isSorting = False
     isSearching = False
-    sortingIterator = None
+    scheduler = None
+    timeline = None  # Recording of the current run, kept while paused so it can be scrubbed
+    timelineAlgorithm = None
+    race = None  # Race of the --race algorithms, replaces the timeline in race mode
+    scrubRatio = 0.0
+    renderTime = 0.0  # Time the loop spent stepping the timeline and drawing, the algorithm runs on its own thread
+    counters = Counters()
+    decisions = []  # Engine auto picked for the current run, reported from the producer thread
+    dropdownWasOpen = False
+    clock = pygame.time.Clock()
+    stats = FrameStats()
+
+    # a saved trace is played instead of a live algorithm until the array is reset
+    trace = TraceReader(trace_path) if trace_path else None
+    if trace is not None:
+        numbers = trace.initial_array()
+
+    SCREEN.fill(WHITE)
+    pygame.display.flip()
 
     # game loop
     while running:
-        SCREEN.fill(WHITE)
-        for event in pygame.event.get():
+        dirtyRects = []
+        playing = isSorting or isSearching
+        if playing:
+            events = pygame.event.get()
+        else:
+            # Nothing plays, sleep until something happens
+            if showStats:
+                events = [pygame.event.wait(STATS_INTERVAL * 1000)]
+            elif timeline is not None and timeline.producer is not None and not timeline.producer.finished:
+                events = [pygame.event.wait(BACKGROUND_POLL_MS)]
+            else:
+                events = [pygame.event.wait()]
+            events += pygame.event.get()
+
+        frameStart = time.perf_counter()
+        for event in events:
             if event.type == pygame.QUIT:
                 running = False
 
-            window.update(event)
+            # step through a paused run with the arrow keys
+            elif event.type == pygame.KEYDOWN and timeline is not None and not (isSorting or isSearching):
+                if event.key == pygame.K_LEFT:
+                    timeline.back()
+                elif event.key == pygame.K_RIGHT:
+                    next(timeline, None)
+                if scheduler is not None:
+                    scheduler.moved()
+
+        window.update(events)
 
         isPlaying = window.get_widget_value('play_button')
         numberReset = window.get_widget_value('generate_array')
@@ -95,82 +200,185 @@ def main():
         #reset button
         if numberReset:
             numBars = int(window.get_widget_value('size_input'))
-            numbers = [random.randint(10, 400) for i in range(numBars)]
+            numbers = generate(window.get_widget_value('distribution_input'), numBars, seed)
+            seed += 1  # Every reset gives a new array, the same ones every session
             window.set_widget_value('generate_array', False)
+            if timeline is not None:
+                timeline.discard()
+            timeline = None
+            scheduler = None
+            race = None
+            decisions = []
+            if trace is not None:
+                trace.close()
+                trace = None
+
 
+        #play button pressed in race mode, a finished race starts over on the same array
+        if isPlaying and not (isSorting or isSearching) and raceNames:
+            if race is None or race.finished:
+                race = newRace(raceNames, numbers, fairness)
+                laneRenderer.invalidate()
+                renderTime = 0.0
+            isSorting = True
 
         #play button pressed
-        if isPlaying and not (isSorting or isSearching):
+        elif isPlaying and not (isSorting or isSearching):
 
             # initialize sorting iterator
             sortingAlgorithm = window.get_widget_value('algorithm_input')
-            start_time = time.time()
-            if sortingAlgorithm == 'quick_sort':
-                sortingIterator = quick_sort(numbers, 0, numBars - 1)
-            if sortingAlgorithm == 'linear_search':
+            if timeline is not None and not timeline.at_end() and timelineAlgorithm == sortingAlgorithm:
+                # Resume the paused run from where the timeline is
+                isSearching = sortingAlgorithm in SEARCHES and trace is None
+                isSorting = not isSearching
+            elif trace is not None:
+                # Play the saved trace from its initial array, steps are read from the file as they are needed
+                counters = Counters()
+                decisions = []
+                timeline = newTimeline(timeline, None, trace.initial_array(), trace)
+                isSorting = True
+            elif sortingAlgorithm in SEARCHES:
                 if 'target_input' not in window.widgets:
-                    window.add_widget(  # Button appears after linear search
+                    window.add_widget(  # Box appears after the first search, batch_search takes targets separated by commas
                         widget_id='target_input',
-                        widget=TextBox((750, 440, 100, 50), 'Target', GRAY, font1, '0')
+                        widget=TextBox((790, 440, 100, 50), 'Target', GRAY, font1, '0', chars=',')
                     )
-                # Linear search case: use the target value from the input box
-                try:
-                    target_value = int(window.get_widget_value('target_input'))
-                except ValueError:
-                    target_value = 0  # Default to 0 if the input is invalid
+                # Use the target values from the input box, invalid ones are skipped
+                targets = [int(text) for text in window.get_widget_value('target_input').split(',') if text.isdigit()] or [0]
+                target_value = targets if sortingAlgorithm in BATCHES else targets[0]
 
-                sortingIterator = linear_search(numbers, target_value)
+                counters = Counters()
+                decisions = []
+                timeline = newTimeline(timeline, start_algorithm(sortingAlgorithm, list(numbers), target_value, counters=counters), numbers)
                 isSearching = True
             else:
-                # Other sorting algorithms
-                sortingIterator = AlgDict[sortingAlgorithm](numbers, 0, numBars - 1)
-            isSorting = True
+                # Other sorting algorithms, auto reports the engine it picks into decisions
+                counters = Counters()
+                decisions = []
+                timeline = newTimeline(timeline, start_algorithm(sortingAlgorithm, list(numbers), counters=counters, report=decisions.append), numbers)
+                isSorting = True
+            timelineAlgorithm = sortingAlgorithm
+            numbers = timeline.view  # The bars show the timeline, which may be behind the algorithm
+            scheduler = PlaybackScheduler(timeline)
+            if timeline.length == 0:
+                renderTime = 0.0
 
         #play button not pressed
         if not isPlaying:
             isSorting = False
             isSearching = False
 
+        #speed slider, applied every frame so it can be changed while playing
+        for active in (scheduler, race):
+            if active is None:
+                continue
+            steps = steps_from_ratio(window.widgets['speed_input'].get_ratio())
+            if steps is None:
+                active.set_speed(step_budget_ms=FRAME_BUDGET_MS)
+            else:
+                active.set_speed(steps_per_frame=steps)
+
+        playing = isSorting or isSearching
+
+        #race mode, every lane is drawn, running or not
+        if race is not None:
+            if isSorting:
+                race.advance()
+                if race.finished:
+                    isSorting = False
+                    window.set_widget_value('play_button', False)
+            dirtyRects += drawRace(SCREEN, race)
+
         #searching algorithm
-        if isSearching:
-            try:
-                # Fetch the next step of the linear search
-                values = next(sortingIterator)
-
-                if len(values) == 5:
-                    # Linear search case: 5 values expected
-                    numbers, redBar1, redBar2, blueBar1, blueBar2 = values
-                    drawBars(SCREEN, numbers, redBar1, redBar2, blueBar1, blueBar2)
-
-                    # Stop the search when the target is found
-                    if blueBar1 != -1:
-                        pygame.time.delay(1000)  # Pause for 2 seconds to show the found target
-                        isSearching = False  # Stop searching
-                        window.set_widget_value('play_button', False)
-
-            except StopIteration:
+        elif isSearching:
+            # Run a batch of search steps and draw the last one
+            values = scheduler.advance() or scheduler.last
+            if values is not None:
+                numbers, step = values
+                dirtyRects += drawBars(SCREEN, numbers, step, touched=scheduler.take_touched())
+
+            # Stop the search when the target is found or the array is exhausted
+            if values is not None and step is not None and step.kind == FOUND:
+                pygame.display.update(dirtyRects)
+                pygame.time.delay(1000)  # Pause for 1 second to show the found target
+                isSearching = False  # Stop searching
+                timeline.close()  # The search returns after finding the target, this ends the timeline
+                window.set_widget_value('play_button', False)
+            elif scheduler.finished:
                 isSearching = False
                 window.set_widget_value('play_button', False)
 
         #sorting algorithm
-        if isSorting:
-            try:
-                numbers, redBar1, redBar2, blueBar1, blueBar2 = next(sortingIterator)
-                drawBars(SCREEN, numbers, redBar1, redBar2, blueBar1, blueBar2)
-            except StopIteration:
-                end_time = time.time()
-                elapsed_time = start_time - end_time
-
-                window.set_widget_value('Time', f'{elapsed_time:.4f}s')
+        elif isSorting:
+            # Run a batch of sorting steps and draw the last one
+            values = scheduler.advance() or scheduler.last
+            if values is not None:
+                numbers, step = values
+                dirtyRects += drawBars(SCREEN, numbers, step, touched=scheduler.take_touched())
 
+            if scheduler.finished:
                 isSorting = False
                 window.set_widget_value('play_button', False)
+        elif timeline is not None and not timeline.at_end():
+            # paused part way, show the step the timeline is on
+            numbers, step = timeline.state()
+            dirtyRects += drawBars(SCREEN, numbers, step)
+        else:
+            dirtyRects += drawBars(SCREEN, numbers, done=True)
+
+        #scrub slider, seeks when it was dragged and follows the playback otherwise
+        scrub = window.widgets['scrub']
+        if timeline is not None:
+            if scrub.get_ratio() != scrubRatio:
+                timeline.seek(round(scrub.get_ratio() * timeline.length))
+                if scheduler is not None:
+                    scheduler.moved()  # A seek can change any bar
+            scrub.set_ratio(timeline.position / max(1, timeline.length))
+        else:
+            scrub.set_ratio(0.0)
+        scrubRatio = scrub.get_ratio()
+
+        # The dropdown opens over the bars, so they are restored in full when it closes
+        dropdownOpen = window.widgets['algorithm_input'].openDropdown or window.widgets['distribution_input'].openDropdown
+        if dropdownOpen or dropdownWasOpen:
+            renderer.invalidate()
+            bulkRenderer.invalidate()
+            laneRenderer.invalidate()
+        dropdownWasOpen = dropdownOpen
+
+        #time the algorithm itself took, not the time spent showing it
+        if race is not None:
+            window.set_widget_value('Time', f'{race.compute_time():.4f}s')
+            window.set_widget_value('counters', f'Race of {len(race.lanes)}, equal {race.fairness}  Render {renderTime:.3f}s')
         else:
-            drawBars(SCREEN, numbers, -1, -1, -1, -1, greenRows=set(range(len(numbers))))
+            if timeline is not None and timeline.compute_time() is not None:
+                window.set_widget_value('Time', f'{timeline.compute_time():.4f}s')  # A trace has no time of its own
+            window.set_widget_value('counters', f'{counters}  Render {renderTime:.3f}s')
+        window.set_widget_value('decision', str(decisions[0]) if decisions else '')
+        dirtyRects += window.render()
+        pygame.display.update(dirtyRects)
+        frameTime = time.perf_counter() - frameStart
+        stats.frame(frameTime, idle=not playing)
+        if playing:
+            renderTime += frameTime
+            clock.tick(fps)
+        if showStats and time.perf_counter() - stats.wall_start >= STATS_INTERVAL:
+            print(stats, flush=True)
+            stats.restart()
 
-        window.render()
-        pygame.display.update()
+    if timeline is not None:
+        timeline.discard()
 
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description='Sorting Algorithm Visualizer')
+    parser.add_argument('--trace', help='play a trace saved with "python -m analysis.trace record" instead of a live algorithm')
+    parser.add_argument('--fps', type=int, default=FPS, help='frame cap while an algorithm plays')
+    parser.add_argument('--stats', action='store_true', help=f'print frame times and CPU use every {STATS_INTERVAL} seconds')
+    parser.add_argument('--race', nargs='+', metavar='ALGORITHM', choices=[name for name in AlgDict if name not in SEARCHES],
+                        help='race these sorts side by side on the same array')
+    parser.add_argument('--fair', choices=['steps', 'time'], default='steps',
+                        help='give every lane of a race the same number of steps or the same CPU time')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the first array the reset button builds')
+    args = parser.parse_args()
+    main(args.trace, args.fps, args.stats, args.race, args.fair, args.seed)
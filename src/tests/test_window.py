@@ -0,0 +1,33 @@
+#Hit-testing of the main window's widgets, run from the src folder: python -m pytest tests
+import importlib
+import os
+
+import pytest
+
+SRC = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope='module')
+def window():
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    cwd = os.getcwd()
+    os.chdir(SRC)  # The button images are loaded from assets/
+    try:
+        main = importlib.import_module('main')
+    finally:
+        os.chdir(cwd)
+    return main.window
+
+
+@pytest.mark.parametrize('widget_id', ['play_button', 'generate_array', 'Time', 'speed_input'])
+def test_widget_at_bottom_of_controls(window, widget_id):
+    # The counters box under these controls has no label, it must not take their clicks
+    widget = window.widgets[widget_id]
+    rect = widget.rect.clip(widget.area())  # A button is as big as its image
+    for pos in (rect.center, (rect.centerx, rect.bottom - 1)):
+        assert window.widget_at(pos) is window.widgets[widget_id]
+
+
+def test_widget_at_play_button(window):
+    assert window.widget_at((370, 470)) is window.widgets['play_button']
@@ -3,4 +3,17 @@ from .visualizer import Window
 from .visualizer import Box
 from .visualizer import InputBox
 from .visualizer import TextBox
-from .visualizer import DropdownBox
\ No newline at end of file
+from .visualizer import OutputBox
+from .visualizer import SlideBox
+from .visualizer import DropdownBox
+from .scheduler import PlaybackScheduler
+from .scheduler import steps_from_ratio
+from .renderer import BarRenderer
+from .renderer import step_highlights
+from .rasterizer import SurfarrayRenderer
+from .rasterizer import LaneRenderer
+from .timeline import Timeline
+from .producer import StepProducer
+from .framestats import FrameStats
+from .race import Lane
+from .race import RaceScheduler
@@ -0,0 +1,57 @@
+#File for frame time statistics, shows how busy the main loop keeps the CPU
+import time
+from collections import deque
+
+
+class FrameStats:
+    """
+    Collects the work time of the last frames, without the time spent
+    waiting for events or for the frame cap, and the CPU time the whole
+    process used (the producer thread included), so the cost of an idle
+    or a playing window can be checked.
+    """
+
+    def __init__(self, size=600):
+        self.times = deque(maxlen=size) # Work time of the last frames in seconds
+        self.frames = 0
+        self.idle_frames = 0 # Frames drawn while nothing was playing, after an event woke the loop
+        self.restart()
+
+    def restart(self):
+        #Starts a new measuring interval for the CPU share
+        self.times.clear()
+        self.frames = 0
+        self.idle_frames = 0
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+
+    def frame(self, seconds, idle=False):
+        self.times.append(seconds)
+        self.frames += 1
+        if idle:
+            self.idle_frames += 1
+
+    def summary(self):
+        """
+        Returns:
+        dict: Frames and idle frames in this interval, mean, p95 and max work
+        time of the recent frames in ms, and the CPU used as a percentage of
+        one core.
+        """
+        times = sorted(self.times)
+        wall = time.perf_counter() - self.wall_start
+        cpu = time.process_time() - self.cpu_start
+        return {
+            'frames': self.frames,
+            'idle_frames': self.idle_frames,
+            'mean_ms': 1000 * sum(times) / len(times) if times else 0.0,
+            'p95_ms': 1000 * times[min(len(times) - 1, int(0.95 * len(times)))] if times else 0.0,
+            'max_ms': 1000 * times[-1] if times else 0.0,
+            'cpu_percent': 100 * cpu / wall if wall > 0 else 0.0,
+        }
+
+    def __str__(self):
+        stats = self.summary()
+        return (f"Frames {stats['frames']} (idle {stats['idle_frames']})  "
+                f"frame mean {stats['mean_ms']:.2f} ms  p95 {stats['p95_ms']:.2f} ms  max {stats['max_ms']:.2f} ms  "
+                f"CPU {stats['cpu_percent']:.1f}%")
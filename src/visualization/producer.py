@@ -0,0 +1,104 @@
+#File for the step producer, runs an algorithm on its own thread so slow frames and slow steps do not hold each other up
+import threading
+import time
+from array import array
+
+RING_STEPS = 1 << 16 # Default ring size in steps (3 int64 each, 1.5 MB)
+WAIT_TIMEOUT = 0.05 # Longest the worker sleeps on a full ring before it checks again
+CLOCK_EVERY = 256 # Steps between two updates of compute_time
+
+
+class StepProducer:
+    """
+    Steps an algorithm iterator on a worker thread and passes the steps to
+    the render loop through a bounded ring buffer.
+
+    Every Step is stored as three int64 (kind, a, b) in a ring that is
+    allocated once. When it is full the worker waits until the render loop
+    has taken some steps, so a paused run never holds more than one ring
+    of steps.
+
+    The thread only counts its own CPU time, so compute_time is the time
+    the algorithm took without the time spent drawing it.
+    """
+
+    def __init__(self, iterator, capacity=RING_STEPS):
+        self.iterator = iterator
+        self.capacity = max(1, capacity)
+        self.ring = array('q', bytes(24 * self.capacity))
+        self.head = 0 # Steps written by the worker
+        self.tail = 0 # Steps taken by the render loop
+        self.finished = False
+        self.stopped = False
+        self.error = None
+        self.compute_time = 0.0
+        self.waiting = False # Worker is waiting for room in the ring
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def run(self):
+        #Worker thread: steps the algorithm and pushes every step into the ring
+        start = time.thread_time()
+        ring = self.ring
+        capacity = self.capacity
+        head = 0
+        try:
+            for step in self.iterator:
+                while head - self.tail == capacity:
+                    # Ring is full, wait for the render loop to take steps
+                    with self.condition:
+                        if self.stopped:
+                            return
+                        self.waiting = True
+                        self.condition.wait(WAIT_TIMEOUT)
+                        self.waiting = False
+                k = 3 * (head % capacity)
+                ring[k] = step.kind
+                ring[k + 1] = step.a
+                ring[k + 2] = step.b
+                head += 1
+                self.head = head # Publishes the step
+                if head % CLOCK_EVERY == 0:
+                    self.compute_time = time.thread_time() - start
+                    if self.stopped:
+                        return
+        except Exception as error:
+            self.error = error # Raised again by take() in the render thread
+        finally:
+            self.compute_time = time.thread_time() - start
+            self.finished = True
+
+    def take(self):
+        """
+        Takes the oldest step out of the ring without waiting.
+
+        Returns:
+        tuple: kind, a and b of the step, or None if the worker has not
+        produced a step yet.
+        """
+        tail = self.tail
+        if tail == self.head:
+            if self.finished and self.error is not None:
+                error, self.error = self.error, None
+                raise error
+            return None
+
+        k = 3 * (tail % self.capacity)
+        step = self.ring[k:k + 3]
+        self.tail = tail + 1
+        if self.waiting:
+            with self.condition:
+                self.condition.notify_all()
+        return step
+
+    def stop(self):
+        #Stops the worker after its current step and waits for it
+        self.stopped = True
+        with self.condition:
+            self.condition.notify_all()
+        if self.thread.is_alive() and self.thread is not threading.current_thread():
+            self.thread.join()
@@ -0,0 +1,135 @@
+#File for the race mode, steps several algorithms on copies of one array and keeps them fair
+import time
+
+FAIRNESS = ('steps', 'time')
+CHUNK = 64  # Steps a lane runs before the scheduler looks at the clock or switches lanes
+
+
+class Lane:
+    """
+    One algorithm in a race.
+
+    The steps are applied to view, a copy of the input, so the lane can be
+    drawn like a Timeline. cpu_time is the CPU time spent in the
+    algorithm and in applying its steps, without the time spent drawing.
+    """
+
+    def __init__(self, name, iterator, initial, counters):
+        self.name = name
+        self.iterator = iterator
+        self.view = list(initial)
+        self.counters = counters
+        self.steps = 0
+        self.cpu_time = 0.0
+        self.finished = False
+        self.place = None  # 1 for the first lane to finish
+        self.last = None  # Last step, None before the first one
+
+    def run(self, count):
+        #Runs up to count steps, returns the number of steps taken
+        view = self.view
+        iterator = self.iterator
+        taken = 0
+        start = time.thread_time()
+        try:
+            for _ in range(count):
+                step = next(iterator)
+                step.apply(view)
+                taken += 1
+                self.last = step
+        except StopIteration:
+            self.finished = True
+        self.cpu_time += time.thread_time() - start
+        self.steps += taken
+        return taken
+
+    def label(self):
+        place = f'{self.place}. ' if self.place is not None else ''
+        return (f'{place}{self.name}  {self.cpu_time:.4f}s  {self.steps} steps  '
+                f'Comparisons {self.counters.comparisons}  Writes {self.counters.writes}')
+
+
+class RaceScheduler:
+    """
+    Advances every lane of a race each frame, with the same interface as
+    PlaybackScheduler.
+
+    With 'steps' fairness every lane gets the same number of steps, so the
+    race shows which algorithm needs fewer operations. With 'time' fairness
+    the lane that used the least CPU time runs next, CHUNK steps at a time,
+    so every lane gets the same share of the CPU and the race shows which
+    algorithm is faster on this machine.
+
+    A batch is steps_per_frame steps per lane, or as many steps as fit in
+    step_budget_ms for all lanes together.
+    """
+
+    def __init__(self, lanes, fairness='steps', steps_per_frame=1, step_budget_ms=None):
+        if fairness not in FAIRNESS:
+            raise ValueError(f'fairness must be one of {FAIRNESS}, got {fairness!r}')
+        self.lanes = lanes
+        self.fairness = fairness
+        self.steps_per_frame = steps_per_frame
+        self.step_budget_ms = step_budget_ms
+        self.finished = not lanes
+        self.places = 0
+
+    def set_speed(self, steps_per_frame=1, step_budget_ms=None):
+        self.steps_per_frame = max(1, int(steps_per_frame))
+        self.step_budget_ms = step_budget_ms
+
+    def advance(self):
+        #Runs one batch, returns the number of steps taken over all lanes
+        running = [lane for lane in self.lanes if not lane.finished]
+        if not running:
+            self.finished = True
+            return 0
+
+        deadline = None
+        if self.step_budget_ms is not None:
+            deadline = time.perf_counter() + self.step_budget_ms / 1000
+        if self.fairness == 'steps':
+            taken = self.advance_steps(list(running), deadline)
+        else:
+            taken = self.advance_time(list(running), deadline)
+
+        # Lanes that finished in the same batch are placed by what the race is fair in
+        key = (lambda lane: lane.steps) if self.fairness == 'steps' else (lambda lane: lane.cpu_time)
+        for lane in sorted((lane for lane in running if lane.finished), key=key):
+            self.places += 1
+            lane.place = self.places
+        self.finished = all(lane.finished for lane in self.lanes)
+        return taken
+
+    def advance_steps(self, running, deadline):
+        #Round robin, every lane takes the same number of steps
+        taken = 0
+        if deadline is None:
+            for lane in running:
+                taken += lane.run(self.steps_per_frame)
+            return taken
+        while running and time.perf_counter() < deadline:
+            for lane in running:
+                taken += lane.run(CHUNK)
+            running = [lane for lane in running if not lane.finished]
+        return taken
+
+    def advance_time(self, running, deadline):
+        #The lane with the least CPU time runs next, so the CPU time stays even
+        taken = 0
+        quota = None if deadline is not None else self.steps_per_frame * len(running)
+        while running:
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            if quota is not None and taken >= quota:
+                break
+            lane = min(running, key=lambda lane: lane.cpu_time)
+            count = CHUNK if quota is None else min(CHUNK, quota - taken)
+            taken += lane.run(count)
+            if lane.finished:
+                running.remove(lane)
+        return taken
+
+    def compute_time(self):
+        #CPU time of all lanes together
+        return sum(lane.cpu_time for lane in self.lanes)
@@ -0,0 +1,206 @@
+#File for the NumPy bar rasterizer, builds the whole bar image in one vectorized pass
+import numpy as np
+import pygame
+
+
+class Palette:
+    """
+    Colors of an 8-bit bar surface: the background at index 0, then every
+    bar color followed by its lighter shade. Colors are added the first
+    time they are drawn.
+    """
+
+    def __init__(self, background):
+        self.background = tuple(background)
+        self.colors = [self.background]
+        self.slots = {}  # Color -> palette index
+        self.changed = True
+
+    def index(self, color):
+        #Palette index of a bar color, its lighter shade is the next index
+        color = tuple(color)
+        slot = self.slots.get(color)
+        if slot is None:
+            if len(self.colors) > 254:
+                raise ValueError('too many bar colors for an 8-bit palette')
+            slot = len(self.colors)
+            self.slots[color] = slot
+            self.colors.append(color)
+            self.colors.append(tuple((c + b) // 2 for c, b in zip(color, self.background)))
+            self.changed = True
+        return slot
+
+    def apply(self, surface):
+        #Copies new colors to the surface
+        if self.changed:
+            surface.set_palette(self.colors)
+            self.changed = False
+
+
+def rasterize(array, highlights, base_color, palette, width, height, rows=None, scale=None):
+    """
+    Builds the bar image as palette indices, see SurfarrayRenderer.
+
+    Parameters:
+    array (list): The values to draw.
+    highlights (dict): Index -> color for highlighted bars.
+    base_color (tuple): Color of every other bar.
+    palette (Palette): Palette of the surface the image is drawn on.
+    width, height (int): Size of the image in pixels.
+    rows (np.ndarray): np.arange(height), passed in so it is not rebuilt every frame.
+    scale (int): Value drawn at the full height, by default a value is its height in pixels.
+
+    Returns:
+    np.ndarray: The image as (width, height) uint8 palette indices, ready for surfarray.
+    """
+    if rows is None:
+        rows = np.arange(height)
+    numBars = len(array)
+    values = np.fromiter(array, dtype=np.int64, count=numBars)
+    if scale:
+        values = values * height // scale
+
+    if numBars == 0:
+        low = high = np.zeros(width, dtype=np.int64)
+    elif numBars > width:
+        # Bucket the bars that share a pixel column
+        starts = np.arange(width) * numBars // width
+        low = np.minimum.reduceat(values, starts)
+        high = np.maximum.reduceat(values, starts)
+    else:
+        # Every column shows exactly one bar
+        low = high = values[np.arange(width) * numBars // width]
+    low = np.clip(low, 0, height)
+    high = np.clip(high, 0, height)
+
+    colors = np.full(width, palette.index(base_color), dtype=np.uint8)
+    for index, color in highlights.items():
+        left = index * width // numBars
+        right = max((index + 1) * width // numBars, left + 1)
+        colors[left:right] = palette.index(color)
+
+    # Pixel rows at or below the top of the min / max bar in each column
+    inLow = rows[None, :] >= (height - low)[:, None]
+    inHigh = rows[None, :] >= (height - high)[:, None]
+
+    # low <= high, so a pixel in inLow is also in inHigh: background 0, lighter shade color + 1, color
+    return inHigh.view(np.uint8) * (colors + 1)[:, None] - inLow.view(np.uint8)
+
+
+class SurfarrayRenderer:
+    """
+    Draws the bars by building the image with NumPy and blitting it
+    through pygame.surfarray.
+
+    When there are more bars than pixel columns, the bars of each column are
+    aggregated into a bucket: the column is drawn up to the smallest value in
+    the bucket in the bar color and up to the largest value in a lighter
+    shade, and it takes a highlight color if any bar in it is highlighted.
+
+    The image is built as 8-bit palette indices and pygame turns them into
+    colors when it blits, which is much faster than building RGB pixels.
+
+    Has the same draw() interface as BarRenderer.
+    """
+
+    def __init__(self, screen, rect, background):
+        self.screen = screen
+        self.rect = pygame.Rect(rect)
+        self.palette = Palette(background)
+        self.surface = pygame.Surface(self.rect.size, depth=8)
+        self.rows = np.arange(self.rect.h)  # Row index of every pixel in a column
+
+    def invalidate(self):
+        #Every frame is a full redraw, nothing is cached
+        pass
+
+    def draw(self, array, highlights, base_color, touched=None):
+        """
+        Draws the array onto the screen.
+
+        Parameters:
+        array (list): The values to draw.
+        highlights (dict): Index -> color for highlighted bars.
+        base_color (tuple): Color of every other bar.
+        touched (iterable): Unused, every frame is rasterized from scratch.
+
+        Returns:
+        list: Screen rectangles that were redrawn.
+        """
+        pixels = rasterize(array, highlights, base_color, self.palette, self.rect.w, self.rect.h, self.rows)
+        self.palette.apply(self.surface)
+        pygame.surfarray.blit_array(self.surface, pixels)
+        self.screen.blit(self.surface, self.rect)
+        return [self.rect.copy()]
+
+
+class LaneRenderer:
+    """
+    Draws several arrays on top of each other, one lane each, for the race
+    mode.
+
+    All lanes share one palette image and one surface: a frame rasterizes
+    the lanes that moved, then blits the whole area once. Every lane keeps
+    label_height pixels free at its top for a caption, and its values are
+    scaled so the largest one fills the lane.
+    """
+
+    def __init__(self, screen, rect, background, gap=4, label_height=20):
+        self.screen = screen
+        self.rect = pygame.Rect(rect)
+        self.palette = Palette(background)
+        self.gap = gap
+        self.label_height = label_height
+        self.surface = pygame.Surface(self.rect.size, depth=8)
+        self.pixels = np.zeros((self.rect.w, self.rect.h), dtype=np.uint8)
+        self.versions = []  # Version of every lane as it was last drawn
+        self.full = True
+
+    def invalidate(self):
+        #Forces every lane to be redrawn next frame
+        self.full = True
+
+    def lane_rects(self, count):
+        #Screen rectangle of each lane, the caption strip included
+        height = (self.rect.h - self.gap * (count - 1)) // max(1, count)
+        return [pygame.Rect(self.rect.x, self.rect.y + i * (height + self.gap), self.rect.w, height)
+                for i in range(count)]
+
+    def draw(self, arrays, highlights, base_colors, versions):
+        """
+        Draws the lanes onto the screen.
+
+        Parameters:
+        arrays (list): The values of every lane.
+        highlights (list): Index -> color dict of every lane.
+        base_colors (list): Bar color of every lane.
+        versions (list): Anything that changes when a lane has to be redrawn,
+        e.g. its step count. Lanes with the same version as last frame are skipped.
+
+        Returns:
+        list: Screen rectangles that were redrawn, empty when no lane moved.
+        """
+        count = len(arrays)
+        if self.full or len(self.versions) != count:
+            self.pixels[:] = 0
+            self.versions = [None] * count
+            self.full = False
+
+        changed = False
+        for i, rect in enumerate(self.lane_rects(count)):
+            if versions[i] == self.versions[i]:
+                continue
+            self.versions[i] = versions[i]
+            changed = True
+            top = rect.y - self.rect.y
+            barHeight = rect.h - self.label_height
+            scale = max(arrays[i]) if len(arrays[i]) else 1
+            self.pixels[:, top + self.label_height:top + rect.h] = rasterize(
+                arrays[i], highlights[i], base_colors[i], self.palette, rect.w, barHeight, scale=max(1, scale))
+        if not changed:
+            return []
+
+        self.palette.apply(self.surface)
+        pygame.surfarray.blit_array(self.surface, self.pixels)
+        self.screen.blit(self.surface, self.rect)
+        return [self.rect.copy()]
@@ -0,0 +1,133 @@
+#File for the incremental bar renderer, only redraws bars that changed
+import pygame
+
+from algorithms.events import WRITE
+
+
+def step_highlights(step, numBars, colors):
+    """
+    Picks the bars a step points at.
+
+    Parameters:
+    step (Step): The step to show, or None.
+    numBars (int): Number of bars, indices outside the array are skipped.
+    colors (dict): Step kind -> color, kinds that are missing are not highlighted.
+
+    Returns:
+    dict: Index -> color of the highlighted bars.
+    """
+    highlights = {}
+    color = colors.get(step.kind) if step is not None else None
+    if color is not None:
+        # the b of a write is the value written, not a bar
+        for bar in ((step.a,) if step.kind == WRITE else (step.a, step.b)):
+            if 0 <= bar < numBars:
+                highlights[bar] = color
+    return highlights
+
+
+class BarRenderer:
+    """
+    Keeps the bars on a persistent surface and redraws only the bars that
+    changed since the last frame, plus the bars that were highlighted.
+
+    draw() returns the screen rectangles that changed so they can be passed
+    to pygame.display.update(rects).
+    """
+
+    def __init__(self, screen, rect, background):
+        self.screen = screen
+        self.rect = pygame.Rect(rect)
+        self.background = background
+        self.surface = pygame.Surface(self.rect.size)
+        self.shadow = []  # Copy of the array as it was last drawn
+        self.highlights = {}  # Index -> color of the bars highlighted last frame
+        self.base_color = None
+        self.full = True
+
+    def invalidate(self):
+        #Forces a full redraw next frame (e.g. after something was drawn over the bars)
+        self.full = True
+
+    def draw(self, array, highlights, base_color, touched=None):
+        """
+        Draws the array onto the screen.
+
+        Parameters:
+        array (list): The values to draw.
+        highlights (dict): Index -> color for highlighted bars.
+        base_color (tuple): Color of every other bar.
+        touched (iterable): Indices written since the last frame. When None the
+        changed indices are found by comparing against the last drawn array.
+
+        Returns:
+        list: Screen rectangles that were redrawn.
+        """
+        numBars = len(array)
+        if self.full or numBars != len(self.shadow) or base_color != self.base_color:
+            return self.redraw(array, highlights, base_color)
+
+        if touched is None:
+            dirty = {i for i, (new, old) in enumerate(zip(array, self.shadow)) if new != old}
+        else:
+            dirty = set(touched)
+        dirty.update(self.highlights)
+        dirty.update(highlights)
+        if not dirty:
+            return []
+
+        shadow = self.shadow
+        for i in dirty:
+            shadow[i] = array[i]
+        self.highlights = highlights
+
+        rects = []
+        for x0, x1 in self.columns(dirty, numBars):
+            rects.append(self.draw_columns(array, x0, x1, numBars))
+        return rects
+
+    def redraw(self, array, highlights, base_color):
+        #Redraws every bar and pushes the whole bar area
+        self.full = False
+        self.shadow = list(array)
+        self.highlights = highlights
+        self.base_color = base_color
+        self.draw_columns(array, 0, self.rect.w, len(array))
+        return [self.rect.copy()]
+
+    def columns(self, indices, numBars):
+        #Pixel spans [x0, x1) covered by the given bar indices, neighbouring spans are joined
+        width = self.rect.w
+        spans = []
+        for i in sorted(indices):
+            x0 = i * width // numBars
+            x1 = max((i + 1) * width // numBars, x0 + 1)
+            if spans and x0 <= spans[-1][1]:
+                spans[-1][1] = max(spans[-1][1], x1)
+            else:
+                spans.append([x0, x1])
+        return spans
+
+    def draw_columns(self, array, x0, x1, numBars):
+        #Clears the pixel columns [x0, x1) and draws every bar that falls in them
+        width = self.rect.w
+        height = self.rect.h
+        surface = self.surface
+        highlights = self.highlights
+        base_color = self.base_color
+        area = pygame.Rect(x0, 0, x1 - x0, height)
+        surface.fill(self.background, area)
+
+        first = x0 * numBars // width  # First bar that can cover x0
+        last = -(-x1 * numBars // width)  # First bar starting at or after x1
+        for num in range(first, min(last, numBars)):
+            left = num * width // numBars
+            right = max((num + 1) * width // numBars, left + 1)
+            if right <= x0:
+                continue
+            color = highlights.get(num, base_color)
+            pygame.draw.rect(surface, color, (left, height - array[num], right - left, array[num]))
+
+        screen_rect = area.move(self.rect.x, self.rect.y)
+        self.screen.blit(surface, screen_rect, area)
+        return screen_rect
@@ -0,0 +1,117 @@
+#File for the playback scheduler, decouples algorithm steps from drawn frames
+import time
+
+from algorithms.events import SWAP, WRITE
+
+
+class PlaybackScheduler:
+    """
+    Advances an algorithm iterator by a batch of steps each frame.
+
+    A batch is either a fixed number of steps (steps_per_frame) or as many
+    steps as fit in a time budget (step_budget_ms). Only the last state of
+    each batch is handed back to be drawn. An iterator can yield None when
+    it has no step ready yet (see Timeline), which ends the batch early.
+
+    The iterator yields (array, step) pairs. The indices that SWAP and WRITE
+    steps change are collected until take_touched(), so a renderer only has
+    to look at those bars instead of comparing the whole array.
+    """
+
+    def __init__(self, iterator, steps_per_frame=1, step_budget_ms=None):
+        self.iterator = iterator
+        self.steps_per_frame = steps_per_frame
+        self.step_budget_ms = step_budget_ms
+        self.finished = False
+        self.last = None  # Last values yielded by the iterator
+        self.steps = 0  # Total steps taken so far
+        self.touched = None  # Indices changed since take_touched(), None when unknown
+
+    def set_speed(self, steps_per_frame=1, step_budget_ms=None):
+        self.steps_per_frame = max(1, int(steps_per_frame))
+        self.step_budget_ms = step_budget_ms
+
+    def moved(self):
+        #The array was changed outside the scheduler (e.g. a seek), which indices changed is unknown
+        self.touched = None
+
+    def take_touched(self):
+        """
+        Returns:
+        set: Indices changed by the steps since the last call, or None when
+        they are unknown and the caller has to compare the whole array.
+        """
+        touched = self.touched
+        self.touched = set()
+        return touched
+
+    def advance(self):
+        """
+        Run one batch of steps.
+
+        Returns:
+        tuple: The last values yielded in this batch, or None if the
+        iterator was already exhausted.
+        """
+        if self.finished:
+            return None
+
+        last = None
+        iterator = self.iterator
+        touched = self.touched
+        try:
+            if self.step_budget_ms is None:
+                for _ in range(self.steps_per_frame):
+                    values = next(iterator)
+                    if values is None:
+                        break
+                    last = values
+                    self.steps += 1
+                    if touched is not None:
+                        touch(touched, values[1])
+            else:
+                # Check the clock every few steps, perf_counter is not free
+                deadline = time.perf_counter() + self.step_budget_ms / 1000
+                stalled = False
+                while not stalled:
+                    for _ in range(64):
+                        values = next(iterator)
+                        if values is None:
+                            stalled = True
+                            break
+                        last = values
+                        self.steps += 1
+                        if touched is not None:
+                            touch(touched, values[1])
+                    if time.perf_counter() >= deadline:
+                        break
+        except StopIteration:
+            self.finished = True
+
+        if last is not None:
+            self.last = last
+        return last
+
+
+def touch(touched, step):
+    #Adds the indices a step changes to the touched set
+    if step is None:
+        return
+    if step.kind == SWAP:
+        touched.add(step.a)
+        touched.add(step.b)
+    elif step.kind == WRITE:
+        touched.add(step.a)
+
+
+def steps_from_ratio(ratio, max_exponent=14):
+    """
+    Maps a slider position between 0 and 1 to a steps per frame value.
+
+    The scale is exponential (1, 2, 4, ... 2**max_exponent) so the slider is
+    useful for both small and huge arrays. Returns None at the far right,
+    which means "as fast as the frame budget allows".
+    """
+    if ratio >= 0.99:
+        return None
+    return int(2 ** (ratio * max_exponent))
@@ -0,0 +1,232 @@
+#File for the seekable timeline, records a run as it plays so it can be scrubbed and stepped backwards
+import tempfile
+from array import array
+
+from algorithms.events import Step, SWAP, WRITE
+from analysis.trace import TraceWriter, FLUSH_RECORDS
+from .producer import StepProducer
+
+KEYFRAME_MIN = 256 # Fewest steps between two keyframes
+READ_BLOCK = FLUSH_RECORDS # Most steps read back from the recording at once
+
+
+class Keyframes:
+    """
+    Copies of the array every K steps, kept in a temporary file as int64 so
+    they take no memory however long the run gets.
+    """
+
+    def __init__(self, initial, tmpdir=None):
+        self.file = tempfile.TemporaryFile(prefix='timeline_', dir=tmpdir)
+        self.size = len(initial)
+        self.count = 0
+        self.append(array('q', initial))
+
+    def append(self, values):
+        #Adds a copy of values (an int64 array) as the next keyframe
+        self.file.seek(0, 2)
+        values.tofile(self.file)
+        self.count += 1
+
+    def load(self, index, out):
+        #Copies keyframe index into the list out
+        self.file.seek(8 * self.size * index)
+        values = array('q')
+        values.fromfile(self.file, self.size)
+        out[:] = values
+
+    def close(self):
+        self.file.close()
+
+
+def apply_steps(arr, kinds, a, b):
+    #Applies the steps given as lists of kinds, a and b to arr
+    for kind, first, second in zip(kinds, a, b):
+        if kind == SWAP:
+            arr[first], arr[second] = arr[second], arr[first]
+        elif kind == WRITE:
+            arr[first] = second
+
+
+class Timeline:
+    """
+    Iterator over the steps of an algorithm that can also seek to any step
+    it has already passed.
+
+    Memory stays flat however long the run is. The steps are written to a
+    temporary trace file (see analysis.trace), only the last FLUSH_RECORDS
+    of them are held in its buffer and at most READ_BLOCK are read back at
+    a time. Every K steps a copy of the whole array is written to a second
+    temporary file as a keyframe. Seeking loads the nearest keyframe before
+    the target and applies at most K steps, so it is O(K). K grows with the
+    array size so the keyframes never take much more room than the steps.
+
+    Step 0 is the initial array, step s is the state after the s-th yield.
+    The array is stored as int64, so only integer arrays work.
+
+    With threaded set the algorithm runs ahead on a StepProducer thread and
+    the timeline takes its steps from the producer's ring buffer. When the
+    producer is behind, iterating yields None instead of a state and
+    StopIteration only comes once the algorithm is done.
+
+    With trace set (an analysis.trace.TraceReader) the timeline plays a saved
+    trace instead of an iterator. Its steps are read straight from the
+    trace's map and are not recorded again, and the keyframes are made the
+    first time a seek needs them.
+    """
+
+    def __init__(self, iterator, initial, keyframe_interval=None, threaded=False, tmpdir=None, trace=None):
+        self.iterator = iterator
+        self.interval = keyframe_interval or max(KEYFRAME_MIN, len(initial))
+        self.view = list(initial) # Array as it is at the current position
+        self.head = array('q', initial) # Array as it is at the last recorded step, or the last keyframe of a trace
+        self.keyframes = Keyframes(initial, tmpdir)
+        if trace is None:
+            self.log = TraceWriter(None, initial, file=tempfile.TemporaryFile(prefix='timeline_', dir=tmpdir))
+        else:
+            self.log = trace
+        self.trace = trace
+        self.window = ([], [], []) # Kinds, a and b of the steps read back last
+        self.window_start = 0
+        self.newest = None # Kind, a and b of the last recorded step, playing live never reads steps back
+        self.length = trace.records if trace is not None else 0 # Steps recorded so far
+        self.position = 0
+        self.exhausted = trace is not None # A trace has nothing left to record
+        # Started last, the copies above must be taken before the algorithm touches the array
+        self.producer = StepProducer(iterator).start() if threaded and trace is None else None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        #Moves one step forward, replaying a recorded step or taking a new one from the algorithm
+        if self.position == self.length and not self.record():
+            if self.exhausted:
+                raise StopIteration
+            return None # The producer has no step ready yet
+        self.position += 1
+        self.apply(self.position)
+        return self.state()
+
+    def record(self):
+        #Pulls the next step from the algorithm, returns False when it is exhausted or the producer is behind
+        if self.exhausted:
+            return False
+        if self.producer is not None:
+            finished = self.producer.finished # Read first, a step may arrive in between
+            step = self.producer.take()
+            if step is None:
+                self.exhausted = finished
+                return False
+            self.add_step(*step)
+            return True
+
+        try:
+            step = next(self.iterator)
+        except StopIteration:
+            self.exhausted = True
+            return False
+        self.add_step(step.kind, step.a, step.b)
+        return True
+
+    def add_step(self, kind, a, b):
+        #Appends a step and applies it to the newest state
+        head = self.head
+        if kind == SWAP:
+            head[a], head[b] = head[b], head[a]
+        elif kind == WRITE:
+            head[a] = b
+        self.log.add(kind, a, b)
+        self.newest = (kind, a, b)
+        self.length += 1
+        if self.length % self.interval == 0:
+            self.keyframes.append(head)
+
+    def step(self, position):
+        #kind, a and b of the step at position, read back through a window of READ_BLOCK steps
+        if position == self.length and self.newest is not None:
+            return self.newest
+        offset = position - 1 - self.window_start
+        if not 0 <= offset < len(self.window[0]):
+            self.window_start = position - 1
+            self.window = self.log.read(position - 1, position - 1 + READ_BLOCK)
+            offset = 0
+        kinds, a, b = self.window
+        return kinds[offset], a[offset], b[offset]
+
+    def apply(self, position):
+        #Applies the step at position to the view
+        kind, a, b = self.step(position)
+        if kind == SWAP:
+            view = self.view
+            view[a], view[b] = view[b], view[a]
+        elif kind == WRITE:
+            self.view[a] = b
+
+    def state(self):
+        """
+        Returns:
+        tuple: The array at the current position and the Step that led to it (None at step 0).
+        """
+        if self.position == 0:
+            return self.view, None
+        return self.view, Step(*self.step(self.position))
+
+    def seek(self, step):
+        """
+        Moves to the given step. Steps that were not recorded yet are taken
+        from the algorithm, past the end it stops at the last step.
+
+        Returns:
+        tuple: The state at the new position, see state().
+        """
+        step = max(0, step)
+        while step > self.length and self.record():
+            pass
+        step = min(step, self.length)
+
+        if step < self.position or step - self.position > self.interval:
+            # Start from the closest keyframe at or before the step
+            keyframe = step // self.interval
+            self.scan(keyframe)
+            self.keyframes.load(keyframe, self.view)
+            self.position = keyframe * self.interval
+        while self.position < step:
+            stop = min(step, self.position + READ_BLOCK)
+            apply_steps(self.view, *self.log.read(self.position, stop))
+            self.position = stop
+        return self.state()
+
+    def scan(self, keyframe):
+        #Makes the keyframes of a trace up to the given one, a recording makes them while it records
+        interval = self.interval
+        while self.keyframes.count <= keyframe:
+            start = (self.keyframes.count - 1) * interval
+            for first in range(start, start + interval, READ_BLOCK):
+                apply_steps(self.head, *self.log.read(first, min(first + READ_BLOCK, start + interval)))
+            self.keyframes.append(self.head)
+
+    def back(self):
+        #Steps one step backwards
+        return self.seek(self.position - 1)
+
+    def at_end(self):
+        #True when the algorithm is exhausted and the position is its last step
+        return self.exhausted and self.position == self.length
+
+    def compute_time(self):
+        #Seconds the producer thread spent in the algorithm, None when not threaded
+        return self.producer.compute_time if self.producer is not None else None
+
+    def close(self):
+        #Stops recording, the steps recorded so far can still be played and seeked
+        if self.producer is not None:
+            self.producer.stop()
+        self.exhausted = True
+
+    def discard(self):
+        #Stops recording and deletes the recording, the timeline cannot be used after this
+        self.close()
+        if self.trace is None:
+            self.log.file.close() # A trace belongs to the caller and stays open
+        self.keyframes.close()
@@ -2,13 +2,45 @@
 import pygame, sys
 from abc import ABC, abstractmethod #Abstract base classes, help to make different shapes
 
+# Events that carry a mouse position, and events that go to the widget under the mouse
+MOUSE_EVENTS = {pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEMOTION}
+POINTED_EVENTS = {pygame.KEYDOWN, pygame.KEYUP, pygame.TEXTINPUT, pygame.MOUSEWHEEL}
+
+
 class Window:
-    def __init__(self, screen):
+    """
+    Holds the widgets and draws them in retained mode: a widget is only
+    redrawn when it is dirty, and render() returns the rects that changed
+    so only those have to be sent to the display.
+
+    Mouse and key events only go to the widget under the mouse, found
+    through a grid of GRID_CELL pixel cells that lists the widgets
+    overlapping each cell. The grid is rebuilt when widgets are added or
+    removed or when a widget changes its area (a dropdown opening). Other
+    events go to every widget.
+
+    rect is the part of the screen the window owns; it is cleared with the
+    background colour under a widget before the widget redraws. Widgets
+    that reach outside of it (an open dropdown) draw over whatever is there
+    and the owner of that area has to restore it.
+    """
+
+    GRID_CELL = 64
+
+    def __init__(self, screen, rect=None, background=(0, 0, 0)):
         self.screen = screen
+        self.rect = pygame.Rect(rect) if rect is not None else screen.get_rect()
+        self.background = background
         self.widgets = {}
+        self.cleared = [] # Areas of removed widgets, cleared on the next render
+        self.grid = None # (cell x, cell y) -> widgets overlapping the cell, built when needed
 
     def add_widget(self, widget_id, widget):
+        if widget_id in self.widgets:
+            self.cleared.append(self.widgets[widget_id].drawn_area)
+        widget.dirty = True
         self.widgets[widget_id] = widget
+        self.grid = None
 
     def get_widget_value(self, widget_id):
         return self.widgets[widget_id].get_value()
@@ -17,20 +49,101 @@ class Window:
         return self.widgets[widget_id].set_value(value)
 
     def remove_widget(self, widget_id):
-        del self.widgets[widget_id]
+        self.cleared.append(self.widgets.pop(widget_id).drawn_area)
+        self.grid = None
 
     def set_widget_visibility(self, widget_id, visible):
         #Sets visibility of a widget
         if widget_id in self.widgets:
             self.widgets[widget_id].visible = visible
 
-    def render(self):
+    def invalidate(self):
+        #Redraw every widget on the next render, after something else drew over them
         for widget in self.widgets.values():
-            widget.render(self.screen)
+            widget.dirty = True
 
-    def update(self, event):
+    def render(self):
+        """
+        Redraws the dirty widgets.
+
+        Returns:
+        list: Rects of the screen that changed.
+        """
+        dirty = [widget for widget in self.widgets.values() if widget.is_dirty()]
+        if not dirty and not self.cleared:
+            return []
+
+        # Clear where the dirty widgets were and will be, and redraw the other widgets in those areas
+        areas = [area for area in self.cleared if area is not None]
+        self.cleared = []
+        for widget in dirty:
+            if widget.drawn_area is not None:
+                areas.append(widget.drawn_area)
+            areas.append(widget.area())
+        overlapped = True
+        while overlapped:
+            overlapped = False
+            for widget in self.widgets.values():
+                if widget not in dirty and widget.drawn_area is not None and widget.drawn_area.collidelist(areas) != -1:
+                    dirty.append(widget)
+                    areas.append(widget.drawn_area)
+                    overlapped = True
+
+        for area in areas:
+            self.screen.fill(self.background, area.clip(self.rect))
+        for widget in self.widgets.values():
+            if widget in dirty:
+                widget.render(self.screen)
+                widget.drawn_area = widget.area()
+                widget.dirty = False
+                areas.append(widget.drawn_area) # Can be bigger once new text is rendered
+        return areas
+
+    def build_grid(self):
+        cell = self.GRID_CELL
+        self.grid = {}
         for widget in self.widgets.values():
-            widget.update(event)
+            area = widget.area()
+            for x in range(area.left // cell, (area.right - 1) // cell + 1):
+                for y in range(area.top // cell, (area.bottom - 1) // cell + 1):
+                    self.grid.setdefault((x, y), []).append(widget)
+
+    def widget_at(self, pos):
+        #The widget under pos, the one added last wins where widgets overlap
+        if self.grid is None:
+            self.build_grid()
+        for widget in reversed(self.grid.get((pos[0] // self.GRID_CELL, pos[1] // self.GRID_CELL), ())):
+            if widget.area().collidepoint(pos):
+                return widget
+        return None
+
+    def update(self, events):
+        """
+        Hands the events of one frame to the widgets.
+
+        The mouse position is sampled once for the frame, and only if an
+        event has no position of its own. Every widget gets it from here
+        instead of asking pygame itself.
+        """
+        framePos = None
+        for event in events:
+            if event.type in MOUSE_EVENTS:
+                pos = event.pos
+            else:
+                if framePos is None:
+                    framePos = pygame.mouse.get_pos()
+                pos = framePos
+                if event.type not in POINTED_EVENTS:
+                    for widget in self.widgets.values():
+                        widget.update(event, pos)
+                    continue
+
+            widget = self.widget_at(pos)
+            if widget is not None:
+                area = widget.area()
+                widget.update(event, pos)
+                if widget.area() != area:
+                    self.grid = None
 
 
 
@@ -38,9 +151,19 @@ class Box:
     def __init__(self, rect):
         self.isActive = False
         self.rect = pygame.Rect(rect)
+        self.dirty = True # Has to be redrawn
+        self.drawn_area = None # Area it covered when it was last drawn
 
-    def update(self, event):
-        self.mousePos = pygame.mouse.get_pos()
+    def area(self):
+        #Part of the screen the widget draws on
+        return self.rect.copy()
+
+    def is_dirty(self):
+        return self.dirty
+
+    def update(self, event, pos):
+        #pos is the mouse position, from the event or sampled once per frame by Window
+        self.mousePos = pos
         self.clicked = event.type == pygame.MOUSEBUTTONDOWN and self.rect.collidepoint(self.mousePos)
         self.hovered = self.rect.collidepoint(self.mousePos)
 
@@ -51,20 +174,27 @@ class Button(Box):
         self.active_img = pygame.image.load(active_img_path)
         self.active = False
 
+    def area(self):
+        img = self.active_img if self.active else self.inactive_img
+        return img.get_rect(topleft=self.rect.topleft)
+
     def render(self, screen):
         img = self.active_img if self.active else self.inactive_img
         screen.blit(img, (self.rect.x, self.rect.y))
 
-    def update(self, event):
-        super().update(event)
+    def update(self, event, pos):
+        super().update(event, pos)
         if self.clicked:
             self.active = not self.active
+            self.dirty = True
 
     def get_value(self):
         return self.active
 
     def set_value(self, value):
-        self.active = value
+        if value != self.active:
+            self.active = value
+            self.dirty = True
 
 
 class OutputBox(Box):
@@ -74,25 +204,38 @@ class OutputBox(Box):
         self.color = color
         self.font = font
         self.text = initial_text  # The initial text or output
+        self.label_surface = font.render(label, True, color)
+        self.text_surface = None  # Rendered text, cached until the text changes
+
+    def label_rect(self):
+        return self.label_surface.get_rect(topleft=(self.rect.x + (self.rect.w - self.label_surface.get_width()) / 2, self.rect.y - 32))
+
+    def area(self):
+        if not self.label:
+            return self.rect.copy() # An empty label takes no room, the widgets above keep their clicks
+        return self.rect.union(self.label_rect())
 
     def render(self, screen):
         # Draw the label
-        label_surface = self.font.render(self.label, True, self.color)
-        screen.blit(label_surface, (self.rect.x + (self.rect.w - label_surface.get_width()) / 2, self.rect.y - 32))
+        screen.blit(self.label_surface, self.label_rect())
 
         # Draw the text inside the box
-        text_surface = self.font.render(self.text, True, self.color)
-        screen.blit(text_surface, text_surface.get_rect(center=self.rect.center))
+        if self.text_surface is None:
+            self.text_surface = self.font.render(self.text, True, self.color)
+        screen.blit(self.text_surface, self.text_surface.get_rect(center=self.rect.center))
 
         # Draw the box outline
         pygame.draw.rect(screen, self.color, self.rect, 2)
 
-    def update(self, event):
+    def update(self, event, pos):
         # OutputBox doesn't interact with input, so no need to handle input events
         pass
 
     def set_value(self, value):
-        self.text = value  # Set the text to display
+        if value != self.text:
+            self.text = value  # Set the text to display
+            self.text_surface = None
+            self.dirty = True
 
     def get_value(self):
         return self.text  # Get the current text in the output box
@@ -104,10 +247,18 @@ class InputBox(ABC, Box):
         self.label = label
         self.color = color
         self.font = font
+        self.label_surface = font.render(label, True, color)
+
+    def label_rect(self):
+        return self.label_surface.get_rect(topleft=(self.rect.x + (self.rect.w - self.label_surface.get_width()) / 2, self.rect.y - 32))
+
+    def area(self):
+        if not self.label:
+            return self.rect.copy() # An empty label takes no room, the widget above keeps its clicks
+        return self.rect.union(self.label_rect())
 
     def render(self, screen):
-        label = self.font.render(self.label, True, self.color)
-        screen.blit(label, (self.rect.x + (self.rect.w - label.get_width()) / 2, self.rect.y - 32))
+        screen.blit(self.label_surface, self.label_rect())
         pygame.draw.rect(screen, self.color, self.rect, 2)
 
     @abstractmethod
@@ -119,56 +270,79 @@ class InputBox(ABC, Box):
         pass
 
 class TextBox(InputBox):
-    def __init__(self, rect, label, color, font, text):
+    def __init__(self, rect, label, color, font, text, chars=''):
         super().__init__(rect, label, color, font)
         self.text = text
+        self.chars = chars  # Characters that can be typed besides digits
+        self.text_surface = None  # Rendered text, cached until the text changes
+
+    def area(self):
+        # Long text can stick out of the box
+        area = super().area()
+        if self.text_surface is not None:
+            area.union_ip(self.text_surface.get_rect(center=self.rect.center))
+        return area
 
     def render(self, screen):
         super().render(screen)
-        surface = self.font.render(self.text, True, self.color)
-        screen.blit(surface, surface.get_rect(center = self.rect.center))
+        if self.text_surface is None:
+            self.text_surface = self.font.render(self.text, True, self.color)
+        screen.blit(self.text_surface, self.text_surface.get_rect(center = self.rect.center))
 
-    def update(self, event):
-        super().update(event)
+    def update(self, event, pos):
+        super().update(event, pos)
         if self.hovered and event.type == pygame.KEYDOWN:
             if event.key == pygame.K_BACKSPACE:
-                self.text = self.text[:-1]
-            elif event.unicode.isdigit():
-                self.text += event.unicode
+                self.set_value(self.text[:-1])
+            elif event.unicode.isdigit() or (event.unicode and event.unicode in self.chars):
+                self.set_value(self.text + event.unicode)
 
     def get_value(self):
         return self.text
 
     def set_value(self, value):
-        self.text = value
+        if value != self.text:
+            self.text = value
+            self.text_surface = None
+            self.dirty = True
 
 
 class SlideBox(InputBox):
-    def __init__(self, rect, label, color, font):
+    def __init__(self, rect, label, color, font, ratio=0.0):
         super().__init__(rect, label, color, font)
         self.start = self.rect.x + 6
         self.end = self.rect.x + self.rect.w - 6
-        self.value = self.start
+        self.value = self.start + ratio * (self.end - self.start)
 
     def render(self, screen):
         super().render(screen)
-        pygame.draw.line(screen, self.color, (self.start, self.rect.y + 25), (self.end, self.rect.y + 25), 2)
-        pygame.draw.line(screen, self.color, (self.value, self.rect.y + 5), (self.value, self.rect.y + 45), 12)
+        pygame.draw.line(screen, self.color, (self.start, self.rect.centery), (self.end, self.rect.centery), 2)
+        pygame.draw.line(screen, self.color, (self.value, self.rect.y + 5), (self.value, self.rect.bottom - 5), 12)
 
-    def update(self, event):
-        super().update(event)
+    def update(self, event, pos):
+        super().update(event, pos)
         previousStart = self.start
         self.start = self.rect.x + 6
         self.end = self.rect.x + self.rect.w - 6
         self.value += self.start - previousStart
 
-        if self.clicked:
-            if self.start <= self.mousePos[0] <= self.end: self.value = self.mousePos[0]
+        dragged = event.type == pygame.MOUSEMOTION and event.buttons[0] and self.hovered
+        if self.clicked or dragged:
+            if self.start <= self.mousePos[0] <= self.end: self.set_value(self.mousePos[0])
 
     def get_value(self):
         return self.value
 
+    def get_ratio(self):
+        #Position of the slider between 0 (start) and 1 (end)
+        return (self.value - self.start) / (self.end - self.start)
+
+    def set_ratio(self, ratio):
+        self.set_value(self.start + ratio * (self.end - self.start))
+
     def set_value(self, value):
+        if int(value) != int(self.value):
+            self.dirty = True  # Only a move to another pixel shows
         self.value = value
 
 class DropdownBox(InputBox):
@@ -180,6 +354,7 @@ class DropdownBox(InputBox):
         self.openDropdown = False
         self.options = options
         self.options_background_color = options_background_color
+        self.option_surfaces = [font.render(option, 1, color) for option in options]  # Rendered once, options do not change
 
         self.dropdown_rect = pygame.Rect(
             self.rect.x,
@@ -187,15 +362,27 @@ class DropdownBox(InputBox):
             self.rect.width,
             self.rect.height * self.VISIBLE_OPTIONS
         )
+        # Rects of the visible option slots, from the one next to the box upwards
+        self.option_rects = [self.rect.move(0, -(slot + 1) * self.rect.height) for slot in range(self.VISIBLE_OPTIONS)]
         self.scroll_offset = 0  # Current scroll position
         self.scrollbar_width = 5  # Width of the scrollbar
         self.selected_option = 0  # Index of the selected option
 
+    def area(self):
+        area = super().area()
+        if self.openDropdown:
+            area.union_ip(self.dropdown_rect)
+        return area
+
+    def is_dirty(self):
+        # The open list lies over the bars, which are redrawn under it every frame
+        return self.dirty or self.openDropdown
+
     def render(self, screen):
         super().render(screen)
 
         # Render the selected option in the input box
-        option_text = self.font.render(self.options[self.selected_option], 1, self.color)
+        option_text = self.option_surfaces[self.selected_option]
         screen.blit(option_text, option_text.get_rect(center=self.rect.center))
 
         if self.openDropdown:
@@ -208,12 +395,11 @@ class DropdownBox(InputBox):
             end_index = min(start_index + self.VISIBLE_OPTIONS, len(self.options))
 
             for index in range(start_index, end_index):
-                rect = self.rect.copy()
-                rect.y = self.rect.y - (index - start_index + 1) * self.rect.height
+                rect = self.option_rects[index - start_index]
 
                 pygame.draw.rect(screen, self.options_background_color, rect)
                 pygame.draw.rect(screen, self.color, rect, 1)
-                option_text = self.font.render(self.options[index], 1, self.color)
+                option_text = self.option_surfaces[index]
                 screen.blit(option_text, option_text.get_rect(center=rect.center))
 
             # Render the scrollbar
@@ -234,12 +420,13 @@ class DropdownBox(InputBox):
             # Draw the scrollbar (visual only)
             pygame.draw.rect(screen, self.color, scrollbar_rect)
 
-    def update(self, event):
-        super().update(event)
+    def update(self, event, pos):
+        super().update(event, pos)
 
         # Toggle the dropdown when the input box is clicked
         if self.clicked:
             self.openDropdown = not self.openDropdown
+            self.dirty = True
 
         if self.openDropdown:
             # Handle mouse wheel scrolling
@@ -253,17 +440,19 @@ class DropdownBox(InputBox):
             self.handle_option_selection(event)
 
     def handle_option_selection(self, event):
-        start_index = self.scroll_offset
-        for index in range(start_index, start_index + self.VISIBLE_OPTIONS):
-            rect = self.rect.copy()
-            rect.y = self.rect.y - (index - start_index + 1) * self.rect.height
-
-            if rect.collidepoint(pygame.mouse.get_pos()) and event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+        if event.type != pygame.MOUSEBUTTONDOWN or event.button != 1:
+            return
+        for slot, rect in enumerate(self.option_rects):
+            index = self.scroll_offset + slot
+            if rect.collidepoint(self.mousePos) and index < len(self.options):
                 self.selected_option = index
                 self.openDropdown = False  # Close dropdown after selecting
+                self.dirty = True
 
     def get_value(self):
         return self.options[self.selected_option]
 
     def set_value(self, value):
-        self.selected_option = value
\ No newline at end of file
+        if value != self.selected_option:
+            self.selected_option = value
+            self.dirty = True